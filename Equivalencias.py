@@ -1,62 +1,139 @@
-from typing import Dict, List, Set
-from itertools import product
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from automatas_finitos import acepta_cadena, equivalencia_exacta
+from cache_resultados import cacheado, por_huella
+from canonico import huella_gramatica
+from chomsky_classifier import construir_automata_regular
+from grammar_ir import GramaticaCompilada, compilar_gramatica
+from normalizacion import simplificar, tabla_poda
+from trazas import medido
 
 def leer_gramatica(texto: str) -> Dict[str, List[str]]:
-    gr = {}
-    for linea in texto.strip().split("\n"):
-        linea = linea.strip()
-        if not linea or ("->" not in linea and "→" not in linea):
-            continue
-
-        if "->" in linea:
-            izq, der = linea.split("->", 1)
-        else:
-            izq, der = linea.split("→", 1)
-
-        izq = izq.strip()
-        alternativas = [p.strip() for p in der.split("|")]
-        gr.setdefault(izq, []).extend(alternativas)
-    return gr
-
-def generar_cadenas(glc: Dict[str, List[str]], max_len: int = 6) -> Set[str]:
+    return compilar_gramatica(texto).a_dict()
+
+def _compilada(glc: Union[GramaticaCompilada, Dict[str, List[str]]]) -> GramaticaCompilada:
+    if isinstance(glc, GramaticaCompilada):
+        return glc
+    texto = "\n".join(f"{izq} -> {' | '.join(prods)}" for izq, prods in glc.items())
+    return compilar_gramatica(texto)
+
+@medido("generación de cadenas")
+def generar_cadenas(glc: Union[GramaticaCompilada, Dict[str, List[str]]], max_len: int = 6) -> Set[str]:
     """
-    Genera cadenas derivables hasta longitud <= max_len.
-    No garantiza exhaustividad, pero sirve para comparación.
+    Genera exactamente las cadenas del lenguaje con longitud <= max_len.
+
+    Trabaja sobre la gramática simplificada (sin símbolos inútiles ni reglas
+    ε o unitarias): ahí todo símbolo aporta al menos un carácter, así que las
+    cadenas de longitud n de cada no terminal se construyen de abajo hacia
+    arriba a partir de longitudes menores, sin recorrer formas sentenciales.
+    Con la longitud mínima de cada símbolo (tabla_poda) solo se prueban los
+    repartos de longitud en los que el resto de la regla todavía cabe.
     """
-    start = next(iter(glc.keys()))
-    resultados = set()
-
-    agenda = [start]
-    visitados = set()
-
-    while agenda:
-        actual = agenda.pop()
-        if actual in visitados:
-            continue
-        visitados.add(actual)
-        if all(c.islower() for c in actual):
-            if len(actual) <= max_len:
-                resultados.add(actual)
-            continue
-        if len(actual) > max_len:
-            continue
-
-        for i, c in enumerate(actual):
-            if c.isupper():  
-                for prod in glc.get(c, []):
-                    nueva = actual[:i] + ("" if prod == "ε" else prod) + actual[i+1:]
-                    if len(nueva) <= max_len + 2:
-                        agenda.append(nueva)
+    g = simplificar(_compilada(glc))
+    if g.vacia:
+        return set()
+    reglas = g.prods_de
+    vacia = () in reglas.get(g.inicio, ())
+    es_nt, nom = g.es_nt, g.simbolos
+    tabla = tabla_poda(g)
+    # min_resto[rhs][k]: longitud mínima de rhs[k:]
+    min_resto: Dict[Tuple[int, ...], List[int]] = {}
+    for prods in reglas.values():
+        for rhs in prods:
+            resto = [0] * (len(rhs) + 1)
+            for k in range(len(rhs) - 1, -1, -1):
+                resto[k] = resto[k + 1] + tabla.minimo_de((rhs[k],))
+            min_resto[rhs] = resto
+
+    por_long: Dict[int, List[Set[str]]] = {
+        A: [set() for _ in range(max_len + 1)] for A in reglas
+    }
+    vacios = [set() for _ in range(max_len + 1)]
+
+    def cadenas_de(x: int, m: int) -> Set[str]:
+        if es_nt[x]:
+            return por_long.get(x, vacios)[m]
+        return {nom[x]} if m == 1 else set()
+
+    for n in range(1, max_len + 1):
+        for A, prods in reglas.items():
+            if tabla.minimo.get(A, n + 1) > n:
+                continue
+            destino = por_long[A][n]
+            for rhs in prods:
+                resto = min_resto[rhs]
+                if not rhs or resto[0] > n:
+                    continue
+                ultimo = len(rhs) - 1
+                parciales: Dict[int, Set[str]] = {0: {""}}
+                for pos, x in enumerate(rhs):
+                    siguientes: Dict[int, Set[str]] = {}
+                    for usado, prefijos in parciales.items():
+                        maximo = n - usado - resto[pos + 1]
+                        # El último símbolo tiene que completar exactamente n.
+                        minimo = maximo if pos == ultimo else resto[pos] - resto[pos + 1]
+                        for m in range(minimo, maximo + 1):
+                            sufijos = cadenas_de(x, m)
+                            if sufijos:
+                                siguientes.setdefault(usado + m, set()).update(
+                                    p + s for p in prefijos for s in sufijos
+                                )
+                    parciales = siguientes
+                    if not parciales:
+                        break
+                destino |= parciales.get(n, set())
 
+    resultados = set().union(*por_long.get(g.inicio, vacios))
+    if vacia:
+        resultados.add("")
     return resultados
 
+def _es_lineal_derecha(g: GramaticaCompilada) -> bool:
+    """Tipo 3 sin reglas A → Ba, que construir_automata_regular no traduce."""
+    es_nt, es_t = g.es_nt, g.es_t
+    return all(
+        not (len(rhs) == 2 and es_nt[rhs[0]] and es_t[rhs[1]])
+        for prods in g.prods_de.values() for rhs in prods
+    )
+
+def _automata_regular(txt: str, g: GramaticaCompilada) -> Optional[dict]:
+    if g.vacia or not _es_lineal_derecha(g):
+        return None
+    return construir_automata_regular(txt)
+
+def comparar_automatas(a1: dict, a2: dict) -> Tuple[bool, str]:
+    """
+    Comparación exacta de dos autómatas finitos (p. ej. salidas de regex_to_dfa).
+    Devuelve (equivalentes, mensaje) con la cadena distinguidora más corta.
+    """
+    equivalentes, w = equivalencia_exacta(a1, a2)
+    if equivalentes:
+        return True, "Los autómatas son equivalentes (verificación exacta)."
+    lado = "el primero" if acepta_cadena(a1, w) else "el segundo"
+    return False, f"Los autómatas NO son equivalentes: '{w or 'ε'}' solo la acepta {lado}."
+
+@cacheado(max_entradas=128, normalizar=por_huella, persistir=(por_huella, por_huella))
 def comparar_gramaticas(txt1: str, txt2: str, max_len: int = 6):
-    g1 = leer_gramatica(txt1)
-    g2 = leer_gramatica(txt2)
+    g1 = compilar_gramatica(txt1)
+    g2 = compilar_gramatica(txt2)
+
+    if not g1.vacia and huella_gramatica(txt1) == huella_gramatica(txt2):
+        L1 = generar_cadenas(g1, max_len)
+        return "Las gramáticas son equivalentes (misma forma canónica: solo cambian nombres u orden).", L1, set(L1)
 
     L1 = generar_cadenas(g1, max_len)
     L2 = generar_cadenas(g2, max_len)
 
+    A1 = _automata_regular(txt1, g1)
+    A2 = _automata_regular(txt2, g2) if A1 else None
+    if A1 and A2:
+        equivalentes, w = equivalencia_exacta(A1, A2)
+        if equivalentes:
+            return "Las gramáticas son equivalentes (verificación exacta sobre autómatas, Tipo 3).", L1, L2
+        lado = "G1" if acepta_cadena(A1, w) else "G2"
+        return (f"Las gramáticas NO son equivalentes (verificación exacta): "
+                f"'{w or 'ε'}' solo la genera {lado}."), L1, L2
+
     inter = L1 & L2
     union = L1 | L2
 
@@ -64,7 +141,7 @@ def comparar_gramaticas(txt1: str, txt2: str, max_len: int = 6):
         return "No se pudo generar ninguna cadena con ambas gramáticas.", L1, L2
 
     if L1 == L2:
-        return "Las gramáticas parecen equivalentes (misma muestra generada).", L1, L2
+        return f"Las gramáticas parecen equivalentes (mismas cadenas hasta longitud {max_len}).", L1, L2
     sim = len(inter) / len(union)
 
     if sim > 0.70:
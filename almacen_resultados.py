@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from grammar_ir import compilar_gramatica
+
+VERSION_ALMACEN = 2
+VARIABLE_RUTA = "CHOMSKY_ALMACEN"
+
+
+def clave_gramatica(texto) -> str:
+    """Gramática ya leída: sin espacios ni variantes de flecha, en el orden original."""
+    if not isinstance(texto, str):
+        return repr(texto)
+    return "\n".join(f"{izq}->{der}" for izq, der in compilar_gramatica(texto).textos)
+
+
+def clave_json(texto) -> str:
+    """JSON reserializado con claves ordenadas; si no es JSON válido, el texto tal cual."""
+    if not isinstance(texto, str):
+        return repr(texto)
+    try:
+        return json.dumps(json.loads(texto), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except ValueError:
+        return texto.strip()
+
+
+class AlmacenResultados:
+    """
+    Almacén persistente de resultados en SQLite (modo WAL), compartible entre
+    reinicios y entre réplicas que monten el mismo volumen.
+
+    Cada fila guarda el resultado serializado con pickle bajo un hash de la
+    función y de la forma canónica de sus argumentos. La limpieza borra
+    primero lo más antiguo que `max_edad` y después lo menos usado hasta
+    quedar por debajo de `max_bytes`. Se ejecuta al abrir y cada
+    `purgar_cada` escrituras.
+
+    Cualquier error de SQLite se trata como un fallo de caché: el almacén
+    nunca impide calcular el resultado.
+    """
+
+    def __init__(self, ruta: str, max_edad: float = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 * 1024, purgar_cada: int = 200):
+        self.ruta = ruta
+        self.max_edad = max_edad
+        self.max_bytes = max_bytes
+        self.purgar_cada = purgar_cada
+        self._local = threading.local()
+        self._escrituras = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        conn = self._conexion()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " clave TEXT PRIMARY KEY,"
+            " funcion TEXT NOT NULL,"
+            " valor BLOB NOT NULL,"
+            " creado REAL NOT NULL,"
+            " usado REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado)")
+        conn.commit()
+        self.purgar()
+
+    def _conexion(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def clave(funcion: str, canonica: str) -> str:
+        texto = f"{VERSION_ALMACEN}\0{funcion}\0{canonica}"
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def obtener(self, clave: str):
+        """Devuelve (True, valor) si está guardado y vigente, (False, None) si no."""
+        ahora = time.time()
+        try:
+            conn = self._conexion()
+            fila = conn.execute(
+                "SELECT valor, creado FROM resultados WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None or fila[1] < ahora - self.max_edad:
+                self.fallos += 1
+                return False, None
+            conn.execute("UPDATE resultados SET usado = ? WHERE clave = ?", (ahora, clave))
+            conn.commit()
+            valor = pickle.loads(fila[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError):
+            self.fallos += 1
+            return False, None
+        self.aciertos += 1
+        return True, valor
+
+    def guardar(self, clave: str, funcion: str, valor):
+        ahora = time.time()
+        try:
+            datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._conexion()
+            conn.execute(
+                "INSERT OR REPLACE INTO resultados (clave, funcion, valor, creado, usado)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (clave, funcion, datos, ahora, ahora),
+            )
+            conn.commit()
+        except (sqlite3.Error, pickle.PicklingError, TypeError):
+            return
+        with self._lock:
+            self._escrituras += 1
+            toca = self._escrituras % self.purgar_cada == 0
+        if toca:
+            self.purgar()
+
+    def purgar(self):
+        try:
+            conn = self._conexion()
+            conn.execute("DELETE FROM resultados WHERE creado < ?", (time.time() - self.max_edad,))
+            total = 0
+            sobrantes = []
+            for clave, tam in conn.execute(
+                "SELECT clave, LENGTH(valor) FROM resultados ORDER BY usado DESC"
+            ):
+                total += tam
+                if total > self.max_bytes:
+                    sobrantes.append((clave,))
+            conn.executemany("DELETE FROM resultados WHERE clave = ?", sobrantes)
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def estadisticas(self) -> dict:
+        try:
+            filas, tam = self._conexion().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(valor)), 0) FROM resultados"
+            ).fetchone()
+        except sqlite3.Error:
+            filas, tam = 0, 0
+        return {"filas": filas, "bytes": tam, "aciertos": self.aciertos, "fallos": self.fallos}
+
+
+_almacen: Optional[AlmacenResultados] = None
+_almacen_listo = False
+_almacen_lock = threading.Lock()
+
+
+def almacen_global() -> Optional[AlmacenResultados]:
+    """
+    Almacén compartido, activado solo si la variable de entorno
+    CHOMSKY_ALMACEN apunta a un archivo .sqlite. Sin ella devuelve None.
+    """
+    global _almacen, _almacen_listo
+    if _almacen_listo:
+        return _almacen
+    with _almacen_lock:
+        if not _almacen_listo:
+            ruta = os.environ.get(VARIABLE_RUTA, "").strip()
+            if ruta:
+                try:
+                    _almacen = AlmacenResultados(ruta)
+                except sqlite3.Error:
+                    _almacen = None
+            _almacen_listo = True
+    return _almacen
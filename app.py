@@ -1,93 +1,24 @@
 import streamlit as st
 import pandas as pd
 import random, secrets
+from collections.abc import Mapping
+from concurrent.futures import TimeoutError as FuturesTimeout
 from Equivalencias import comparar_gramaticas
 
-def _gen_type3_regular(rnd: random.Random) -> str:
-    NT = ["S","A","B","C"]
-    T  = rnd.sample(["a","b","c"], k=2)  
-    n_rules = rnd.randint(5,8)
-    rules = set()
-
-    if rnd.random() < .6: rules.add("S -> ε")
-    for _ in range(rnd.randint(1,3)):
-        rules.add(f"S -> {rnd.choice(T)}")
-        rules.add(f"S -> {rnd.choice(T)}{rnd.choice(NT)}")
-
-    for A in ["A","B","C"]:
-        if rnd.random() < .8:
-            rules.add(f"{A} -> {rnd.choice(T)}{A}")
-        if rnd.random() < .8:
-            rules.add(f"{A} -> {rnd.choice(T)}{rnd.choice(NT)}")
-        if rnd.random() < .7:
-            rules.add(f"{A} -> {rnd.choice(T)}")
-        if rnd.random() < .3:
-            rules.add(f"{A} -> ε")
-
-    rules = list(rules)
-    rnd.shuffle(rules)
-    return "\n".join(rules[:n_rules]) or "S -> a | ε"
-
-def _gen_type2_cfg(rnd: random.Random) -> str:
-
-    T = rnd.sample(["a","b","c"], k=2)
-    a, b = T[0], T[1]
-    cand = []
-    cand.append(f"S -> {a} S {b} | ε")
-    cand.append(f"S -> {a} S {a} | {b} S {b} | {a} | {b} | ε")
-    cand.append(f"S -> {a} S {b} | A\nA -> {a} A | {b} | ε")
-    cand.append(f"S -> {a} S {b} | S S | ε")
-
-    rules = rnd.choice(cand)
-    return rules
-
-def _gen_type1_cs(rnd: random.Random) -> str:
-    T = rnd.sample(["a","b","c"], k=2)
-    a, b = T[0], T[1]
-    base = [
-        f"S -> {a} S B | {a} B",
-        "A B -> B A",            
-        f"B {a} -> {a} B",       
-        "A -> " + a,
-        "B -> " + b,
-    ]
-    if rnd.random() < .5: base.append("S A -> A S")
-    if rnd.random() < .5: base.append("B B -> B B")
-    return "\n".join(base)
-
-def _gen_type0_unrestricted(rnd: random.Random) -> str:
-    T = rnd.sample(["a","b","c"], k=2)
-    a, b = T[0], T[1]
-    base = [
-        "S -> A B | " + a,
-        "A B -> A",                 
-        f"A -> {a} A | {a}",
-        f"B -> {b} B | {b}",
-    ]
-    if rnd.random() < .6:
-        base.append("S A -> ε")
-    if rnd.random() < .4:
-        base.append("B A -> B")
-    return "\n".join(base)
-
-def generar_gramatica_por_tipo(tipo: int, rnd: random.Random = None) -> str:
-    rnd = rnd or random
-    if tipo == 3: return _gen_type3_regular(rnd)
-    if tipo == 2: return _gen_type2_cfg(rnd)
-    if tipo == 1: return _gen_type1_cs(rnd)
-    if tipo == 0: return _gen_type0_unrestricted(rnd)
-    return _gen_type2_cfg(rnd)
+from generadores import generar_gramatica_por_tipo
 
 from chomsky_classifier import (
     leer_gramatica,
-    tipo_de_gramatica,
     clasificar_con_explicacion,
     construir_automata_regular,
+    construir_afd_regular,
     generar_grafo_automata,
     generar_arbol_derivacion,
+    contar_derivaciones,
     generar_grafo,
     clasificar_automata,
     generar_grafo_automata_desde_json,
+    ClasificacionIncremental,
 )
 
 from model_converters import (
@@ -98,6 +29,15 @@ from model_converters import (
     pda_to_transition_rows,
 )
 
+from simuladores import simular_mt, simular_pda
+from formato_binario import exportar_binario
+from lectura_automatas import AutomataLeido, filas_transiciones, total_transiciones
+from normalizacion import formas_normalizadas
+from almacen_resultados import almacen_global
+from cache_resultados import estadisticas_cache
+from render_cache import estadisticas_render
+from trazas import activas_por_defecto, perfil_por_defecto, registrar, reiniciar
+
 from tutor import (
     init_state,
     ensure_question,
@@ -108,6 +48,44 @@ from tutor import (
     LABELS,
 )
 
+ESPERA_RENDER = 5.0
+FILAS_VISTA_PREVIA = 500
+MAX_ARISTAS_GRAFO = 1000
+
+
+def mostrar_grafo(futuro, caption=None, filas_respaldo=None):
+    """
+    Muestra la imagen de un Future del servicio de dibujo. Mientras se dibuja
+    se ve un aviso; si no llega a tiempo (o Graphviz falla) se muestra la
+    tabla de respaldo. El dibujo sigue en segundo plano y queda en caché para
+    la siguiente ejecución.
+    """
+    hueco = st.empty()
+    hueco.info("Dibujando el grafo...")
+    try:
+        hueco.image(futuro.result(timeout=ESPERA_RENDER), caption=caption)
+        return
+    except FuturesTimeout:
+        hueco.warning("El grafo tarda demasiado en dibujarse; se muestra en forma de tabla.")
+    except Exception as e:
+        hueco.warning(f"No se pudo dibujar el grafo ({e}); se muestra en forma de tabla.")
+    if filas_respaldo:
+        st.dataframe(pd.DataFrame(filas_respaldo), use_container_width=True)
+
+def mostrar_rendimiento(medicion):
+    """Panel plegable con los tramos medidos (y el perfil de cProfile, si se pidió)."""
+    registro = medicion.detener()
+    if registro is None:
+        return
+    with st.expander("Rendimiento (Performance)"):
+        filas = registro.filas()
+        if filas:
+            st.dataframe(pd.DataFrame(filas), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No se registraron etapas: todo se sirvió desde caché.")
+        if registro.perfil:
+            st.code(registro.perfil, language="text")
+
 st.set_page_config(page_title="Chomsky Classifier AI", page_icon="", layout="wide")
 
 page_style = """
@@ -257,79 +235,26 @@ Esta herramienta te permite:
 - Practicar con un **Tutor/Quiz** interactivo.
 """
 )
+reiniciar()
+medir_rendimiento = st.sidebar.checkbox(
+    "Medir rendimiento por etapas", value=activas_por_defecto(), key="medir_rendimiento",
+    help="Muestra un panel 'Rendimiento' con el tiempo de cada etapa (también con CHOMSKY_TRAZAS=1).",
+)
+perfil_cprofile = st.sidebar.checkbox(
+    "Incluir perfil cProfile", value=perfil_por_defecto(), key="perfil_cprofile",
+    disabled=not medir_rendimiento,
+)
+
+with st.sidebar.expander("Caché de resultados"):
+    st.caption("Las entradas repetidas (entre ejecuciones y entre usuarios) se sirven desde memoria.")
+    st.dataframe(pd.DataFrame(estadisticas_cache()), use_container_width=True, hide_index=True)
+    st.caption("Imágenes de Graphviz: {entradas} en caché, {aciertos} aciertos, {fallos} fallos.".format(**estadisticas_render()))
+    if almacen_global() is not None:
+        st.caption("Almacén SQLite: {filas} resultados ({bytes} bytes), {aciertos} aciertos, {fallos} fallos.".format(
+            **almacen_global().estadisticas()))
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Gramática", "Autómata", "Conversión", "Tutor", "Equivalencia"])
 with tab1:
-        def _gen_type3_regular(rnd: random.Random) -> str:
-            NT = ["S","A","B","C"]
-            T  = rnd.sample(["a","b","c"], k=2)
-            n_rules = rnd.randint(5,8)
-            rules = set()
-
-            if rnd.random() < .6:
-                rules.add("S -> ε")
-            for _ in range(rnd.randint(1,3)):
-                rules.add(f"S -> {rnd.choice(T)}")
-                rules.add(f"S -> {rnd.choice(T)}{rnd.choice(NT)}")
-
-            for A in ["A","B","C"]:
-                if rnd.random() < .8:
-                    rules.add(f"{A} -> {rnd.choice(T)}{A}")
-                if rnd.random() < .8:
-                    rules.add(f"{A} -> {rnd.choice(T)}{rnd.choice(NT)}")
-                if rnd.random() < .7:
-                    rules.add(f"{A} -> {rnd.choice(T)}")
-                if rnd.random() < .3:
-                    rules.add(f"{A} -> ε")
-
-            rules = list(rules)
-            rnd.shuffle(rules)
-            return "\n".join(rules[:n_rules]) or "S -> a | ε"
-
-        def _gen_type2_cfg(rnd: random.Random) -> str:
-            T = rnd.sample(["a","b","c"], k=2)
-            a, b = T
-            cand = [
-                f"S -> {a} S {b} | ε",
-                f"S -> {a} S {a} | {b} S {b} | {a} | {b} | ε",
-                f"S -> {a} S {b} | A\nA -> {a} A | {b} | ε",
-                f"S -> {a} S {b} | S S | ε",
-            ]
-            return rnd.choice(cand)
-
-        def _gen_type1_cs(rnd: random.Random) -> str:
-            T = rnd.sample(["a","b","c"], k=2)
-            a, b = T
-            base = [
-                f"S -> {a} S B | {a} B",
-                "A B -> B A",
-                f"B {a} -> {a} B",
-                f"A -> {a}",
-                f"B -> {b}",
-            ]
-            if rnd.random() < .5: base.append("S A -> A S")
-            if rnd.random() < .5: base.append("B B -> B B")
-            return "\n".join(base)
-
-        def _gen_type0_unrestricted(rnd: random.Random) -> str:
-            T = rnd.sample(["a","b","c"], k=2)
-            a, b = T
-            base = [
-                f"S -> A B | {a}",
-                "A B -> A",
-                f"A -> {a} A | {a}",
-                f"B -> {b} B | {b}",
-            ]
-            if rnd.random() < .6: base.append("S A -> ε")
-            if rnd.random() < .4: base.append("B A -> B")
-            return "\n".join(base)
-
-        def generar_gramatica_por_tipo(tipo: int, rnd: random.Random = None) -> str:
-            rnd = rnd or random.Random(secrets.randbits(64))  
-            if tipo == 3: return _gen_type3_regular(rnd)
-            if tipo == 2: return _gen_type2_cfg(rnd)
-            if tipo == 1: return _gen_type1_cs(rnd)
-            if tipo == 0: return _gen_type0_unrestricted(rnd)
-            return _gen_type2_cfg(rnd)
         st.header("Clasificación de Gramáticas")
 
         st.subheader("Generador automático de ejemplos")
@@ -344,7 +269,7 @@ with tab1:
             )
         with colg2:
             if st.button("Insertar ejemplo", key="btn_insertar_ejemplo"):
-                st.session_state["gramatica_text"] = generar_gramatica_por_tipo(tipo_sel)
+                st.session_state["gramatica_text"] = generar_gramatica_por_tipo(tipo_sel, random.Random(secrets.randbits(64)))
                 st.rerun()
         with colg3:
             if st.button("Limpiar", key="btn_limpiar_ejemplo"):
@@ -365,12 +290,18 @@ with tab1:
             help="El árbol solo se genera si todas las producciones tienen un único no terminal en el lado izquierdo (A → α).",
             key="cadena_derivacion"
         )
+        indice_arbol = st.number_input(
+            "Árbol de derivación nº (si la cadena es ambigua)",
+            min_value=1, value=1, step=1,
+            key="indice_arbol"
+        )
 
         if st.button("Clasificar gramática", key="btn_clasificar_gramatica"):
-            if modo_explicativo:
-                tipo, explicacion, pasos = clasificar_con_explicacion(texto)
-            else:
-                tipo, explicacion = tipo_de_gramatica(texto)
+            medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
+            # Cada sesión conserva el análisis anterior: solo se reanalizan las líneas editadas.
+            incremental = st.session_state.setdefault("clasificacion_incremental", ClasificacionIncremental())
+            tipo, explicacion, pasos = incremental.actualizar(texto)
+            if not modo_explicativo:
                 pasos = None
 
             gramatica = leer_gramatica(texto)
@@ -383,12 +314,36 @@ with tab1:
                 st.subheader("Explicación paso a paso (producciones)")
                 for p in pasos:
                     st.markdown(f"- {p}")
-            try:
-                generar_grafo(gramatica)
-                st.subheader("Diagrama de la gramática")
-                st.image("gramatica.png")
-            except Exception as e:
-                st.warning(f"No se pudo generar el grafo de la gramática: {e}")
+            st.subheader("Diagrama de la gramática")
+            mostrar_grafo(
+                generar_grafo(gramatica, esperar=False),
+                filas_respaldo=[
+                    {"No terminal": izq, "Producción": prod}
+                    for izq, prods in gramatica.items() for prod in prods
+                ],
+            )
+            if tipo in (2, 3):
+                with st.expander("Gramática simplificada y forma normal de Chomsky"):
+                    try:
+                        simplificada, fnc = formas_normalizadas(texto)
+                    except ValueError as e:
+                        st.warning(str(e))
+                    else:
+                        st.caption("Sin símbolos inútiles, reglas ε ni reglas unitarias:")
+                        st.code(simplificada or "(el lenguaje es vacío)", language="text")
+                        st.caption("Forma normal de Chomsky (A → BC | a):")
+                        st.code(fnc or "(el lenguaje es vacío)", language="text")
+            if cadena.strip():
+                st.subheader("Árbol de derivación")
+                total, _, msg_amb = contar_derivaciones(texto, cadena)
+                st.markdown(f"**Ambigüedad:** {msg_amb}")
+                indice = min(int(indice_arbol), total) - 1 if total else None
+                pasos_tabla, err, img_derivacion = generar_arbol_derivacion(texto, cadena, indice, esperar=False)
+                if err:
+                    st.warning(err)
+                else:
+                    st.dataframe(pd.DataFrame(pasos_tabla), use_container_width=True)
+                    mostrar_grafo(img_derivacion)
             if tipo == 3:
                 st.subheader("Autómata finito equivalente (Tipo 3)")
                 automata = construir_automata_regular(texto)
@@ -405,8 +360,27 @@ with tab1:
                                 rows.append({"Desde": origen, "Símbolo": simbolo, "Hacia": dest})
 
                     if rows:
-                        import pandas as pd
-                        df = pd.DataFrame(rows)
+                        st.markdown("**Transiciones del AFN:**")
+                        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+                    afd = construir_afd_regular(texto)
+                    if afd:
+                        st.subheader("AFD equivalente (construcción de subconjuntos)")
+                        if afd.get("truncado"):
+                            st.warning(f"El AFD tiene más de {len(afd['states'])} estados; se muestran los primeros.")
+                        filas_afd = [
+                            {
+                                "Estado": q,
+                                "Subconjunto": "{" + ", ".join(afd["subconjuntos"][q]) + "}",
+                                "Final": "✓" if q in afd["final_states"] else "",
+                                **{a: afd["transitions"][q].get(a, "—") for a in afd["input_symbols"]},
+                            }
+                            for q in afd["states"]
+                        ]
+                        st.dataframe(pd.DataFrame(filas_afd), use_container_width=True, hide_index=True)
+                        if len(afd["states"]) <= 200:
+                            mostrar_grafo(render_dfa_graphviz(afd, esperar=False), caption="AFD determinizado")
+            mostrar_rendimiento(medicion)
 
 with tab2:
     st.header("Clasificación de Autómatas")
@@ -429,11 +403,34 @@ El sistema:
         key="automata_json"
     )
 
+    archivo_afb = st.file_uploader(
+        "…o sube un autómata finito en formato binario (.afb):",
+        type=["afb"],
+        key="automata_afb",
+        help="Generado con el botón de descarga de Regex → AFD o con formato_binario.guardar_binario.",
+    )
+
+    cadena_mt = st.text_input(
+        "Cadena para simular (solo Máquinas de Turing, opcional):",
+        key="cadena_mt",
+        help="La simulación se corta al agotar 100 000 pasos o 1 segundo.",
+    )
+
+    tabla_completa = st.checkbox(
+        "Construir la tabla de transiciones completa",
+        key="tabla_completa_auto",
+        help=f"Por defecto se muestran las primeras {FILAS_VISTA_PREVIA} filas; "
+             f"el grafo solo se dibuja con hasta {MAX_ARISTAS_GRAFO} transiciones.",
+    )
+
     if st.button("Clasificar autómata", key="clasificar_automata"):
-        if not auto_text.strip():
+        medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
+        if archivo_afb is None and not auto_text.strip():
             st.warning("Pega un JSON de autómata para analizarlo.")
         else:
-            tipo, explicacion, data, pasos_auto = clasificar_automata(auto_text)
+            tipo, explicacion, data, pasos_auto = clasificar_automata(
+                archivo_afb.getvalue() if archivo_afb is not None else auto_text
+            )
 
             st.subheader("Resultado del análisis del autómata")
 
@@ -448,31 +445,50 @@ El sistema:
                 for linea in pasos_auto:
                     st.markdown(f"- {linea}")
 
-            if data and isinstance(data, dict) and all(
-                k in data for k in ("states", "transitions", "initial_state")
-            ):
-                st.subheader("Transiciones del autómata")
+            if tipo == 0 and isinstance(data, Mapping) and cadena_mt:
+                st.subheader("Simulación de la Máquina de Turing")
+                acepta_mt, msg_mt, info_mt = simular_mt(data, cadena_mt)
+                if acepta_mt is True:
+                    st.success(msg_mt)
+                elif acepta_mt is False:
+                    st.error(msg_mt)
+                else:
+                    st.warning(msg_mt)
+                if info_mt:
+                    st.markdown(f"Estado final: `{info_mt['estado']}` · Cinta: `{info_mt['cinta']}`")
 
-                rows = []
-                transitions = data.get("transitions", {})
-                for origen, trans in transitions.items():
-                    for simbolo, destino in trans.items():
-                        if isinstance(destino, list):
-                            for d in destino:
-                                rows.append({"Desde": origen, "Símbolo": simbolo, "Hacia": d})
-                        else:
-                            rows.append({"Desde": origen, "Símbolo": simbolo, "Hacia": destino})
+            try:
+                mostrar_transiciones = bool(data) and isinstance(data, Mapping) and all(
+                    k in data for k in ("states", "transitions", "initial_state")
+                )
+                if mostrar_transiciones:
+                    total = total_transiciones(data)
+                    rows = list(filas_transiciones(data, None if tabla_completa else FILAS_VISTA_PREVIA))
+            except ValueError as e:
+                # El tipo se decidió con las primeras claves; el resto del JSON tiene errores.
+                st.error(f"El resto del JSON no se pudo leer: {e}")
+                mostrar_transiciones = False
+            if mostrar_transiciones:
+                st.subheader("Transiciones del autómata")
 
+                if isinstance(data, AutomataLeido):
+                    st.caption(" · ".join(f"{k}: {v}" for k, v in data.estadisticas().items()))
                 if rows:
+                    if len(rows) < total:
+                        st.caption(
+                            f"Se muestran {len(rows)} de {total} transiciones. "
+                            "Marca «Construir la tabla de transiciones completa» para verlas todas."
+                        )
                     df = pd.DataFrame(rows)
                     st.dataframe(df, use_container_width=True)
 
-                dot = generar_grafo_automata_desde_json(data)
-                if dot:
-                    try:
-                        st.image("automata_input.png")
-                    except Exception:
-                        pass
+                if total <= MAX_ARISTAS_GRAFO:
+                    img_automata = generar_grafo_automata_desde_json(data, esperar=False)
+                    if img_automata:
+                        mostrar_grafo(img_automata)
+                else:
+                    st.info(f"El grafo no se dibuja: el autómata tiene {total} transiciones (máximo {MAX_ARISTAS_GRAFO}).")
+        mostrar_rendimiento(medicion)
 
 with tab3:
     st.header("Conversión entre Modelos")
@@ -494,6 +510,7 @@ Tú proporcionas la expresión o gramática, el sistema construye el modelo equi
         regex = st.text_input("Expresión regular:", key="regex_input")
 
         if st.button("Convertir Regex → AFD + Gramática Regular", key="convertir_regex"):
+            medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
             if not regex.strip():
                 st.warning("Escribe una expresión regular primero.")
             else:
@@ -501,12 +518,13 @@ Tú proporcionas la expresión o gramática, el sistema construye el modelo equi
                 if err:
                     st.error(err)
                 else:
-                    try:
-                        png = render_dfa_graphviz(dfa, filename="dfa_from_regex")
-                        st.subheader("AFD equivalente (gráfico)")
-                        st.image(png, caption="AFD generado desde la regex")
-                    except Exception as e:
-                        st.warning(f"No se pudo renderizar el grafo del AFD: {e}")
+                    if dfa.get("truncado"):
+                        st.warning(
+                            f"El AFD tiene más de {len(dfa['states'])} estados: "
+                            "se muestra una vista previa sin minimizar."
+                        )
+                    st.subheader("AFD equivalente (gráfico)")
+                    mostrar_grafo(render_dfa_graphviz(dfa, esperar=False), caption="AFD generado desde la regex")
                     rows = []
                     for origen, trans in dfa["transitions"].items():
                         for simbolo, destino in trans.items():
@@ -515,9 +533,17 @@ Tú proporcionas la expresión o gramática, el sistema construye el modelo equi
                         df = pd.DataFrame(rows)
                         st.markdown("**Tabla de transiciones (δ):**")
                         st.dataframe(df, use_container_width=True)
+                    st.download_button(
+                        "Descargar AFD (.afb, binario)",
+                        data=exportar_binario(dfa),
+                        file_name="afd.afb",
+                        mime="application/octet-stream",
+                        key="descargar_afb",
+                    )
                     st.subheader("📘 Gramática regular equivalente (A → aB | a)")
                     for r in reglas:
                         st.markdown(f"- `{r}`")
+            mostrar_rendimiento(medicion)
     with subtab_glc:
         st.subheader("Conversión: Gramática Libre de Contexto → PDA")
         glc_text = st.text_area(
@@ -526,8 +552,13 @@ Tú proporcionas la expresión o gramática, el sistema construye el modelo equi
             help="Una producción por línea. Usa -> o → y | para alternativas.",
             key="glc_input"
         )
+        cadena_pda = st.text_input(
+            "Cadena para simular en el PDA (opcional):",
+            key="cadena_pda"
+        )
 
         if st.button("Convertir GLC → PDA", key="convertir_glc"):
+            medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
             if not glc_text.strip():
                 st.warning("Pega una GLC para convertirla.")
             else:
@@ -542,11 +573,14 @@ Tú proporcionas la expresión o gramática, el sistema construye el modelo equi
                         st.dataframe(df, use_container_width=True)
                     else:
                         st.info("No se encontraron transiciones para mostrar.")
-                    try:
-                        png = render_pda_graphviz(pda, filename="pda_equivalente")
-                        st.image(png, caption="PDA equivalente")
-                    except Exception as e:
-                        st.warning(f"No se pudo renderizar el grafo del PDA: {e}")
+                    mostrar_grafo(render_pda_graphviz(pda, esperar=False), caption="PDA equivalente")
+                    if cadena_pda.strip():
+                        acepta, traza, msg_pda = simular_pda(pda, cadena_pda.strip())
+                        st.subheader("Simulación del PDA")
+                        (st.success if acepta else st.error)(msg_pda)
+                        if traza:
+                            st.dataframe(pd.DataFrame(traza), use_container_width=True)
+            mostrar_rendimiento(medicion)
 
 with tab4:
     st.header("Tutor Interactivo")
@@ -565,6 +599,7 @@ with tab4:
             from chomsky_classifier import clasificar_automata as _ca
             from tutor import new_automaton_question
             new_automaton_question(st.session_state, _ca)
+    medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
     ensure_question(st.session_state, clasificar_con_explicacion, clasificar_automata)
 
     kind, qtext, truth, expl, auto_data = get_current_question(st.session_state)
@@ -578,12 +613,14 @@ with tab4:
         st.code(qtext, language="json")
         try:
             if auto_data and all(k in auto_data for k in ("states", "transitions", "initial_state")):
-                dot = generar_grafo_automata_desde_json(auto_data)
-                if dot:
-                    st.image("automata_input.png", caption="Autómata de la pregunta")
+                img_pregunta = generar_grafo_automata_desde_json(auto_data, esperar=False)
+                if img_pregunta:
+                    mostrar_grafo(img_pregunta, caption="Autómata de la pregunta")
         except Exception:
             pass
 
+    mostrar_rendimiento(medicion)
+
     st.markdown("**Elige tu respuesta:**")
     opt_map = {
         "3": LABELS["3"],
@@ -624,9 +661,10 @@ with tab5:
     g1 = st.text_area("Gramática 1:", height=180, key="eq_g1")
     g2 = st.text_area("Gramática 2:", height=180, key="eq_g2")
 
-    max_len = st.slider("Longitud máxima de derivación:", 2, 10, 6)
+    max_len = st.slider("Longitud máxima de derivación:", 2, 14, 6)
 
     if st.button("Comparar", key="btn_comparar_gramaticas"):
+        medicion = registrar(medir_rendimiento, perfil_cprofile).iniciar()
         msg, L1, L2 = comparar_gramaticas(g1, g2, max_len)
         st.subheader("Resultado")
         st.info(msg)
@@ -637,4 +675,5 @@ with tab5:
             st.write(sorted(list(L1)))
         with colB:
             st.markdown("### Lenguaje estimado G2")
-            st.write(sorted(list(L2)))
\ No newline at end of file
+            st.write(sorted(list(L2)))
+        mostrar_rendimiento(medicion)
@@ -0,0 +1,437 @@
+from array import array
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from trazas import medido
+
+
+class AFNCompacto:
+    """
+    Autómata finito (DFA o NFA) normalizado a partir de cualquiera de los
+    formatos de la app:
+
+    - construir_automata_regular: start_state, alphabet, transitions {s: {a: [dest]}}
+    - regex_to_dfa / JSON pegado: initial_state, input_symbols, transitions {s: {a: dest}}
+
+    La clave "" en transitions se trata como transición ε.
+    """
+
+    def __init__(self, automata: dict):
+        inicial = automata.get("initial_state", automata.get("start_state"))
+        self.inicial = str(inicial)
+        self.finales: Set[str] = {
+            str(s) for s in automata.get("final_states", automata.get("accepting_states", []))
+        }
+        self.trans: Dict[str, Dict[str, Set[str]]] = {}
+        self.eps: Dict[str, Set[str]] = {}
+        alfabeto = set(str(a) for a in automata.get("input_symbols", automata.get("alphabet", [])))
+        for origen, movs in automata.get("transitions", {}).items():
+            origen = str(origen)
+            for simbolo, destino in movs.items():
+                destinos = destino if isinstance(destino, (list, tuple, set)) else [destino]
+                destinos = {str(d) for d in destinos}
+                if simbolo == "":
+                    self.eps.setdefault(origen, set()).update(destinos)
+                else:
+                    simbolo = str(simbolo)
+                    alfabeto.add(simbolo)
+                    self.trans.setdefault(origen, {}).setdefault(simbolo, set()).update(destinos)
+        self.alfabeto: List[str] = sorted(alfabeto)
+
+        nombres = {self.inicial} | self.finales | set(self.trans) | set(self.eps)
+        for movs in self.trans.values():
+            for destinos in movs.values():
+                nombres |= destinos
+        for destinos in self.eps.values():
+            nombres |= destinos
+        self.estados: List[str] = sorted(nombres)
+        self.indice: Dict[str, int] = {s: i for i, s in enumerate(self.estados)}
+        self.determinista = not self.eps and all(
+            len(destinos) <= 1 for movs in self.trans.values() for destinos in movs.values()
+        )
+        self.bits_trans: Optional[Dict[str, List[int]]] = None
+
+    def preparar_bits(self):
+        """
+        Tablas para manejar conjuntos de estados como máscaras de bits (int):
+        cierre[i] es la clausura ε del estado i y bits_trans[a][i] los
+        destinos de i con a, ya cerrados por ε. Se construyen una sola vez y
+        solo si hacen falta (un DFA no las necesita).
+        """
+        if self.bits_trans is not None:
+            return
+        self.cierre: List[int] = [self._mascara(self.clausura([s])) for s in self.estados]
+        bits_trans: Dict[str, List[int]] = {}
+        for a in self.alfabeto:
+            fila = [0] * len(self.estados)
+            for origen, movs in self.trans.items():
+                for d in movs.get(a, ()):
+                    fila[self.indice[origen]] |= self.cierre[self.indice[d]]
+            bits_trans[a] = fila
+        self.bits_finales = self._mascara(self.finales)
+        self.bits_inicial = self.cierre[self.indice[self.inicial]]
+        self.bits_trans = bits_trans
+
+    def _mascara(self, estados) -> int:
+        m = 0
+        for s in estados:
+            m |= 1 << self.indice[s]
+        return m
+
+    def mover_bits(self, estado: int, simbolo: str) -> int:
+        """Destinos (cerrados por ε) del conjunto de estados 'estado' con el símbolo."""
+        self.preparar_bits()
+        fila = self.bits_trans.get(simbolo)
+        if fila is None:
+            return 0
+        destino = 0
+        while estado:
+            bajo = estado & -estado
+            destino |= fila[bajo.bit_length() - 1]
+            estado ^= bajo
+        return destino
+
+    def nombres_de(self, estado: int) -> List[str]:
+        return [s for i, s in enumerate(self.estados) if estado >> i & 1]
+
+    def clausura(self, estados) -> FrozenSet[str]:
+        if not self.eps:
+            return frozenset(estados)
+        vistos = set(estados)
+        pila = list(estados)
+        while pila:
+            s = pila.pop()
+            for d in self.eps.get(s, ()):
+                if d not in vistos:
+                    vistos.add(d)
+                    pila.append(d)
+        return frozenset(vistos)
+
+
+class AFDPerezoso:
+    """
+    Determinización bajo demanda (construcción de subconjuntos): un estado
+    del DFA solo se calcula cuando alguien pide su transición. Cada estado
+    es la máscara de bits (int) de su subconjunto de estados del AFN; 0 es
+    el estado muerto.
+
+    Si el autómata ya es determinista no hace falta la construcción: los
+    estados son el índice + 1 de cada estado y la transición es una consulta
+    a tabla (las máscaras de un DFA grande serían enteros enormes).
+    """
+
+    def __init__(self, afn: AFNCompacto):
+        self.afn = afn
+        self._delta: Dict[Tuple[int, str], int] = {}
+        if afn.determinista:
+            n = len(afn.estados)
+            self._tabla: Dict[str, List[int]] = {}
+            for a in afn.alfabeto:
+                fila = [0] * (n + 1)
+                for origen, movs in afn.trans.items():
+                    for d in movs.get(a, ()):
+                        fila[afn.indice[origen] + 1] = afn.indice[d] + 1
+                self._tabla[a] = fila
+            self._finales = bytearray(n + 1)
+            for f in afn.finales:
+                self._finales[afn.indice[f] + 1] = 1
+            self.inicial = afn.indice[afn.inicial] + 1
+        else:
+            self._tabla = None
+            afn.preparar_bits()
+            self.inicial = afn.bits_inicial
+
+    def mover(self, estado: int, simbolo: str) -> int:
+        if self._tabla is not None:
+            fila = self._tabla.get(simbolo)
+            return fila[estado] if fila is not None else 0
+        clave = (estado, simbolo)
+        destino = self._delta.get(clave)
+        if destino is None:
+            destino = self._delta[clave] = self.afn.mover_bits(estado, simbolo)
+        return destino
+
+    def acepta(self, estado: int) -> bool:
+        if self._tabla is not None:
+            return bool(self._finales[estado])
+        return bool(estado & self.afn.bits_finales)
+
+
+@medido("construcción de subconjuntos")
+def determinizar(automata: dict, max_estados: Optional[int] = None) -> dict:
+    """
+    AFD equivalente a un AFN (formato de construir_automata_regular o de
+    regex_to_dfa) por construcción de subconjuntos.
+
+    Cada subconjunto es una máscara de bits y el diccionario ids (máscara →
+    número de estado) evita rehacer subconjuntos ya vistos; las transiciones
+    se guardan como una array('i') por símbolo (-1 = sin transición). El
+    resultado usa el formato de regex_to_dfa con estados q0, q1, ... en orden
+    BFS, sin estado sumidero, y "subconjuntos" con los estados del AFN que
+    representa cada uno. Con max_estados se detiene al alcanzarlos y marca
+    "truncado": True.
+    """
+    afn = AFNCompacto(automata)
+    afn.preparar_bits()
+    filas = [afn.bits_trans[a] for a in afn.alfabeto]
+    ids = {afn.bits_inicial: 0}
+    orden = [afn.bits_inicial]
+    delta = [array("i") for _ in afn.alfabeto]
+    truncado = False
+    i = 0
+    while i < len(orden):
+        estado = orden[i]
+        for k, fila in enumerate(filas):
+            destino = 0
+            resto = estado
+            while resto:
+                bajo = resto & -resto
+                destino |= fila[bajo.bit_length() - 1]
+                resto ^= bajo
+            j = ids.get(destino) if destino else -1
+            if j is None:
+                if max_estados is not None and len(orden) >= max_estados:
+                    truncado = True
+                    j = -1
+                else:
+                    j = ids[destino] = len(orden)
+                    orden.append(destino)
+            delta[k].append(j)
+        i += 1
+
+    transiciones: Dict[str, Dict[str, str]] = {}
+    for q in range(len(orden)):
+        transiciones[f"q{q}"] = {
+            a: f"q{delta[k][q]}" for k, a in enumerate(afn.alfabeto) if delta[k][q] >= 0
+        }
+    afd = {
+        "states": [f"q{q}" for q in range(len(orden))],
+        "input_symbols": list(afn.alfabeto),
+        "initial_state": "q0",
+        "final_states": [f"q{q}" for q, m in enumerate(orden) if m & afn.bits_finales],
+        "transitions": transiciones,
+        "subconjuntos": {f"q{q}": afn.nombres_de(m) for q, m in enumerate(orden)},
+    }
+    if truncado:
+        afd["truncado"] = True
+    return afd
+
+
+def _buscar(padre: dict, x):
+    raiz = x
+    while padre.setdefault(raiz, raiz) != raiz:
+        raiz = padre[raiz]
+    while padre[x] != raiz:
+        padre[x], x = raiz, padre[x]
+    return raiz
+
+
+def _unir(padre: dict, tamano: dict, r1, r2):
+    """Une dos raíces por tamaño: la clase menor cuelga de la mayor."""
+    t1, t2 = tamano.get(r1, 1), tamano.get(r2, 1)
+    if t1 > t2:
+        r1, r2 = r2, r1
+    padre[r1] = r2
+    tamano[r2] = t1 + t2
+
+
+@medido("equivalencia (Hopcroft–Karp)")
+def equivalencia_exacta(a1: dict, a2: dict) -> Tuple[bool, Optional[str]]:
+    """
+    Decide si dos autómatas finitos reconocen el mismo lenguaje.
+
+    Usa Hopcroft–Karp (unión-búsqueda por tamaño con compresión de caminos)
+    sobre los DFA obtenidos bajo demanda: solo se determinizan los estados
+    que el algoritmo visita, con coste casi lineal en su número. Si no son
+    equivalentes devuelve además una cadena distinguidora, reconstruida con
+    los punteros al padre del propio recorrido en anchura.
+    """
+    n1, n2 = AFNCompacto(a1), AFNCompacto(a2)
+    alfabeto = sorted(set(n1.alfabeto) | set(n2.alfabeto))
+    d1, d2 = AFDPerezoso(n1), AFDPerezoso(n2)
+
+    padre: dict = {}
+    tamano: dict = {}
+    inicio = (d1.inicial, d2.inicial)
+    _unir(padre, tamano, _buscar(padre, (1, d1.inicial)), _buscar(padre, (2, d2.inicial)))
+    previo = {inicio: None}
+    cola = deque([inicio])
+    while cola:
+        par = cola.popleft()
+        p, q = par
+        if d1.acepta(p) != d2.acepta(q):
+            letras = []
+            while previo[par] is not None:
+                par, a = previo[par]
+                letras.append(a)
+            return False, "".join(reversed(letras))
+        for a in alfabeto:
+            p2, q2 = d1.mover(p, a), d2.mover(q, a)
+            r1, r2 = _buscar(padre, (1, p2)), _buscar(padre, (2, q2))
+            if r1 != r2:
+                _unir(padre, tamano, r1, r2)
+                sig = (p2, q2)
+                previo.setdefault(sig, (par, a))
+                cola.append(sig)
+    return True, None
+
+
+def acepta_cadena(automata: dict, cadena: str) -> bool:
+    afd = AFDPerezoso(AFNCompacto(automata))
+    estado = afd.inicial
+    for ch in cadena:
+        estado = afd.mover(estado, ch)
+        if not estado:
+            return False
+    return afd.acepta(estado)
+
+
+@medido("minimización (Hopcroft)")
+def minimizar_afd(dfa_dict: dict) -> dict:
+    """
+    Minimiza un DFA (formato de regex_to_dfa) con el algoritmo de Hopcroft,
+    O(n·|Σ|·log n).
+
+    - Descarta estados inalcanzables y el estado sumidero (el DFA queda parcial).
+    - Renombra los estados como q0, q1, ... en orden BFS desde el inicial,
+      recorriendo los símbolos en orden; así dos DFA equivalentes producen
+      exactamente el mismo diccionario.
+    """
+    alfabeto = sorted(str(a) for a in dfa_dict.get("input_symbols", dfa_dict.get("alphabet", [])))
+    trans = dfa_dict.get("transitions", {})
+    for movs in trans.values():
+        for a in movs:
+            if str(a) not in alfabeto and a != "":
+                alfabeto.append(str(a))
+    alfabeto.sort()
+    finales_txt = {str(s) for s in dfa_dict.get("final_states", [])}
+    inicial_txt = str(dfa_dict.get("initial_state", dfa_dict.get("start_state")))
+
+    # Estados alcanzables numerados en orden BFS; el último índice es el sumidero.
+    ids = {inicial_txt: 0}
+    nombres = [inicial_txt]
+    delta: List[List[int]] = []
+    i = 0
+    while i < len(nombres):
+        movs = trans.get(nombres[i], {})
+        fila = []
+        for a in alfabeto:
+            d = movs.get(a)
+            if isinstance(d, (list, tuple)):
+                d = d[0] if d else None
+            if d is None:
+                fila.append(-1)
+                continue
+            d = str(d)
+            if d not in ids:
+                ids[d] = len(nombres)
+                nombres.append(d)
+            fila.append(ids[d])
+        delta.append(fila)
+        i += 1
+    sumidero = len(nombres)
+    n = sumidero + 1
+    delta = [[sumidero if d < 0 else d for d in fila] for fila in delta]
+    delta.append([sumidero] * len(alfabeto))
+    es_final = [nombres[s] in finales_txt for s in range(sumidero)] + [False]
+
+    inversa = [[[] for _ in range(n)] for _ in alfabeto]
+    for s in range(n):
+        for k, d in enumerate(delta[s]):
+            inversa[k][d].append(s)
+
+    # Partición refinable: cada bloque es un tramo [inicio, fin) de `elementos`
+    # y los estados marcados de un bloque se mueven a su principio, así que
+    # partir un bloque solo recorre la mitad menor.
+    elementos = [s for s in range(n) if es_final[s]] + [s for s in range(n) if not es_final[s]]
+    posicion = [0] * n
+    for i, s in enumerate(elementos):
+        posicion[s] = i
+    n_finales = sum(es_final)
+    inicio = [0, n_finales] if 0 < n_finales < n else [0]
+    fin = [n_finales, n] if 0 < n_finales < n else [n]
+    bloque_de = [0] * n
+    if len(inicio) == 2:
+        for s in elementos[n_finales:]:
+            bloque_de[s] = 1
+    marcados = [0] * len(inicio)
+    pendientes = set()
+    menor = min(range(len(inicio)), key=lambda b: fin[b] - inicio[b])
+    for k in range(len(alfabeto)):
+        pendientes.add((menor, k))
+
+    while pendientes:
+        b, k = pendientes.pop()
+        tocados = []
+        for t in elementos[inicio[b]:fin[b]]:
+            for s in inversa[k][t]:
+                y = bloque_de[s]
+                i = posicion[s]
+                j = inicio[y] + marcados[y]
+                if i < j:
+                    continue
+                if marcados[y] == 0:
+                    tocados.append(y)
+                otro = elementos[j]
+                elementos[i], elementos[j] = otro, s
+                posicion[otro], posicion[s] = i, j
+                marcados[y] += 1
+        for y in tocados:
+            m = marcados[y]
+            marcados[y] = 0
+            if m == fin[y] - inicio[y]:
+                continue
+            nuevo = len(inicio)
+            corte = inicio[y] + m
+            if m <= fin[y] - corte:
+                inicio.append(inicio[y])
+                fin.append(corte)
+                inicio[y] = corte
+            else:
+                inicio.append(corte)
+                fin.append(fin[y])
+                fin[y] = corte
+            marcados.append(0)
+            for s in elementos[inicio[nuevo]:fin[nuevo]]:
+                bloque_de[s] = nuevo
+            # La parte nueva es siempre la menor: basta con encolarla
+            # (si (y, c) ya estaba pendiente, ambas mitades quedan cubiertas).
+            for c in range(len(alfabeto)):
+                pendientes.add((nuevo, c))
+
+    muerto = bloque_de[sumidero]
+    canon = {bloque_de[0]: 0}
+    orden = [bloque_de[0]]
+    representante = {}
+    for s in range(n):
+        representante.setdefault(bloque_de[s], s)
+    i = 0
+    while i < len(orden):
+        rep = representante[orden[i]]
+        for k in range(len(alfabeto)):
+            b = bloque_de[delta[rep][k]]
+            if b != muerto and b not in canon:
+                canon[b] = len(orden)
+                orden.append(b)
+        i += 1
+
+    def nombre(b):
+        return f"q{canon[b]}"
+
+    transiciones: Dict[str, Dict[str, str]] = {}
+    for b in orden:
+        rep = representante[b]
+        movs = {}
+        for k, a in enumerate(alfabeto):
+            d = bloque_de[delta[rep][k]]
+            if d != muerto:
+                movs[a] = nombre(d)
+        transiciones[nombre(b)] = movs
+
+    return {
+        "states": [nombre(b) for b in orden],
+        "input_symbols": alfabeto,
+        "initial_state": nombre(orden[0]),
+        "final_states": [nombre(b) for b in orden if es_final[representante[b]]],
+        "transitions": transiciones,
+    }
@@ -0,0 +1,219 @@
+"""
+Benchmarks de las rutas lentas con cargas sintéticas escalables.
+
+    python benchmarks.py                                 # tamaños 10..10^4, imprime tabla
+    python benchmarks.py -o base.json                    # guarda la línea base
+    python benchmarks.py --comparar base.json            # compara y falla si hay regresiones
+    python benchmarks.py --tamanos 10 100 --solo regex_to_dfa
+
+Para cada función y tamaño (número de producciones, estados o longitud de
+la regex) se mide el mejor tiempo de --repeticiones ejecuciones con las
+cachés vaciadas, el rendimiento (elementos por segundo) y el pico de
+memoria con tracemalloc. Una ejecución que supera --limite segundos se
+interrumpe (donde hay SIGALRM) y los tamaños mayores de esa función se
+omiten.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import shutil
+import signal
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from automatas_finitos import equivalencia_exacta, minimizar_afd
+from cache_resultados import limpiar_caches
+from chomsky_classifier import (
+    clasificar_con_explicacion,
+    construir_automata_regular,
+    contar_derivaciones,
+    leer_gramatica,
+)
+from earley import analizar_ambiguedad, derivar
+from Equivalencias import comparar_gramaticas, generar_cadenas
+from generadores import afd_escalable, gramatica_escalable, regex_escalable
+from grammar_ir import compilar_gramatica
+from model_converters import compilar_regex, glc_to_pda, regex_to_dfa, render_dfa_graphviz
+
+TAMANOS = [10, 100, 1000, 10000]
+
+
+def _sin_cache(f: Callable) -> Callable:
+    """Función original bajo @cacheado, para medir el cálculo y no la caché."""
+    return getattr(f, "funcion", f)
+
+
+def _limpiar():
+    compilar_gramatica.cache_clear()
+    compilar_regex.cache_clear()
+    analizar_ambiguedad.cache_clear()
+    limpiar_caches()
+
+
+def _anbn(n: int) -> Tuple[str, str]:
+    """Gramática libre de tamaño n que además genera aⁿbⁿ, y una cadena de 40 símbolos."""
+    texto = gramatica_escalable(2, n, random.Random(n)) + "\nS -> aSb | ab"
+    return texto, "a" * 20 + "b" * 20
+
+
+# Cada caso: (nombre, preparar(n) -> argumentos, función, tamaño máximo razonable)
+CASOS: List[Tuple[str, Callable[[int], tuple], Callable, Optional[int]]] = [
+    ("leer_gramatica",
+     lambda n: (gramatica_escalable(2, n),), _sin_cache(leer_gramatica), None),
+    ("clasificar_con_explicacion",
+     lambda n: (gramatica_escalable(1, n),), _sin_cache(clasificar_con_explicacion), None),
+    ("construir_automata_regular",
+     lambda n: (gramatica_escalable(3, n),), _sin_cache(construir_automata_regular), None),
+    ("generar_cadenas",
+     lambda n: (leer_gramatica(gramatica_escalable(2, n)), 4), generar_cadenas, None),
+    ("derivacion_earley",
+     lambda n: (lambda t, w: (compilar_gramatica(t), w))(*_anbn(n)), derivar, None),
+    ("contar_derivaciones",
+     lambda n: _anbn(n), _sin_cache(contar_derivaciones), None),
+    ("glc_to_pda",
+     lambda n: (gramatica_escalable(2, n),), _sin_cache(glc_to_pda), None),
+    ("comparar_gramaticas",
+     lambda n: (gramatica_escalable(3, n, random.Random(1)), gramatica_escalable(3, n, random.Random(2)), 4),
+     _sin_cache(comparar_gramaticas), None),
+    ("regex_to_dfa",
+     lambda n: (regex_escalable(n),), _sin_cache(regex_to_dfa), None),
+    ("minimizar_afd",
+     lambda n: (afd_escalable(n),), minimizar_afd, None),
+    ("equivalencia_exacta",
+     lambda n: (afd_escalable(n, rnd=random.Random(1)), afd_escalable(n, rnd=random.Random(1))),
+     equivalencia_exacta, None),
+]
+
+if shutil.which("dot"):
+    CASOS.append(("render_dfa_graphviz",
+                  lambda n: (minimizar_afd(afd_escalable(n)),), render_dfa_graphviz, 1000))
+
+
+class _Agotado(Exception):
+    pass
+
+
+def _interrumpir(signum, frame):
+    raise _Agotado
+
+
+def _con_limite(limite: float, funcion: Callable, args: tuple):
+    if not hasattr(signal, "SIGALRM"):
+        return funcion(*args)
+    previo = signal.signal(signal.SIGALRM, _interrumpir)
+    signal.setitimer(signal.ITIMER_REAL, limite)
+    try:
+        return funcion(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previo)
+
+
+def medir(funcion: Callable, args: tuple, repeticiones: int, limite: float) -> Dict[str, float]:
+    mejor = float("inf")
+    try:
+        for _ in range(repeticiones):
+            _limpiar()
+            gc.collect()
+            t0 = time.perf_counter()
+            _con_limite(limite, funcion, args)
+            mejor = min(mejor, time.perf_counter() - t0)
+        _limpiar()
+        tracemalloc.start()
+        try:
+            _con_limite(limite, funcion, args)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except _Agotado:
+        return {"agotado": True, "limite": limite}
+    return {"segundos": mejor, "pico_bytes": pico}
+
+
+def ejecutar(tamanos: List[int], repeticiones: int, limite: float, solo: Optional[List[str]] = None) -> dict:
+    resultados: Dict[str, Dict[str, dict]] = {}
+    for nombre, preparar, funcion, maximo in CASOS:
+        if solo and nombre not in solo:
+            continue
+        serie = resultados.setdefault(nombre, {})
+        omitir = False
+        for n in tamanos:
+            if omitir or (maximo is not None and n > maximo):
+                serie[str(n)] = {"omitido": True}
+                continue
+            args = preparar(n)
+            m = medir(funcion, args, repeticiones, limite)
+            serie[str(n)] = m
+            if m.get("agotado"):
+                print(f"{nombre:28} n={n:<6} > {limite:g} s (interrumpido)", file=sys.stderr)
+                omitir = True
+                continue
+            m["por_segundo"] = n / m["segundos"] if m["segundos"] > 0 else None
+            print(f"{nombre:28} n={n:<6} {m['segundos'] * 1000:10.2f} ms"
+                  f" {m['pico_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+            omitir = m["segundos"] > limite / 10
+    return {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticiones": repeticiones,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(base: dict, actual: dict, tolerancia: float) -> List[str]:
+    """Lista de regresiones: tiempo actual / base > tolerancia."""
+    regresiones = []
+    for nombre, serie in actual["resultados"].items():
+        for n, m in serie.items():
+            previo = base.get("resultados", {}).get(nombre, {}).get(n)
+            if not previo or "segundos" not in previo:
+                continue
+            if "segundos" not in m:
+                print(f"{nombre:28} n={n:<6} ya no termina en {m.get('limite', '?')} s  REGRESIÓN")
+                regresiones.append(f"{nombre} n={n}: interrumpido")
+                continue
+            razon = m["segundos"] / max(previo["segundos"], 1e-9)
+            marca = "  REGRESIÓN" if razon > tolerancia else ""
+            print(f"{nombre:28} n={n:<6} x{razon:6.2f}{marca}")
+            if marca:
+                regresiones.append(f"{nombre} n={n}: x{razon:.2f}")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del clasificador y los conversores.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--limite", type=float, default=30.0,
+                        help="segundos máximos por ejecución; al superarlos se omiten los tamaños mayores")
+    parser.add_argument("--solo", nargs="+", help="nombres de casos a ejecutar")
+    parser.add_argument("-o", "--salida", help="guarda los resultados como JSON (línea base)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=1.5,
+                        help="razón de tiempos a partir de la cual se considera regresión")
+    args = parser.parse_args(argv)
+
+    actual = ejecutar(args.tamanos, args.repeticiones, args.limite, args.solo)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=2, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(base, actual, args.tolerancia)
+        if regresiones:
+            print(f"{len(regresiones)} regresiones: " + "; ".join(regresiones), file=sys.stderr)
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from almacen_resultados import AlmacenResultados, almacen_global
+from canonico import huella_gramatica
+from render_cache import cache_render
+from trazas import tramo
+
+
+def normalizar_texto(texto):
+    """Quita espacios al final de línea y líneas vacías: dos pegados iguales dan la misma clave."""
+    if not isinstance(texto, str):
+        return texto
+    return "\n".join(l.strip() for l in texto.strip().splitlines() if l.strip())
+
+
+def sin_normalizar(texto):
+    return texto
+
+
+def por_huella(texto):
+    """Clave por forma canónica: gramáticas que solo difieren en nombres u orden la comparten."""
+    return huella_gramatica(texto) if isinstance(texto, str) else texto
+
+
+class CacheResultados:
+    """
+    LRU con caducidad (TTL) para funciones puras con argumentos hashables.
+
+    - La clave son los argumentos, con los textos pasados por `normalizar`.
+    - Si varios hilos piden a la vez la misma clave, solo uno calcula y los
+      demás esperan su resultado (en clase, 40 alumnos con el mismo ejemplo
+      provocan un único cálculo).
+    - Se devuelven copias profundas para que nadie modifique lo guardado.
+    - Las excepciones no se guardan.
+    - Con `persistir` (una función canónica por argumento posicional) los
+      fallos consultan además el almacén SQLite compartido, si está activo
+      (ver almacen_resultados.almacen_global).
+    """
+
+    def __init__(self, funcion: Callable, max_entradas: int = 256, ttl: float = 3600.0,
+                 normalizar: Callable = normalizar_texto,
+                 persistir: Optional[Tuple[Callable, ...]] = None):
+        self.funcion = funcion
+        self.persistir = persistir
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.normalizar = normalizar
+        self._datos: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._en_curso: Dict[tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        functools.update_wrapper(self, funcion)
+
+    def _clave(self, args, kwargs) -> tuple:
+        norm = self.normalizar
+        return (tuple(norm(a) for a in args),
+                tuple(sorted((k, norm(v)) for k, v in kwargs.items())))
+
+    def _clave_persistente(self, args, kwargs) -> str:
+        canon = [f(a) if f else repr(a) for f, a in zip(self.persistir, args)]
+        canon += [repr(a) for a in args[len(self.persistir):]]
+        canon += [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
+        nombre = f"{self.funcion.__module__}.{self.funcion.__qualname__}"
+        return AlmacenResultados.clave(nombre, "\0".join(canon))
+
+    def _calcular(self, args, kwargs):
+        almacen = almacen_global() if self.persistir else None
+        if almacen is None:
+            return self.funcion(*args, **kwargs)
+        clave = self._clave_persistente(args, kwargs)
+        encontrado, valor = almacen.obtener(clave)
+        if not encontrado:
+            valor = self.funcion(*args, **kwargs)
+            almacen.guardar(clave, self.funcion.__qualname__, valor)
+        return valor
+
+    def _buscar(self, clave):
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return None
+        if entrada[0] < time.monotonic():
+            del self._datos[clave]
+            return None
+        self._datos.move_to_end(clave)
+        return entrada
+
+    def __call__(self, *args, **kwargs):
+        clave = self._clave(args, kwargs)
+        while True:
+            with self._lock:
+                entrada = self._buscar(clave)
+                if entrada is not None:
+                    self.aciertos += 1
+                    with tramo(f"{self.funcion.__qualname__} (caché)"):
+                        return copy.deepcopy(entrada[1])
+                evento = self._en_curso.get(clave)
+                if evento is None:
+                    self.fallos += 1
+                    evento = self._en_curso[clave] = threading.Event()
+                    break
+            evento.wait()
+        try:
+            with tramo(self.funcion.__qualname__):
+                valor = self._calcular(args, kwargs)
+            with self._lock:
+                self._datos[clave] = (time.monotonic() + self.ttl, valor)
+                self._datos.move_to_end(clave)
+                while len(self._datos) > self.max_entradas:
+                    self._datos.popitem(last=False)
+            return copy.deepcopy(valor)
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            evento.set()
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "función": self.funcion.__qualname__,
+                "módulo": self.funcion.__module__,
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+
+_REGISTRO: List[CacheResultados] = []
+
+
+def cacheado(max_entradas: int = 256, ttl: float = 3600.0, normalizar: Callable = normalizar_texto,
+             persistir: Optional[Tuple[Callable, ...]] = None):
+    """Decorador: memoriza la función en una CacheResultados registrada."""
+    def decorar(funcion):
+        cache = CacheResultados(funcion, max_entradas, ttl, normalizar, persistir)
+        _REGISTRO.append(cache)
+        return cache
+    return decorar
+
+
+def estadisticas_cache() -> List[dict]:
+    return [c.estadisticas() for c in _REGISTRO]
+
+
+def limpiar_caches():
+    """Vacía las cachés de resultados y la de imágenes de Graphviz."""
+    for c in _REGISTRO:
+        c.limpiar()
+    cache_render.limpiar()
@@ -0,0 +1,235 @@
+import hashlib
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from grammar_ir import EPSILON, GramaticaCompilada, compilar_gramatica
+
+# Nombres canónicos de no terminales: S para el inicial y después A, B, C, ...
+# Si hicieran falta más de 26 se siguen usando mayúsculas Unicode.
+LETRAS_NO_TERMINALES = "S" + "".join(chr(c) for c in range(0x41, 0x5B) if chr(c) != "S") + "".join(
+    chr(c) for c in range(0xC0, 0x2000) if chr(c).isupper() and len(chr(c).lower()) == 1
+)
+
+
+def huella(texto: str) -> str:
+    """Huella estable de 128 bits (BLAKE2b) en hexadecimal."""
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _orden_no_terminales(g: GramaticaCompilada) -> List[int]:
+    """
+    No terminales en orden de primer alcance BFS desde el inicial.
+
+    Las producciones de cada no terminal se recorren ordenadas por su forma,
+    donde los no terminales ya numerados cuentan por su número y los demás
+    por una firma independiente del nombre (las formas de sus producciones).
+    Los inalcanzables se numeran al final, en orden de firma.
+    """
+    es_nt, nom = g.es_nt, g.simbolos
+    propias: Dict[int, List[Tuple[Tuple[int, ...], Tuple[int, ...]]]] = {}
+    for lhs, rhs in g.producciones:
+        duenio = next((x for x in lhs if es_nt[x]), None)
+        if duenio is not None:
+            propias.setdefault(duenio, []).append((lhs, rhs))
+
+    def forma(simbolos):
+        return tuple((0, "") if es_nt[x] else (1, nom[x]) for x in simbolos)
+
+    firma = {
+        A: tuple(sorted((forma(lhs), forma(rhs)) for lhs, rhs in prods))
+        for A, prods in propias.items()
+    }
+    numero: Dict[int, int] = {}
+
+    def clave(x):
+        if not es_nt[x]:
+            return (2, nom[x])
+        if x in numero:
+            return (0, numero[x])
+        return (1, firma.get(x, ()))
+
+    def recorrer(A):
+        numero[A] = len(numero)
+        cola = deque([A])
+        while cola:
+            B = cola.popleft()
+            prods = sorted(propias.get(B, ()), key=lambda p: (tuple(map(clave, p[0])), tuple(map(clave, p[1]))))
+            for lhs, rhs in prods:
+                for x in lhs + rhs:
+                    if es_nt[x] and x not in numero:
+                        numero[x] = len(numero)
+                        cola.append(x)
+
+    if g.inicio is not None and es_nt[g.inicio]:
+        recorrer(g.inicio)
+    restantes = [x for x in range(len(nom)) if es_nt[x] and x not in numero]
+    restantes.sort(key=lambda x: (firma.get(x, ()), nom[x]))
+    for A in restantes:
+        if A not in numero:
+            recorrer(A)
+    return sorted(numero, key=numero.get)
+
+
+def canonizar_gramatica(texto: str) -> Tuple[str, str]:
+    """
+    Forma canónica de una gramática: no terminales renombrados S, A, B, ...
+    en orden BFS desde el inicial, producciones agrupadas por LHS y
+    ordenadas, un formato fijo "X -> α | β". Devuelve (texto, huella).
+
+    Dos gramáticas que solo difieren en nombres de no terminales, orden de
+    reglas, flechas o espacios dan el mismo texto; los terminales se
+    conservan porque cambiarlos cambiaría el lenguaje. Con empates entre no
+    terminales indistinguibles por su firma el resultado puede depender del
+    orden de entrada, pero dos textos iguales siempre son gramáticas
+    isomorfas.
+    """
+    g = compilar_gramatica(texto)
+    if g.vacia:
+        return "", huella("")
+    orden = _orden_no_terminales(g)
+    renombre = {A: LETRAS_NO_TERMINALES[i] for i, A in enumerate(orden)}
+
+    def escribir(simbolos):
+        return "".join(renombre.get(x, g.simbolos[x]) for x in simbolos)
+
+    grupos: Dict[str, List[str]] = {}
+    for (lhs, rhs), eps in zip(g.producciones, g.epsilon):
+        grupos.setdefault(escribir(lhs), []).append(EPSILON if eps else escribir(rhs))
+    inicial = escribir(g.inicio_lhs)
+    rango = {c: i for i, c in enumerate(LETRAS_NO_TERMINALES)}
+
+    def orden_lhs(izq):
+        return (izq != inicial, [(0, rango[c]) if c in rango else (1, c) for c in izq])
+
+    lineas = [
+        f"{izq} -> {' | '.join(sorted(grupos[izq]))}"
+        for izq in sorted(grupos, key=orden_lhs)
+    ]
+    canonico = "\n".join(lineas)
+    return canonico, huella(canonico)
+
+
+def huella_gramatica(texto: str) -> str:
+    return canonizar_gramatica(texto)[1]
+
+
+def _destinos(valor, es_mt: bool):
+    """
+    Recorre el valor de una transición y devuelve [(destino, etiqueta)].
+
+    - AFD: "q1"; AFN: ["q1", "q2"]
+    - PDA (formato de glc_to_pda): [{"to": ..., "pop": ..., "push": ...}]
+    - PDA anidado: {"Z": ...} (la clave pasa a la etiqueta)
+    - MT: ["q1", "escribe", "R"] o lista de esas ternas (NTM)
+    """
+    if isinstance(valor, dict):
+        if "to" in valor:
+            resto = tuple(sorted((str(k), json.dumps(v, sort_keys=True)) for k, v in valor.items() if k != "to"))
+            return [(str(valor["to"]), resto)]
+        res = []
+        for k, v in valor.items():
+            res.extend((d, (str(k),) + e) for d, e in _destinos(v, es_mt))
+        return res
+    if isinstance(valor, (list, tuple)):
+        if es_mt and valor and not isinstance(valor[0], (list, tuple, dict)):
+            return [(str(valor[0]), tuple(str(x) for x in valor[1:]))]
+        res = []
+        for v in valor:
+            res.extend(_destinos(v, es_mt))
+        return res
+    return [(str(valor), ())]
+
+
+def canonizar_automata(data: dict) -> Tuple[dict, str]:
+    """
+    Forma canónica de un autómata en JSON (AFD/AFN, PDA o MT): los estados se
+    renombran q0, q1, ... en orden BFS desde el inicial recorriendo los arcos
+    ordenados por (símbolo, etiqueta); los arcos y las listas de símbolos
+    quedan ordenados. Devuelve (dict canónico, huella).
+
+    Los PDA sin "to" (formato de glc_to_pda) se quedan en su estado de origen.
+    """
+    es_mt = any(k in data for k in ("tape_symbols", "blank_symbol"))
+    trans = data.get("transitions", {}) or {}
+    finales = {str(s) for s in data.get("final_states", data.get("accepting_states", [])) or []}
+    arcos: Dict[str, List[Tuple[str, tuple, str]]] = {}
+    for origen, movs in trans.items():
+        origen = str(origen)
+        lista = arcos.setdefault(origen, [])
+        if not isinstance(movs, dict):
+            continue
+        for simbolo, valor in movs.items():
+            if isinstance(valor, list) and valor and all(isinstance(v, dict) and "to" not in v for v in valor):
+                valor = [dict(v, to=origen) for v in valor]
+            for destino, etiqueta in _destinos(valor, es_mt):
+                lista.append((str(simbolo), etiqueta, destino))
+
+    estados = [str(s) for s in data.get("states", []) or []] + sorted(finales)
+    for origen, lista in arcos.items():
+        estados.append(origen)
+        estados.extend(d for _, _, d in lista)
+    inicial = data.get("initial_state", data.get("start_state"))
+    inicial = None if inicial is None else str(inicial)
+
+    firma = {
+        s: (s in finales, tuple(sorted((a, e) for a, e, _ in arcos.get(s, ()))))
+        for s in set(estados)
+    }
+    numero: Dict[str, int] = {}
+
+    def recorrer(q):
+        numero[q] = len(numero)
+        cola = deque([q])
+        while cola:
+            p = cola.popleft()
+            salientes = sorted(
+                arcos.get(p, ()),
+                key=lambda t: (t[0], t[1], (0, numero[t[2]]) if t[2] in numero else (1, firma[t[2]])),
+            )
+            for _, _, d in salientes:
+                if d not in numero:
+                    numero[d] = len(numero)
+                    cola.append(d)
+
+    if inicial is not None:
+        firma.setdefault(inicial, (inicial in finales, ()))
+        recorrer(inicial)
+    for s in sorted(firma, key=lambda s: (firma[s], s)):
+        if s not in numero:
+            recorrer(s)
+
+    def n(s):
+        return f"q{numero[s]}"
+
+    nuevos: Dict[str, Dict[str, list]] = {}
+    for origen in sorted(arcos, key=numero.get):
+        por_simbolo: Dict[str, list] = {}
+        for a, e, d in arcos[origen]:
+            por_simbolo.setdefault(a, []).append([n(d)] + list(e))
+        nuevos[n(origen)] = {a: sorted(v) for a, v in sorted(por_simbolo.items())}
+
+    canonico = {}
+    for k, v in data.items():
+        if k in ("states", "transitions", "initial_state", "start_state", "final_states", "accepting_states"):
+            continue
+        canonico[k] = sorted(map(str, v)) if isinstance(v, (list, tuple, set)) else v
+    canonico["states"] = [n(s) for s in sorted(numero, key=numero.get)]
+    if inicial is not None:
+        canonico["initial_state"] = n(inicial)
+    canonico["final_states"] = sorted((n(s) for s in finales if s in numero), key=lambda s: int(s[1:]))
+    canonico["transitions"] = nuevos
+    return canonico, huella(json.dumps(canonico, sort_keys=True, ensure_ascii=False, separators=(",", ":")))
+
+
+def huella_automata(data: dict) -> str:
+    return canonizar_automata(data)[1]
+
+
+def huella_automata_json(texto) -> Optional[str]:
+    """Huella de un autómata en texto JSON, o None si no es un objeto JSON válido."""
+    try:
+        data = json.loads(texto)
+    except (TypeError, ValueError):
+        return None
+    return huella_automata(data) if isinstance(data, dict) else None
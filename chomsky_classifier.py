@@ -1,5 +1,19 @@
 import graphviz
 import json
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import accumulate, islice
+from typing import Optional
+
+from automatas_finitos import determinizar
+from earley import analizar_ambiguedad, derivar
+from grammar_ir import compilar_gramatica, reglas_de_linea
+from almacen_resultados import clave_gramatica
+from formato_binario import AutomataBinario, cargar_binario
+from lectura_automatas import AutomataLeido, leer_automata
+from cache_resultados import cacheado, por_huella
+from render_cache import renderizar
+from trazas import medido, tramo
 
 try:
     from automata.fa.dfa import DFA
@@ -30,27 +44,9 @@ class ClasificadorGramaticas:
         Lee una gramática desde texto.
         Formato: una producción por línea, usando -> o → y | para alternativas.
         Sin espacios en símbolos, para trabajar por caracteres.
+        La lectura real la hace compilar_gramatica (representación compartida).
         """
-        gr = {}
-        for linea in texto.strip().split("\n"):
-            linea = linea.strip()
-            if not linea or ("->" not in linea and "→" not in linea):
-                continue
-
-            if "->" in linea:
-                izq, der = linea.split("->", 1)
-            else:
-                izq, der = linea.split("→", 1)
-
-            izq = izq.replace(" ", "")
-            prods = []
-            for p in der.split("|"):
-                p = p.strip()
-                if p != "ε":
-                    p = p.replace(" ", "")
-                prods.append(p)
-            gr.setdefault(izq, []).extend(prods)
-        return gr
+        return compilar_gramatica(texto).a_dict()
     def _es_regla_regular(self, izq: str, prod: str) -> bool:
         """
         Forma de gramática regular (flexible, derecha o izquierda):
@@ -79,58 +75,41 @@ class ClasificadorGramaticas:
 
         return False
 
-    def clasificar_con_explicacion(self, texto: str):
+    def _analizar_regla(self, izq: str, prod: str):
         """
-        Analiza todas las producciones y determina el tipo más restrictivo posible.
-        Devuelve:
-          - tipo (0,1,2,3)
-          - explicación general
-          - lista de mensajes explicativos (por producción)
+        Veredicto de una producción, que solo depende de su texto:
+        (LHS un solo no terminal, reduce longitud, forma regular, detalle).
         """
-        gr = self.leer_gramatica(texto)
-        pasos = []
-
-        all_regular = True
-        all_lhs_single_nt = True
-        no_reduce_length = True
-        forces_type0 = False
-
-        pasos.append("Inicio del análisis producción por producción:")
-
-        for izq, prods in gr.items():
-            for prod in prods:
-                detalle = f"Regla: {izq} → {prod}"
-                lhs_len = len(izq)
-                rhs_len = 0 if prod == "ε" else len(prod)
-                if lhs_len == 1 and self._is_nt(izq):
-                    detalle += " | LHS un solo no terminal (compatible con Tipos 3 y 2)."
-                else:
-                    all_lhs_single_nt = False
-                    detalle += " | LHS no es un solo no terminal (rompe Tipos 3 y 2)."
-
-                if prod == "ε":
-                    if lhs_len > 1:
-                        no_reduce_length = False
-                        forces_type0 = True
-                        detalle += " | ε con LHS múltiple → reducción → fuerza Tipo 0."
-                    else:
-                        detalle += " | ε aceptable en ciertos contextos (Tipo 2/3)."
-                else:
-                    if rhs_len < lhs_len:
-                        no_reduce_length = False
-                        forces_type0 = True
-                        detalle += " |RHS| < |LHS| → reducción → fuerza Tipo 0."
-                    else:
-                        detalle += " | Longitud OK (|RHS| ≥ |LHS|)."
-
-                if self._es_regla_regular(izq, prod):
-                    detalle += " | Forma compatible con Tipo 3."
-                else:
-                    all_regular = False
-                    detalle += " | Forma no es estrictamente regular."
-
-                pasos.append(detalle)
+        detalle = f"Regla: {izq} → {prod}"
+        lhs_simple = len(izq) == 1 and self._is_nt(izq)
+        if lhs_simple:
+            detalle += " | LHS un solo no terminal (compatible con Tipos 3 y 2)."
+        else:
+            detalle += " | LHS no es un solo no terminal (rompe Tipos 3 y 2)."
 
+        if prod == "ε":
+            reduce = len(izq) > 1
+            if reduce:
+                detalle += " | ε con LHS múltiple → reducción → fuerza Tipo 0."
+            else:
+                detalle += " | ε aceptable en ciertos contextos (Tipo 2/3)."
+        else:
+            reduce = len(prod) < len(izq)
+            if reduce:
+                detalle += " |RHS| < |LHS| → reducción → fuerza Tipo 0."
+            else:
+                detalle += " | Longitud OK (|RHS| ≥ |LHS|)."
+
+        regular = self._es_regla_regular(izq, prod)
+        if regular:
+            detalle += " | Forma compatible con Tipo 3."
+        else:
+            detalle += " | Forma no es estrictamente regular."
+        return lhs_simple, reduce, regular, detalle
+
+    def _veredicto(self, all_regular: bool, all_lhs_single_nt: bool, no_reduce_length: bool,
+                   forces_type0: bool, pasos: list):
+        """Tipo final a partir de los indicadores agregados; añade el último paso."""
         if forces_type0:
             pasos.append("Reducciones de longitud o LHS complejos → Clasificación final: Tipo 0.")
             return 0, "Gramática No Restringida (Tipo 0): viola restricciones de los tipos 1, 2 o 3.", pasos
@@ -150,11 +129,61 @@ class ClasificadorGramaticas:
         pasos.append("No encaja en 3, 2 o 1 → Clasificación final: Tipo 0.")
         return 0, "Gramática No Restringida (Tipo 0).", pasos
 
+    @medido("análisis de producciones")
+    def clasificar_con_explicacion(self, texto: str):
+        """
+        Analiza todas las producciones y determina el tipo más restrictivo posible.
+        Devuelve:
+          - tipo (0,1,2,3)
+          - explicación general
+          - lista de mensajes explicativos (por producción)
+
+        Los mensajes siguen el orden de las producciones en el texto (línea a
+        línea y, dentro de cada línea, alternativa a alternativa), no agrupados
+        por lado izquierdo; así coinciden con los de ClasificacionIncremental.
+        """
+        g = compilar_gramatica(texto)
+        pasos = []
+
+        all_regular = True
+        all_lhs_single_nt = True
+        no_reduce_length = True
+        forces_type0 = False
+
+        pasos.append("Inicio del análisis producción por producción:")
+
+        for izq, prod in g.textos:
+            lhs_simple, reduce, regular, detalle = self._analizar_regla(izq, prod)
+            all_lhs_single_nt &= lhs_simple
+            if reduce:
+                no_reduce_length = False
+                forces_type0 = True
+            all_regular &= regular
+            pasos.append(detalle)
+
+        return self._veredicto(all_regular, all_lhs_single_nt, no_reduce_length, forces_type0, pasos)
+
     def tipo_de_gramatica(self, texto: str):
         tipo, explicacion, _ = self.clasificar_con_explicacion(texto)
         return tipo, explicacion
 
-    def clasificar_automata(self, descripcion: str):
+    def _clasificar_binario(self, fuente):
+        """Autómata en formato binario (.afb): bytes, ruta ya cargada o AutomataBinario."""
+        pasos = []
+        try:
+            auto = fuente if isinstance(fuente, AutomataBinario) else cargar_binario(fuente)
+        except ValueError as e:
+            pasos.append(f"Error: {e}")
+            return None, "No se pudo leer el autómata en formato binario.", None, pasos
+        pasos.append(f"Formato binario válido: {len(auto.estados)} estados, {len(auto.simbolos)} símbolos.")
+        pasos.append("El formato binario solo almacena autómatas finitos (sin pila ni cinta).")
+        if auto.determinista:
+            pasos.append("Tabla de transición determinista (una fila por estado).")
+        else:
+            pasos.append("Transiciones no deterministas o con ε (listas de destinos por estado y símbolo).")
+        return 3, "🧠 Detectado como Autómata Finito (DFA/NFA) → Lenguaje de **Tipo 3** (regular).", auto.a_dict(), pasos
+
+    def clasificar_automata(self, descripcion: str, limite: Optional[int] = None):
         """
         Clasifica un autómata dado en JSON según su estructura
         y genera una explicación paso a paso.
@@ -170,60 +199,87 @@ class ClasificadorGramaticas:
         Devuelve:
         - tipo (0,1,2,3 o None)
         - explicación general
-        - data (dict con el JSON parseado)
+        - data (AutomataLeido: se usa como el dict del JSON y cada clave se
+          lee al pedirla, así que un error de sintaxis posterior a las claves
+          que decidieron el tipo aparece al leer esa parte; None si el JSON
+          no es válido)
         - pasos (lista de strings explicativos)
         """
-        pasos = []
-
+        if not isinstance(descripcion, str):
+            return self._clasificar_binario(descripcion)
         try:
-            data = json.loads(descripcion)
-            pasos.append("JSON válido: se pudo parsear correctamente.")
-        except json.JSONDecodeError:
-            pasos.append("Error: el texto ingresado no es un JSON válido.")
-            return None, "No se pudo interpretar el autómata como JSON. Revisa llaves, comas y comillas.", None, pasos
+            auto = leer_automata(descripcion, limite)
+        except ValueError as e:
+            return self._error_de_lectura(e)
+        tipo, explicacion, pasos, valido = self._clasificar_leido(auto)
+        return tipo, explicacion, auto if valido else None, pasos
 
-        claves = set(data.keys())
-        pasos.append(f"Claves detectadas: {', '.join(sorted(claves)) or '(ninguna)'}")
+    @staticmethod
+    def _error_de_lectura(error: ValueError):
+        return None, "No se pudo leer el autómata.", None, [f"Error: {error}"]
 
+    def _clasificar_leido(self, data: AutomataLeido):
+        """
+        (tipo, explicación, pasos, json_valido). Las claves se consultan en el
+        orden de la decisión y el JSON se lee solo hasta donde haga falta.
+        """
+        pasos = []
+        try:
+            with tramo("lectura de claves del JSON"):
+                tipo, explicacion = self._decidir_automata(data, pasos)
+                if tipo is None:
+                    data.claves()  # sin tipo no hay atajo: se valida el JSON entero
+        except json.JSONDecodeError:
+            pasos = ["Error: el texto ingresado no es un JSON válido."]
+            return None, "No se pudo interpretar el autómata como JSON. Revisa llaves, comas y comillas.", pasos, False
+        except ValueError as e:
+            return None, "No se pudo leer el autómata.", [f"Error: {e}"], False
+
+        claves = data.claves_leidas()
+        pasos[:0] = [
+            "JSON válido: se pudo parsear correctamente." if data.leido_entero else
+            "JSON leído por claves hasta tener las que deciden el tipo; el resto se lee solo si se pide.",
+            f"Claves detectadas: {', '.join(sorted(claves)) or '(ninguna)'}",
+        ]
+        return tipo, explicacion, pasos, True
+
+    def _decidir_automata(self, data: AutomataLeido, pasos: list):
         tipo_decl = str(data.get("type", "")).strip().lower()
         if tipo_decl:
             pasos.append(f"ℹCampo 'type' detectado: '{tipo_decl}' (solo como pista, no definitivo).")
 
         tiene_cinta = any(k in data for k in ("tape_symbols", "blank_symbol"))
-        tiene_pila = any(k in data for k in ("stack_symbols", "initial_stack_symbol"))
-        tiene_estados = "states" in data
-        tiene_trans = "transitions" in data
-        tiene_ini = "initial_state" in data
-        tiene_fins = ("final_states" in data) or ("accepting_states" in data)
-        tiene_alfabeto = "input_symbols" in data
-
         if tiene_cinta or "turing" in tipo_decl or tipo_decl == "tm":
             pasos.append("Se detectan campos de cinta o tipo TM/Turing → Máquina de Turing.")
-            return 0, "Detectado como Máquina de Turing → Lenguaje de **Tipo 0** (recursivamente enumerable).", data, pasos
+            return 0, "Detectado como Máquina de Turing → Lenguaje de **Tipo 0** (recursivamente enumerable)."
 
+        tiene_pila = any(k in data for k in ("stack_symbols", "initial_stack_symbol"))
         if tiene_pila or "pushdown" in tipo_decl or tipo_decl == "pda":
             pasos.append("Se detectan campos de pila o tipo PDA → Autómata con Pila.")
-            return 2, "Detectado como Autómata con Pila (PDA) → Lenguaje de **Tipo 2** (libre de contexto).", data, pasos
+            return 2, "Detectado como Autómata con Pila (PDA) → Lenguaje de **Tipo 2** (libre de contexto)."
         
         if "lba" in tipo_decl or "context_sensitive" in tipo_decl:
             pasos.append("'type' indica LBA/context_sensitive → Modelo sensible al contexto.")
-            return 1, "Detectado como modelo sensible al contexto (LBA) → Lenguaje de **Tipo 1**.", data, pasos
+            return 1, "Detectado como modelo sensible al contexto (LBA) → Lenguaje de **Tipo 1**."
 
-        if tiene_estados and tiene_trans and tiene_ini and tiene_fins and tiene_alfabeto:
+        # all() para en la primera clave que falta, sin seguir leyendo el JSON.
+        if all(k in data for k in ("states", "input_symbols", "transitions", "initial_state")) and (
+            "final_states" in data or "accepting_states" in data
+        ):
             pasos.append("🧠 Estructura clásica de autómata finito detectada (states, input_symbols, transitions, initial_state, final_states).")
-            return 3, "🧠 Detectado como Autómata Finito (DFA/NFA) → Lenguaje de **Tipo 3** (regular).", data, pasos
+            return 3, "🧠 Detectado como Autómata Finito (DFA/NFA) → Lenguaje de **Tipo 3** (regular)."
 
         if tipo_decl in ("dfa", "nfa"):
             pasos.append("ℹ'type' = DFA/NFA, aunque falten algunos campos → asumido autómata finito.")
-            return 3, "Indicador 'type' = DFA/NFA → asumido Lenguaje de **Tipo 3** (regular).", data, pasos
+            return 3, "Indicador 'type' = DFA/NFA → asumido Lenguaje de **Tipo 3** (regular)."
 
         if tipo_decl == "pda":
             pasos.append("ℹ'type' = PDA sin estructura completa → asumido PDA.")
-            return 2, "Indicador 'type' = PDA → asumido Lenguaje de **Tipo 2**.", data, pasos
+            return 2, "Indicador 'type' = PDA → asumido Lenguaje de **Tipo 2**."
 
         if tipo_decl in ("tm", "turing"):
             pasos.append("ℹ'type' = TM/Turing sin cinta explícita → asumida Máquina de Turing.")
-            return 0, "Indicador 'type' = TM/Turing → asumido Lenguaje de **Tipo 0**.", data, pasos
+            return 0, "Indicador 'type' = TM/Turing → asumido Lenguaje de **Tipo 0**."
 
         pasos.append("No hay suficiente información estructural para clasificar el autómata.")
         pasos.append(
@@ -236,9 +292,9 @@ class ClasificadorGramaticas:
         return None, (
             "No se pudo determinar automáticamente el tipo de autómata.\n"
             "Revisa la estructura o agrega más información."
-        ), data, pasos
+        )
 
-    def generar_grafo_automata_desde_json(self, data: dict):
+    def generar_grafo_automata_desde_json(self, data: dict, esperar: bool = True):
         if not all(k in data for k in ("states", "transitions", "initial_state")):
             return None
 
@@ -247,52 +303,52 @@ class ClasificadorGramaticas:
         final_states = data.get("final_states", data.get("accepting_states", []))
         initial_state = data["initial_state"]
 
-        dot = graphviz.Digraph(format="png")
-        dot.attr(rankdir="LR")
-        dot.node("ini", shape="point")
+        with tramo("generación DOT"):
+            dot = graphviz.Digraph(format="png")
+            dot.attr(rankdir="LR")
+            dot.node("ini", shape="point")
 
-        for s in states:
-            if s in final_states:
-                dot.node(str(s), shape="doublecircle")
-            else:
-                dot.node(str(s), shape="circle")
+            for s in states:
+                if s in final_states:
+                    dot.node(str(s), shape="doublecircle")
+                else:
+                    dot.node(str(s), shape="circle")
 
-        dot.edge("ini", str(initial_state))
+            dot.edge("ini", str(initial_state))
 
-        for origen, trans in transitions.items():
-            for simbolo, destino in trans.items():
-                if isinstance(destino, list):
-                    for d in destino:
-                        dot.edge(str(origen), str(d), label=str(simbolo))
-                else:
-                    dot.edge(str(origen), str(destino), label=str(simbolo))
+            for origen, trans in transitions.items():
+                for simbolo, destino in trans.items():
+                    if isinstance(destino, list):
+                        for d in destino:
+                            dot.edge(str(origen), str(d), label=str(simbolo))
+                    else:
+                        dot.edge(str(origen), str(destino), label=str(simbolo))
 
-        dot.render("automata_input", cleanup=True)
-        return dot
+        return renderizar(dot, esperar=esperar)
     
+    @medido("construcción del autómata regular")
     def construir_automata_regular(self, texto: str):
         tipo, _, _ = self.clasificar_con_explicacion(texto)
         if tipo != 3:
             return None
 
-        gr = self.leer_gramatica(texto)
-        start = next(iter(gr.keys()))
+        g = compilar_gramatica(texto)
+        nom = g.simbolos
+        start = nom[g.inicio]
         transitions = {}
         final_states = set()
         sink_final = "F"
 
-        for A, prods in gr.items():
-            transitions.setdefault(A, {})
-            for prod in prods:
-                if prod == "ε":
-                    final_states.add(A)
-                elif len(prod) == 1 and self._is_t(prod[0]):
-                    a = prod[0]
-                    transitions[A].setdefault(a, set()).add(sink_final)
+        for A, prods in g.prods_de.items():
+            trans_A = transitions.setdefault(nom[A], {})
+            for rhs in prods:
+                if not rhs:
+                    final_states.add(nom[A])
+                elif len(rhs) == 1 and g.es_t[rhs[0]]:
+                    trans_A.setdefault(nom[rhs[0]], set()).add(sink_final)
                     final_states.add(sink_final)
-                elif len(prod) == 2 and self._is_t(prod[0]) and self._is_nt(prod[1]):
-                    a, B = prod[0], prod[1]
-                    transitions[A].setdefault(a, set()).add(B)
+                elif len(rhs) == 2 and g.es_t[rhs[0]] and g.es_nt[rhs[1]]:
+                    trans_A.setdefault(nom[rhs[0]], set()).add(nom[rhs[1]])
 
         states = set(transitions.keys()) | final_states
         alphabet = sorted({a for trans in transitions.values() for a in trans.keys()})
@@ -309,81 +365,70 @@ class ClasificadorGramaticas:
             "transitions": trans_clean,
         }
 
-    def generar_grafo_automata(self, automata: dict):
-        dot = graphviz.Digraph(format="png")
-        dot.attr(rankdir="LR")
-        dot.node("ini", shape="point")
+    def construir_afd_regular(self, texto: str, max_estados: int = 5000):
+        """AFD (construcción de subconjuntos) del autómata de construir_automata_regular."""
+        automata = self.construir_automata_regular(texto)
+        if automata is None:
+            return None
+        return determinizar(automata, max_estados)
 
-        for s in automata["states"]:
-            if s in automata["final_states"]:
-                dot.node(str(s), shape="doublecircle")
-            else:
-                dot.node(str(s), shape="circle")
+    def generar_grafo_automata(self, automata: dict, esperar: bool = True):
+        with tramo("generación DOT"):
+            dot = graphviz.Digraph(format="png")
+            dot.attr(rankdir="LR")
+            dot.node("ini", shape="point")
 
-        dot.edge("ini", str(automata["start_state"]))
+            for s in automata["states"]:
+                if s in automata["final_states"]:
+                    dot.node(str(s), shape="doublecircle")
+                else:
+                    dot.node(str(s), shape="circle")
 
-        for origen, trans in automata["transitions"].items():
-            for simbolo, destinos in trans.items():
-                for dest in destinos:
-                    dot.edge(str(origen), str(dest), label=str(simbolo))
+            dot.edge("ini", str(automata["start_state"]))
 
-        dot.render("automata", cleanup=True)
-        return dot
+            for origen, trans in automata["transitions"].items():
+                for simbolo, destinos in trans.items():
+                    for dest in destinos:
+                        dot.edge(str(origen), str(dest), label=str(simbolo))
 
-    def generar_arbol_derivacion(self, texto: str, cadena: str):
+        return renderizar(dot, esperar=esperar)
+
+    def generar_arbol_derivacion(self, texto: str, cadena: str, indice: int = None, esperar: bool = True):
+        """
+        Derivación por la izquierda de la cadena en formato pasos_tabla,
+        junto con la imagen PNG (bytes, o su Future si esperar=False).
+        Con indice = k se devuelve el k-ésimo árbol del bosque de análisis
+        (ver contar_derivaciones) en lugar del primero que encuentra Earley.
+        """
         cadena = cadena.strip()
         if not cadena:
-            return None, "Ingresa una cadena para construir el árbol."
-
-        gr = self.leer_gramatica(texto)
-        start = next(iter(gr.keys()))
-
-        for izq in gr.keys():
-            if len(izq) != 1 or not self._is_nt(izq):
-                return None, "El árbol solo se genera para gramáticas con producciones A → α (LHS con un solo no terminal)."
-
-        max_pasos = 40
-
-        def dfs(sentential, pasos):
-            if len(pasos) > max_pasos:
-                return None
-
-            if all(self._is_t(c) for c in sentential):
-                if "".join(sentential) == cadena:
-                    return pasos
-                return None
-
-            for i, c in enumerate(sentential):
-                if self._is_nt(c):
-                    A = c
-                    for prod in gr.get(A, []):
-                        nueva = (
-                            sentential[:i]
-                            + ([] if prod == "ε" else list(prod))
-                            + sentential[i + 1:]
-                        )
-                        r = dfs(
-                            nueva,
-                            pasos + [( "".join(sentential), A, prod, "".join(nueva) )]
-                        )
-                        if r is not None:
-                            return r
-                    return None
-            return None
-        deriv = dfs([start], [])
+            return None, "Ingresa una cadena para construir el árbol.", None
+
+        g = compilar_gramatica(texto)
+        if g.vacia:
+            return None, f"No se pudo derivar la cadena '{cadena}' con esta gramática.", None
+        if not g.libre_de_contexto:
+            return None, "El árbol solo se genera para gramáticas con producciones A → α (LHS con un solo no terminal).", None
+        start = g.simbolos[g.inicio]
+
+        if indice is None:
+            deriv = derivar(g, cadena)
+        else:
+            deriv = analizar_ambiguedad(g, cadena).derivacion(indice)
         if deriv is None:
-            return None, f"No se pudo derivar la cadena '{cadena}' con esta gramática."
-        dot = graphviz.Digraph(format="png")
-        dot.attr(rankdir="TB")
-        dot.node("s0", start)
+            return None, f"No se pudo derivar la cadena '{cadena}' con esta gramática.", None
+        with tramo("generación DOT"):
+            dot = graphviz.Digraph(format="png")
+            dot.attr(rankdir="TB")
+            dot.node("s0", start)
 
-        for idx, (antes, A, prod, despues) in enumerate(deriv, start=0):
-            src = f"s{idx}"
-            dst = f"s{idx+1}"
-            dot.node(dst, despues)
-            dot.edge(src, dst, label=f"{A}→{prod}")
+            for idx, (antes, A, prod, despues) in enumerate(deriv, start=0):
+                src = f"s{idx}"
+                dst = f"s{idx+1}"
+                dot.node(dst, despues)
+                dot.edge(src, dst, label=f"{A}→{prod}")
 
-        dot.render("derivacion", cleanup=True)
+        imagen = renderizar(dot, esperar=esperar)
 
         pasos_tabla = []
         for i, (antes, A, prod, despues) in enumerate(deriv, start=1):
@@ -394,41 +439,279 @@ class ClasificadorGramaticas:
                 "Sentencia después": despues,
             })
 
-        return pasos_tabla, None
+        return pasos_tabla, None, imagen
 
-    def generar_grafo(self, gr):
-        dot = graphviz.Digraph(format="png")
-        for izq, prods in gr.items():
-            for prod in prods:
-                dot.edge(izq, prod)
-        dot.render("gramatica", cleanup=True)
-        return dot
+    def contar_derivaciones(self, texto: str, cadena: str):
+        """
+        Cuenta los árboles de derivación de la cadena sin enumerarlos.
+        Devuelve (total, infinitas, mensaje); total cuenta las derivaciones
+        sin ciclos e infinitas indica si además hay ciclos (p. ej. S → SS | ε).
+        """
+        cadena = cadena.strip()
+        g = compilar_gramatica(texto)
+        if g.vacia or not g.libre_de_contexto:
+            return 0, False, "Solo se cuentan derivaciones en gramáticas con producciones A → α."
+        bosque = analizar_ambiguedad(g, cadena)
+        if bosque.total == 0:
+            return 0, False, f"La cadena '{cadena}' no pertenece al lenguaje."
+        if bosque.infinitas:
+            msg = (f"Ambigua: infinitas derivaciones por ciclos ε/unitarios; "
+                   f"{bosque.total} sin ciclos.")
+        elif bosque.total > 1:
+            msg = f"Ambigua: {bosque.total} derivaciones."
+        else:
+            msg = "No ambigua para esta cadena: 1 derivación."
+        return bosque.total, bosque.infinitas, msg
+
+    def generar_grafo(self, gr, esperar: bool = True):
+        with tramo("generación DOT"):
+            dot = graphviz.Digraph(format="png")
+            for izq, prods in gr.items():
+                for prod in prods:
+                    dot.edge(izq, prod)
+        return renderizar(dot, esperar=esperar)
 
 clasificador = ClasificadorGramaticas()
 
+@cacheado()
 def leer_gramatica(texto: str):
     return clasificador.leer_gramatica(texto)
 
+@cacheado(normalizar=por_huella, persistir=(por_huella,))
 def tipo_de_gramatica(texto: str):
     return clasificador.tipo_de_gramatica(texto)
 
+@cacheado(persistir=(clave_gramatica,))
 def clasificar_con_explicacion(texto: str):
     return clasificador.clasificar_con_explicacion(texto)
 
+@cacheado(persistir=(clave_gramatica,))
 def construir_automata_regular(texto: str):
     return clasificador.construir_automata_regular(texto)
 
-def generar_grafo_automata(automata: dict):
-    return clasificador.generar_grafo_automata(automata)
-
-def generar_arbol_derivacion(texto: str, cadena: str):
-    return clasificador.generar_arbol_derivacion(texto, cadena)
-
-def generar_grafo(gramatica: dict):
-    return clasificador.generar_grafo(gramatica)
+@cacheado(persistir=(clave_gramatica,))
+def construir_afd_regular(texto: str):
+    return clasificador.construir_afd_regular(texto)
+
+def generar_grafo_automata(automata: dict, esperar: bool = True):
+    return clasificador.generar_grafo_automata(automata, esperar)
+
+def generar_arbol_derivacion(texto: str, cadena: str, indice: int = None, esperar: bool = True):
+    return clasificador.generar_arbol_derivacion(texto, cadena, indice, esperar)
+
+@cacheado(persistir=(clave_gramatica, str.strip))
+def contar_derivaciones(texto: str, cadena: str):
+    return clasificador.contar_derivaciones(texto, cadena)
+
+def generar_grafo(gramatica: dict, esperar: bool = True):
+    return clasificador.generar_grafo(gramatica, esperar)
+
+def _huella_automata(auto):
+    return auto.huella if isinstance(auto, AutomataLeido) else auto
+
+# Se guarda solo (tipo, explicación, pasos, válido) bajo la huella del texto: ni
+# la clave ni el valor retienen el JSON, y un acierto no lo decodifica.
+@cacheado(normalizar=_huella_automata, persistir=(_huella_automata,))
+def _clasificar_leido(auto: AutomataLeido):
+    return clasificador._clasificar_leido(auto)
+
+def clasificar_automata(descripcion, limite: Optional[int] = None):
+    """JSON (str, con caché) o formato binario (bytes / AutomataBinario)."""
+    if not isinstance(descripcion, str):
+        return clasificador.clasificar_automata(descripcion)
+    try:
+        auto = leer_automata(descripcion, limite)
+    except ValueError as e:
+        return clasificador._error_de_lectura(e)
+    tipo, explicacion, pasos, valido = _clasificar_leido(auto)
+    return tipo, explicacion, auto if valido else None, pasos
+
+def generar_grafo_automata_desde_json(data: dict, esperar: bool = True):
+    return clasificador.generar_grafo_automata_desde_json(data, esperar)
+
+
+def _prefijo_comun(a: str, b: str) -> int:
+    """Longitud del prefijo común; búsqueda binaria con comparaciones en C (O(log n) pasos)."""
+    bajo, alto = 0, min(len(a), len(b))
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a.startswith(b[bajo:medio], bajo):
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def _sufijo_comun(a: str, b: str, maximo: int) -> int:
+    """Longitud del sufijo común, como mucho `maximo`."""
+    bajo, alto = 0, min(maximo, len(a), len(b))
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a.endswith(b[len(b) - medio:len(b) - bajo], 0, len(a) - bajo):
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+class PasosIncrementales(Sequence):
+    """
+    Vista de solo lectura de los pasos de ClasificacionIncremental: cabecera,
+    detalles por bloques de líneas y pasos del veredicto. Se crea copiando
+    solo la lista de bloques (que nunca se modifican en su sitio), así que
+    sigue siendo válida tras la siguiente actualización.
+    """
 
-def clasificar_automata(descripcion: str):
-    return clasificador.clasificar_automata(descripcion)
+    def __init__(self, cabecera: list, bloques: list, cuentas: list, final: list):
+        self._cabecera, self._bloques, self._cuentas, self._final = cabecera, list(bloques), list(cuentas), final
+        self._largo = len(cabecera) + sum(self._cuentas) + len(final)
+
+    def __len__(self) -> int:
+        return self._largo
+
+    def __iter__(self):
+        yield from self._cabecera
+        for bloque in self._bloques:
+            for _, analisis in bloque:
+                for regla in analisis:
+                    yield regla[3]
+        yield from self._final
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(islice(self, *i.indices(self._largo)))
+        if i < 0:
+            i += self._largo
+        if not 0 <= i < self._largo:
+            raise IndexError(i)
+        if i < len(self._cabecera):
+            return self._cabecera[i]
+        i -= len(self._cabecera)
+        for bloque, cuenta in zip(self._bloques, self._cuentas):
+            if i < cuenta:
+                for _, analisis in bloque:
+                    if i < len(analisis):
+                        return analisis[i][3]
+                    i -= len(analisis)
+            i -= cuenta
+        return self._final[i]
+
+    def __eq__(self, otra):
+        return isinstance(otra, (list, PasosIncrementales)) and list(self) == list(otra)
+
+
+class ClasificacionIncremental:
+    """
+    Clasificación de una gramática que se edita: guarda el análisis de cada
+    línea y, en cada actualizar(texto), solo reanaliza las líneas que
+    cambiaron respecto al texto anterior.
+
+    El tramo cambiado se localiza comparando el texto nuevo con el anterior
+    (prefijo y sufijo comunes por búsqueda binaria, comparaciones en C) y
+    contando saltos de línea con str.count. Las líneas se guardan en bloques
+    de BLOQUE con su número de pasos, de modo que situar una línea y empalmar
+    el tramo cuesta O(líneas / BLOQUE) en operaciones de listas más
+    O(BLOQUE + cambio) en Python. Los indicadores agregados se mantienen con
+    contadores y los pasos se devuelven como una vista (PasosIncrementales),
+    sin copiar la lista. Los pasos coinciden con los de
+    clasificar_con_explicacion(texto).
+    """
 
-def generar_grafo_automata_desde_json(data: dict):
-    return clasificador.generar_grafo_automata_desde_json(data)
+    BLOQUE = 64
+
+    def __init__(self, clasificador_base: ClasificadorGramaticas = None):
+        self.clasificador = clasificador_base or clasificador
+        self.texto = None      # texto anterior (sin espacios en los extremos)
+        self.bloques = []      # bloques de [(línea, [(lhs_simple, reduce, regular, detalle)])]
+        self.cuentas = []      # pasos (alternativas) de cada bloque
+        self.n_lineas = 0
+        self.cabecera = ["Inicio del análisis producción por producción:"]
+        self.lhs_complejos = 0
+        self.reducciones = 0
+        self.no_regulares = 0
+        self.reanalizadas = 0  # líneas analizadas en la última actualización
+        self._resultado = None
+
+    def _sumar(self, analisis_linea, signo: int):
+        for lhs_simple, reduce, regular, _ in analisis_linea:
+            self.lhs_complejos += signo * (not lhs_simple)
+            self.reducciones += signo * reduce
+            self.no_regulares += signo * (not regular)
+
+    def _analizar_linea(self, linea: str):
+        return [self.clasificador._analizar_regla(izq, der) for izq, der in reglas_de_linea(linea)]
+
+    def _tramo(self, viejo: str, nuevo: str):
+        """(ini, quitar, inicio, final): líneas [ini, ini+quitar) del texto viejo se sustituyen por nuevo[inicio:final]."""
+        p = _prefijo_comun(viejo, nuevo)
+        s = _sufijo_comun(viejo, nuevo, min(len(viejo), len(nuevo)) - p)
+        ini = viejo.count("\n", 0, p)
+        fin = viejo.count("\n", len(viejo) - s)
+        inicio = viejo.rfind("\n", 0, p) + 1
+        final = nuevo.find("\n", len(nuevo) - s) if fin else len(nuevo)
+        return ini, self.n_lineas - fin - ini, inicio, final
+
+    def _bloque_de(self, linea: int):
+        """(índice del bloque, línea dentro del bloque) con linea < n_lineas, o el final."""
+        acumuladas = list(accumulate(map(len, self.bloques)))
+        b = bisect_right(acumuladas, linea)
+        return b, linea - (acumuladas[b - 1] if b else 0)
+
+    @medido("análisis incremental de producciones")
+    def actualizar(self, texto: str):
+        """Mismo resultado que clasificar_con_explicacion: (tipo, explicación, pasos)."""
+        texto = texto.strip()
+        if texto == self.texto and self._resultado is not None:
+            self.reanalizadas = 0
+            return self._resultado
+        if self.texto is None:
+            ini, quitar, inicio, final = 0, 0, 0, len(texto)
+        else:
+            ini, quitar, inicio, final = self._tramo(self.texto, texto)
+
+        # Bloques afectados: desde el que contiene la línea ini hasta el de la última quitada.
+        b0, desde = self._bloque_de(ini)
+        b1, hasta = self._bloque_de(ini + quitar - 1) if quitar else (b0, desde - 1)
+        b1 = min(b1, len(self.bloques) - 1)
+        afectadas = [par for bloque in self.bloques[b0:b1 + 1] for par in bloque]
+
+        quitadas = {}
+        for linea, analisis in afectadas[desde:desde + quitar]:
+            self._sumar(analisis, -1)
+            quitadas[linea] = analisis
+        puestas = []
+        self.reanalizadas = 0
+        for linea in texto[inicio:final].split("\n"):
+            linea = linea.strip()
+            analisis = quitadas.get(linea)
+            if analisis is None:
+                analisis = self._analizar_linea(linea)
+                self.reanalizadas += 1
+            self._sumar(analisis, 1)
+            puestas.append((linea, analisis))
+        afectadas[desde:desde + quitar] = puestas
+
+        # Bloques de entre BLOQUE/2 y 1,5·BLOQUE líneas: si el tramo queda corto se une a un vecino.
+        while len(afectadas) < self.BLOQUE // 2 and b1 + 1 < len(self.bloques):
+            b1 += 1
+            afectadas += self.bloques[b1]
+        while len(afectadas) < self.BLOQUE // 2 and b0 > 0:
+            b0 -= 1
+            afectadas[:0] = self.bloques[b0]
+        partes = max(1, round(len(afectadas) / self.BLOQUE))
+        cortes = [len(afectadas) * k // partes for k in range(partes + 1)]
+        nuevos = [afectadas[i:j] for i, j in zip(cortes, cortes[1:])]
+        self.bloques[b0:b1 + 1] = nuevos
+        self.cuentas[b0:b1 + 1] = [sum(len(a) for _, a in bloque) for bloque in nuevos]
+        self.n_lineas += len(puestas) - quitar
+        self.texto = texto
+
+        tipo, explicacion, final_pasos = self.clasificador._veredicto(
+            all_regular=self.no_regulares == 0,
+            all_lhs_single_nt=self.lhs_complejos == 0,
+            no_reduce_length=self.reducciones == 0,
+            forces_type0=self.reducciones > 0,
+            pasos=[],
+        )
+        self._resultado = tipo, explicacion, PasosIncrementales(self.cabecera, self.bloques, self.cuentas, final_pasos)
+        return self._resultado
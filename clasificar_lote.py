@@ -0,0 +1,187 @@
+"""
+Clasificación masiva de gramáticas y autómatas desde la línea de comandos.
+
+Entrada (una de):
+  - archivo JSONL (o "-" para stdin), una línea por elemento:
+        {"id": "a1", "gramatica": "S -> aS | b"}
+        {"id": "a2", "automata": {...}}      (objeto o texto JSON)
+        "S -> aS | b"                        (cadena suelta = gramática)
+        {"states": [...], ...}               (objeto suelto = autómata)
+  - directorio: cada *.json es un autómata (*.afb, en formato binario) y
+    el resto de archivos son gramáticas; el id es la ruta relativa.
+
+Salida: JSONL en el mismo orden que la entrada (stdout o --salida).
+
+    python clasificar_lote.py envios.jsonl -o resultados.jsonl -j 8 --convertir
+
+El trabajo se reparte en lotes entre procesos y solo se mantiene en vuelo
+un número acotado de lotes, así que la memoria no depende del tamaño del
+corpus.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Tuple
+
+from formato_binario import cargar_binario
+
+Elemento = Tuple[str, str, object]  # (id, "gramatica" | "automata" | "error", contenido)
+
+
+def _leer_jsonl(ruta: str) -> Iterator[Elemento]:
+    archivo = sys.stdin if ruta == "-" else open(ruta, encoding="utf-8")
+    try:
+        for n, linea in enumerate(archivo, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                obj = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield str(n), "error", f"Línea {n}: JSON inválido ({e.msg})."
+                continue
+            if isinstance(obj, str):
+                yield str(n), "gramatica", obj
+            elif isinstance(obj, dict) and "gramatica" in obj:
+                yield str(obj.get("id", n)), "gramatica", obj["gramatica"]
+            elif isinstance(obj, dict) and "automata" in obj:
+                auto = obj["automata"]
+                yield str(obj.get("id", n)), "automata", auto if isinstance(auto, str) else json.dumps(auto)
+            elif isinstance(obj, dict):
+                yield str(obj.get("id", n)), "automata", linea
+            else:
+                yield str(n), "error", f"Línea {n}: se esperaba un texto o un objeto."
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+
+
+def _leer_directorio(ruta: str) -> Iterator[Elemento]:
+    for raiz, dirs, archivos in os.walk(ruta):
+        dirs.sort()
+        for nombre in sorted(archivos):
+            completo = os.path.join(raiz, nombre)
+            rel = os.path.relpath(completo, ruta)
+            if nombre.lower().endswith(".afb"):
+                # Al proceso de trabajo solo viaja la ruta; allí se vuelve a mapear el archivo.
+                try:
+                    yield rel, "automata", cargar_binario(completo)
+                except (OSError, ValueError) as e:
+                    yield rel, "error", f"No se pudo leer el autómata binario: {e}"
+                continue
+            try:
+                with open(completo, encoding="utf-8") as f:
+                    texto = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                yield rel, "error", f"No se pudo leer el archivo: {e}"
+                continue
+            yield rel, ("automata" if nombre.lower().endswith(".json") else "gramatica"), texto
+
+
+def leer_entradas(ruta: str) -> Iterator[Elemento]:
+    if ruta != "-" and os.path.isdir(ruta):
+        return _leer_directorio(ruta)
+    return _leer_jsonl(ruta)
+
+
+def _procesar(elemento: Elemento, convertir: bool, con_pasos: bool) -> dict:
+    from chomsky_classifier import clasificar_automata, clasificar_con_explicacion, construir_automata_regular
+    from model_converters import glc_to_pda
+
+    ident, clase, contenido = elemento
+    res = {"id": ident, "clase": clase}
+    if clase == "error":
+        res["error"] = contenido
+        return res
+    try:
+        if clase == "gramatica":
+            tipo, explicacion, pasos = clasificar_con_explicacion(contenido)
+        else:
+            tipo, explicacion, _, pasos = clasificar_automata(contenido)
+        res.update(tipo=tipo, explicacion=explicacion)
+        if con_pasos:
+            res["pasos"] = pasos
+        if convertir and clase == "gramatica":
+            if tipo == 3:
+                res["automata"] = construir_automata_regular(contenido)
+            if tipo in (2, 3):
+                pda, err = glc_to_pda(contenido)
+                res["pda"] = pda if pda is not None else {"error": err}
+    except Exception as e:
+        res["error"] = f"{type(e).__name__}: {e}"
+    return res
+
+
+def _procesar_lote(lote: List[Elemento], convertir: bool, con_pasos: bool) -> List[dict]:
+    return [_procesar(e, convertir, con_pasos) for e in lote]
+
+
+def _lotes(elementos: Iterator[Elemento], tam: int) -> Iterator[List[Elemento]]:
+    while True:
+        lote = list(islice(elementos, tam))
+        if not lote:
+            return
+        yield lote
+
+
+def clasificar_en_paralelo(elementos: Iterator[Elemento], procesos: int = None, tam_lote: int = 64,
+                           convertir: bool = False, con_pasos: bool = True) -> Iterator[dict]:
+    """
+    Clasifica en un pool de procesos y devuelve los resultados en el orden
+    de entrada. Como mucho hay 2·procesos lotes pendientes a la vez.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    lotes = _lotes(iter(elementos), tam_lote)
+    if procesos == 1:
+        for lote in lotes:
+            yield from _procesar_lote(lote, convertir, con_pasos)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        pendientes = deque()
+        for lote in lotes:
+            pendientes.append(pool.submit(_procesar_lote, lote, convertir, con_pasos))
+            if len(pendientes) >= 2 * procesos:
+                yield from pendientes.popleft().result()
+        while pendientes:
+            yield from pendientes.popleft().result()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Clasifica gramáticas y autómatas en lote (JSONL o directorio → JSONL)."
+    )
+    parser.add_argument("entrada", help="archivo JSONL, directorio o '-' para stdin")
+    parser.add_argument("-o", "--salida", default="-", help="archivo JSONL de salida (por defecto stdout)")
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="procesos de trabajo (por defecto, núcleos)")
+    parser.add_argument("--lote", type=int, default=64, help="elementos por lote enviado a cada proceso")
+    parser.add_argument("--convertir", action="store_true",
+                        help="añade el autómata (Tipo 3) y el PDA (Tipos 2 y 3) de cada gramática")
+    parser.add_argument("--sin-pasos", action="store_true", help="omite la explicación paso a paso")
+    args = parser.parse_args(argv)
+
+    if args.entrada != "-" and not os.path.exists(args.entrada):
+        parser.error(f"No existe la entrada: {args.entrada}")
+    if args.lote < 1 or (args.procesos is not None and args.procesos < 1):
+        parser.error("--lote y --procesos deben ser positivos.")
+
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    total = errores = 0
+    try:
+        for res in clasificar_en_paralelo(leer_entradas(args.entrada), args.procesos, args.lote,
+                                          args.convertir, not args.sin_pasos):
+            salida.write(json.dumps(res, ensure_ascii=False) + "\n")
+            total += 1
+            errores += "error" in res
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    print(f"{total} elementos clasificados, {errores} con error.", file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
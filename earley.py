@@ -0,0 +1,499 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from grammar_ir import GramaticaCompilada
+from normalizacion import tabla_poda
+from trazas import medido
+
+# Un nodo del árbol es (A, rhs, hijos); cada hijo es otro nodo o un id de terminal.
+Nodo = Tuple[int, Tuple[int, ...], list]
+
+
+class _Reglas:
+    """Reglas A → α de la gramática indexadas por número, con el conjunto anulable."""
+
+    def __init__(self, g: GramaticaCompilada):
+        self.g = g
+        self.lhs: List[int] = []
+        self.rhs: List[Tuple[int, ...]] = []
+        self.por_nt: Dict[int, List[int]] = {}
+        for A, prods in g.prods_de.items():
+            for rhs in prods:
+                self.por_nt.setdefault(A, []).append(len(self.lhs))
+                self.lhs.append(A)
+                self.rhs.append(rhs)
+        self.testigo_eps: Dict[int, int] = self._anulables()
+        # Para podar: longitud mínima de lo que falta por derivar desde cada
+        # punto de la regla (infinito si usa símbolos improductivos) y
+        # terminales con los que puede empezar la regla.
+        tabla = tabla_poda(g)
+        self.min_resto: List[List[float]] = []
+        self.primeros: List[Set[int]] = []
+        for rhs in self.rhs:
+            resto = [0] * (len(rhs) + 1)
+            for k in range(len(rhs) - 1, -1, -1):
+                resto[k] = resto[k + 1] + tabla.minimo_de((rhs[k],))
+            self.min_resto.append(resto)
+            self.primeros.append(tabla.primeros_de(rhs))
+
+    def _anulables(self) -> Dict[int, int]:
+        """
+        Calcula los no terminales anulables con una lista de trabajo.
+        Para cada uno guarda la primera regla que lo hizo anulable: esas reglas
+        forman árboles ε bien fundados.
+        """
+        es_nt = self.g.es_nt
+        faltan: List[int] = []
+        usos: Dict[int, List[int]] = {}
+        trabajo = []
+        for r, rhs in enumerate(self.rhs):
+            if any(not es_nt[x] for x in rhs):
+                faltan.append(-1)
+                continue
+            faltan.append(len(rhs))
+            for x in rhs:
+                usos.setdefault(x, []).append(r)
+            if not rhs:
+                trabajo.append(r)
+        testigo: Dict[int, int] = {}
+        while trabajo:
+            r = trabajo.pop()
+            A = self.lhs[r]
+            if A in testigo:
+                continue
+            testigo[A] = r
+            for r2 in usos.get(A, []):
+                faltan[r2] -= 1
+                if faltan[r2] == 0:
+                    trabajo.append(r2)
+        return testigo
+
+
+@lru_cache(maxsize=256)
+def _reglas_de(g: GramaticaCompilada) -> _Reglas:
+    """Las tablas de reglas no dependen de la cadena: una por gramática compilada."""
+    return _Reglas(g)
+
+
+class CartaEarley:
+    """
+    Carta de Earley para una gramática A → α y una cadena.
+
+    Cada conjunto j guarda los ítems (regla, punto, origen) alcanzados tras
+    leer j símbolos y, por ítem, el primer enlace que lo creó. Los enlaces
+    apuntan siempre a ítems creados antes, así que siguiéndolos se obtiene
+    un árbol finito aun con recursión izquierda o ciclos ε.
+
+    Con bosque=True además se guardan todos los enlaces de cada ítem como
+    pares (corte, hijo), que es lo que necesita BosqueEmpaquetado.
+    """
+
+    def __init__(self, g: GramaticaCompilada, cadena: str, bosque: bool = False):
+        self.g = g
+        self.bosque = bosque
+        self.reglas = _reglas_de(g)
+        self.tokens: Optional[List[int]] = []
+        for ch in cadena:
+            t = g.ids.get(ch)
+            if t is None or g.es_nt[t]:
+                self.tokens = None
+                break
+            self.tokens.append(t)
+        self.conjuntos: List[Dict[Tuple[int, int, int], tuple]] = []
+        self._espera: List[Dict[int, List[Tuple[int, int, int]]]] = []
+        self.enlaces: List[Dict[Tuple[int, int, int], set]] = []
+        if self.tokens is not None and g.inicio is not None:
+            self._analizar()
+
+    def _analizar(self):
+        g, R = self.g, self.reglas
+        es_nt = g.es_nt
+        rhs_de, por_nt, anulable = R.rhs, R.por_nt, R.testigo_eps
+        n = len(self.tokens)
+        conjuntos = [dict() for _ in range(n + 1)]
+        self.conjuntos = conjuntos
+        self._espera = [dict() for _ in range(n + 1)]
+        if self.bosque:
+            self.enlaces = [dict() for _ in range(n + 1)]
+        enlazar = self._enlazar if self.bosque else None
+
+        # Un ítem (r, punto) en el conjunto j solo se crea si lo que falta de
+        # la regla cabe en los n - j símbolos restantes; una regla solo se
+        # predice si es anulable o puede empezar por el siguiente símbolo.
+        min_resto, primeros_r = R.min_resto, R.primeros
+        primero = self.tokens[0] if n else None
+        for r in por_nt.get(g.inicio, []):
+            m = min_resto[r][0]
+            if m == 0 or (m <= n and primero in primeros_r[r]):
+                conjuntos[0][(r, 0, 0)] = None
+
+        for j in range(n + 1):
+            actual = conjuntos[j]
+            cola = list(actual.keys())
+            esperando = self._espera[j]
+            predichos = set()
+            siguiente = conjuntos[j + 1] if j < n else None
+            tok = self.tokens[j] if j < n else None
+            i = 0
+            while i < len(cola):
+                item = cola[i]
+                i += 1
+                r, punto, origen = item
+                rhs = rhs_de[r]
+                if punto == len(rhs):
+                    # Si origen == j, A es anulable y quien espere a A después
+                    # avanzará por la regla de anulables al predecirlo.
+                    A = R.lhs[r]
+                    for (r2, p2, o2) in list(self._espera[origen].get(A, ())):
+                        if min_resto[r2][p2 + 1] > n - j:
+                            continue
+                        nuevo = (r2, p2 + 1, o2)
+                        if nuevo not in actual:
+                            actual[nuevo] = ("c", origen, item)
+                            cola.append(nuevo)
+                        if enlazar:
+                            enlazar(j, nuevo, origen, A)
+                    continue
+                X = rhs[punto]
+                if es_nt[X]:
+                    esperando.setdefault(X, []).append(item)
+                    if X not in predichos:
+                        predichos.add(X)
+                        for r2 in por_nt.get(X, []):
+                            m = min_resto[r2][0]
+                            if m and (m > n - j or tok not in primeros_r[r2]):
+                                continue
+                            nuevo = (r2, 0, j)
+                            if nuevo not in actual:
+                                actual[nuevo] = None
+                                cola.append(nuevo)
+                    if X in anulable and min_resto[r][punto + 1] <= n - j:
+                        nuevo = (r, punto + 1, origen)
+                        if nuevo not in actual:
+                            actual[nuevo] = ("n", j, X)
+                            cola.append(nuevo)
+                        if enlazar:
+                            enlazar(j, nuevo, j, X)
+                elif siguiente is not None and X == tok and min_resto[r][punto + 1] < n - j:
+                    nuevo = (r, punto + 1, origen)
+                    if nuevo not in siguiente:
+                        siguiente[nuevo] = ("t", j, X)
+                    if enlazar:
+                        enlazar(j + 1, nuevo, j, None)
+
+    def _enlazar(self, j: int, item: Tuple[int, int, int], corte: int, hijo: Optional[int]):
+        """Registra un enlace (corte, hijo); hijo None indica un terminal."""
+        self.enlaces[j].setdefault(item, set()).add((corte, hijo))
+
+    def completo_final(self) -> Optional[Tuple[int, int, int]]:
+        if not self.conjuntos:
+            return None
+        n = len(self.tokens)
+        R = self.reglas
+        for (r, punto, origen) in self.conjuntos[n]:
+            if origen == 0 and R.lhs[r] == self.g.inicio and punto == len(R.rhs[r]):
+                return (r, punto, origen)
+        return None
+
+    def acepta(self) -> bool:
+        return self.completo_final() is not None
+
+    def _arbol_eps(self, A: int) -> Nodo:
+        R = self.reglas
+        raiz = [A, (), []]
+        pila = [(raiz, A)]
+        while pila:
+            nodo, B = pila.pop()
+            r = R.testigo_eps[B]
+            nodo[1] = R.rhs[r]
+            for X in R.rhs[r]:
+                hijo = [X, (), []]
+                nodo[2].append(hijo)
+                pila.append((hijo, X))
+        return raiz
+
+    def arbol(self) -> Optional[Nodo]:
+        """Árbol de derivación siguiendo los primeros enlaces de cada ítem."""
+        final = self.completo_final()
+        if final is None:
+            return None
+        R = self.reglas
+        n = len(self.tokens)
+        raiz = [R.lhs[final[0]], R.rhs[final[0]], []]
+        pila = [(raiz, final, n)]
+        while pila:
+            nodo, (r, punto, origen), fin = pila.pop()
+            hijos = []
+            while punto > 0:
+                tipo, k, dato = self.conjuntos[fin][(r, punto, origen)]
+                if tipo == "t":
+                    hijos.append(dato)
+                elif tipo == "n":
+                    hijos.append(self._arbol_eps(dato))
+                else:
+                    sub = [R.lhs[dato[0]], R.rhs[dato[0]], []]
+                    hijos.append(sub)
+                    pila.append((sub, dato, fin))
+                punto -= 1
+                fin = k
+            hijos.reverse()
+            nodo[2] = hijos
+        return raiz
+
+
+def derivacion_izquierda(g: GramaticaCompilada, arbol: Nodo) -> List[Tuple[str, str, str, str]]:
+    """
+    Convierte un árbol en pasos de derivación por la izquierda:
+    (sentencia antes, A, producción, sentencia después).
+    """
+    nom = g.simbolos
+    prefijo: List[str] = []
+    pendientes: list = [arbol]
+    pasos = []
+
+    def forma():
+        return "".join(prefijo) + "".join(
+            nom[x] if isinstance(x, int) else nom[x[0]] for x in reversed(pendientes)
+        )
+
+    while pendientes:
+        if isinstance(pendientes[-1], int):
+            prefijo.append(nom[pendientes.pop()])
+            continue
+        antes = forma()
+        A, rhs, hijos = pendientes.pop()
+        pendientes.extend(reversed(hijos))
+        pasos.append((antes, nom[A], g.nombre(rhs) if rhs else "ε", forma()))
+    return pasos
+
+
+@medido("análisis Earley")
+def derivar(g: GramaticaCompilada, cadena: str) -> Optional[List[Tuple[str, str, str, str]]]:
+    """Derivación por la izquierda de la cadena o None si no pertenece al lenguaje."""
+    arbol = CartaEarley(g, cadena).arbol()
+    if arbol is None:
+        return None
+    return derivacion_izquierda(g, arbol)
+
+
+def pertenece(g: GramaticaCompilada, cadena: str) -> bool:
+    return CartaEarley(g, cadena).acepta()
+
+
+class BosqueEmpaquetado:
+    """
+    Bosque de análisis compartido y empaquetado (SPPF) de una cadena.
+
+    Los nodos son de símbolo ("s", A, i, j) o de ítem ("i", regla, punto, i, j);
+    los nodos de ítem binarizan cada regla, así que el tamaño del bosque es
+    polinómico aunque el número de árboles sea exponencial.
+
+    Se cuentan las derivaciones sin ciclos (ningún nodo de símbolo se repite
+    en un camino raíz-hoja) con enteros de Python. Si el bosque tiene ciclos
+    alcanzables, el número total de árboles es infinito y se indica en
+    `infinitas`. Los conteos dentro de un ciclo dependen del camino y se
+    memorizan por (nodo, camino dentro de la componente).
+    """
+
+    @medido("bosque de análisis y conteo")
+    def __init__(self, g: GramaticaCompilada, cadena: str):
+        self.g = g
+        self.carta = CartaEarley(g, cadena, bosque=True)
+        self.raiz = None
+        self.total = 0
+        self.infinitas = False
+        final = self.carta.completo_final()
+        if final is None:
+            return
+        self._completos = self._indexar_completos()
+        self.raiz = ("s", g.inicio, 0, len(self.carta.tokens))
+        self._componente: Dict[tuple, int] = {}
+        self._miembros: List[list] = []
+        self._valor: Dict[tuple, int] = {}
+        self._memo_ciclo: Dict[tuple, int] = {}
+        self._contar_todo()
+        self.total = self._contar(self.raiz, frozenset())
+
+    def _indexar_completos(self):
+        R = self.carta.reglas
+        completos: List[Dict[Tuple[int, int], List[int]]] = []
+        for conjunto in self.carta.conjuntos:
+            idx: Dict[Tuple[int, int], List[int]] = {}
+            for (r, punto, origen) in conjunto:
+                if punto == len(R.rhs[r]):
+                    idx.setdefault((R.lhs[r], origen), []).append(r)
+            completos.append(idx)
+        return completos
+
+    def alternativas(self, v: tuple) -> List[tuple]:
+        """Alternativas empaquetadas de un nodo: tuplas de nodos hijos."""
+        R = self.carta.reglas
+        if v[0] == "s":
+            _, A, i, j = v
+            return [(("i", r, len(R.rhs[r]), i, j),) for r in self._completos[j].get((A, i), ())]
+        _, r, punto, i, j = v
+        if punto == 0:
+            return [()]
+        alts = []
+        for corte, hijo in sorted(self.carta.enlaces[j].get((r, punto, i), ()), key=lambda e: (e[0], -1 if e[1] is None else e[1])):
+            pred = ("i", r, punto - 1, i, corte)
+            if hijo is None:
+                alts.append((pred,))
+            else:
+                alts.append((pred, ("s", hijo, corte, j)))
+        return alts
+
+    def _contar_todo(self):
+        """
+        Componentes fuertemente conexas (Tarjan iterativo) desde la raíz.
+        Tarjan las emite en orden topológico inverso, así que los nodos fuera
+        de ciclos se cuentan de abajo hacia arriba sin recursión.
+        """
+        indice: Dict[tuple, int] = {}
+        bajo: Dict[tuple, int] = {}
+        en_pila = set()
+        pila: list = []
+        contador = 0
+        trabajo = [(self.raiz, None)]
+        hijos_de: Dict[tuple, list] = {}
+        while trabajo:
+            v, it = trabajo.pop()
+            if it is None:
+                indice[v] = bajo[v] = contador
+                contador += 1
+                pila.append(v)
+                en_pila.add(v)
+                hijos_de[v] = [h for alt in self.alternativas(v) for h in alt]
+                it = iter(hijos_de[v])
+            avanzado = False
+            for w in it:
+                if w not in indice:
+                    trabajo.append((v, it))
+                    trabajo.append((w, None))
+                    avanzado = True
+                    break
+                if w in en_pila:
+                    bajo[v] = min(bajo[v], indice[w])
+            if avanzado:
+                continue
+            if bajo[v] == indice[v]:
+                comp = []
+                while True:
+                    w = pila.pop()
+                    en_pila.discard(w)
+                    comp.append(w)
+                    if w == v:
+                        break
+                c = len(self._miembros)
+                self._miembros.append(comp)
+                for w in comp:
+                    self._componente[w] = c
+                if len(comp) > 1:
+                    self.infinitas = True
+                    for w in comp:
+                        self._valor[w] = self._contar_ciclo(w, frozenset())
+                else:
+                    self._valor[v] = self._sumar(v, frozenset())
+            if trabajo:
+                padre = trabajo[-1][0]
+                if padre in bajo and padre in en_pila:
+                    bajo[padre] = min(bajo[padre], bajo[v])
+
+    def _sumar(self, v: tuple, camino: frozenset) -> int:
+        total = 0
+        for alt in self.alternativas(v):
+            prod = 1
+            for h in alt:
+                prod *= self._contar(h, camino)
+                if not prod:
+                    break
+            total += prod
+        return total
+
+    def _contar(self, v: tuple, camino: frozenset) -> int:
+        """Número de derivaciones sin ciclos de v dado el camino dentro de su componente."""
+        if len(self._miembros[self._componente[v]]) == 1:
+            return self._valor[v]
+        return self._contar_ciclo(v, camino)
+
+    def _contar_ciclo(self, v: tuple, camino: frozenset) -> int:
+        clave = (v, camino)
+        if clave in self._memo_ciclo:
+            return self._memo_ciclo[clave]
+        if v[0] == "s":
+            if v in camino:
+                return 0
+            sub = camino | {v}
+        else:
+            sub = camino
+        c = self._componente[v]
+        total = 0
+        for alt in self.alternativas(v):
+            prod = 1
+            for h in alt:
+                prod *= self._contar_ciclo(h, sub) if self._componente[h] == c else self._valor[h]
+                if not prod:
+                    break
+            total += prod
+        self._memo_ciclo[clave] = total
+        return total
+
+    def _camino_hijo(self, v: tuple, h: tuple, camino: frozenset) -> frozenset:
+        if self._componente[h] != self._componente[v]:
+            return frozenset()
+        return camino | {v} if v[0] == "s" else camino
+
+    @property
+    def ambigua(self) -> bool:
+        return self.infinitas or self.total > 1
+
+    def arbol(self, k: int = 0) -> Optional[Nodo]:
+        """k-ésimo árbol (0 ≤ k < total) sin recorrer los anteriores."""
+        if self.raiz is None or not 0 <= k < self.total:
+            return None
+        R = self.carta.reglas
+        salida: list = []
+        tareas = [(self.raiz, k, frozenset(), salida)]
+        while tareas:
+            v, k, camino, destino = tareas.pop()
+            if v[0] == "t":
+                destino.append(v[1])
+                continue
+            for alt in self.alternativas(v):
+                cuentas = [self._contar(h, self._camino_hijo(v, h, camino)) for h in alt]
+                n_alt = 1
+                for x in cuentas:
+                    n_alt *= x
+                if k >= n_alt:
+                    k -= n_alt
+                    continue
+                if v[0] == "s":
+                    (item,) = alt
+                    r = item[1]
+                    nodo = [R.lhs[r], R.rhs[r], []]
+                    destino.append(nodo)
+                    tareas.append((item, k, self._camino_hijo(v, item, camino), nodo[2]))
+                elif alt:
+                    pred = alt[0]
+                    if len(alt) == 2:
+                        hijo = alt[1]
+                        k_pred, k_hijo = divmod(k, cuentas[1])
+                        tareas.append((hijo, k_hijo, self._camino_hijo(v, hijo, camino), destino))
+                    else:
+                        k_pred = k
+                        tareas.append((("t", self.carta.tokens[pred[4]]), 0, camino, destino))
+                    tareas.append((pred, k_pred, self._camino_hijo(v, pred, camino), destino))
+                break
+        return salida[0]
+
+    def derivacion(self, k: int = 0) -> Optional[List[Tuple[str, str, str, str]]]:
+        arbol = self.arbol(k)
+        if arbol is None:
+            return None
+        return derivacion_izquierda(self.g, arbol)
+
+
+@lru_cache(maxsize=32)
+def analizar_ambiguedad(g: GramaticaCompilada, cadena: str) -> BosqueEmpaquetado:
+    """Un único bosque por (gramática compilada, cadena): el conteo y el k-ésimo árbol salen de él."""
+    return BosqueEmpaquetado(g, cadena)
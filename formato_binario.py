@@ -0,0 +1,267 @@
+"""
+Formato binario compacto para autómatas finitos (extensión .afb).
+
+    datos = exportar_binario(dfa)          # bytes
+    guardar_binario(dfa, "ref.afb")
+    auto = cargar_binario("ref.afb")        # mmap de solo lectura, sin copiar tablas
+    auto.tabla, auto.finales                # vistas NumPy sobre el archivo
+    auto.a_dict()                           # formato de regex_to_dfa
+
+Estructura (little-endian, secciones alineadas a 8 bytes):
+
+    cabecera   "AFB1", versión u16, banderas u16, estados u32, símbolos u32,
+               inicial u32, bytes de metadatos u32, destinos u32, reservado u32
+    metadatos  JSON UTF-8: nombres de estados y símbolos (tablas internadas)
+               y claves extra del dict original
+    finales    u8[estados + 1]          (el último es el sumidero, siempre 0)
+    DFA        tabla i32[(estados + 1) × (símbolos + 1)]: la última fila es el
+               sumidero y la última columna los caracteres fuera del alfabeto
+               (la misma disposición que AutomataVectorizado)
+    NFA        inicios i32[estados × (símbolos + 1) + 1] y destinos i32[...]
+               (CSR por estado y símbolo; la última columna es ε)
+
+Un AutomataBinario cargado desde archivo se envía a otros procesos como la
+ruta: cada proceso mapea el mismo archivo y el sistema comparte las páginas.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Union
+
+from automatas_finitos import AFNCompacto
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGICO = b"AFB1"
+VERSION = 1
+DETERMINISTA = 1
+_CABECERA = struct.Struct("<4sHHIIIIII")
+_CLAVES_BASE = {
+    "states", "input_symbols", "alphabet", "initial_state", "start_state",
+    "final_states", "accepting_states", "transitions",
+}
+
+
+def _alinear(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _bytes_i32(valores) -> bytes:
+    datos = array("i", valores)
+    if sys.byteorder != "little":
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _vista(buffer, inicio: int, cantidad: int, tipo: str):
+    """Vista sin copia de un tramo del buffer (NumPy si está; si no, memoryview o array)."""
+    if np is not None:
+        return np.frombuffer(buffer, dtype="<i4" if tipo == "i" else "u1", count=cantidad, offset=inicio)
+    ancho = 4 if tipo == "i" else 1
+    tramo = memoryview(buffer)[inicio:inicio + cantidad * ancho]
+    if tipo == "i" and sys.byteorder != "little":
+        datos = array("i", tramo.tobytes())
+        datos.byteswap()
+        return datos
+    return tramo.cast(tipo if tipo == "i" else "B")
+
+
+def _fuera_de_rango(valores, minimo: int, maximo: int) -> bool:
+    """True si algún valor cae fuera de [minimo, maximo]."""
+    if not len(valores):
+        return False
+    if np is not None:
+        return bool(valores.min() < minimo or valores.max() > maximo)
+    return min(valores) < minimo or max(valores) > maximo
+
+
+def _decrece(valores) -> bool:
+    if np is not None:
+        return bool((np.diff(valores) < 0).any())
+    return any(b < a for a, b in zip(valores, valores[1:]))
+
+
+def es_binario(datos) -> bool:
+    return isinstance(datos, (bytes, bytearray, memoryview, mmap.mmap)) and bytes(datos[:4]) == MAGICO
+
+
+def exportar_binario(automata: dict) -> bytes:
+    """Serializa un autómata finito (cualquier formato de la app) al formato binario."""
+    if any(k in automata for k in ("stack_symbols", "initial_stack_symbol", "tape_symbols", "blank_symbol")):
+        raise ValueError("El formato binario solo admite autómatas finitos (sin pila ni cinta).")
+    afn = AFNCompacto(automata)
+    estados = list(afn.estados)
+    indice = dict(afn.indice)
+    for s in automata.get("states", []) or []:
+        if str(s) not in indice:
+            indice[str(s)] = len(estados)
+            estados.append(str(s))
+    simbolos = afn.alfabeto
+    n, k = len(estados), len(simbolos)
+    columna = {a: c for c, a in enumerate(simbolos)}
+
+    extra = {c: v for c, v in automata.items() if c not in _CLAVES_BASE}
+    meta = json.dumps({"estados": estados, "simbolos": simbolos, "extra": extra},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    finales = bytearray(n + 1)
+    for s in afn.finales:
+        finales[indice[s]] = 1
+
+    if afn.determinista:
+        tabla = [n] * ((n + 1) * (k + 1))
+        for origen, movs in afn.trans.items():
+            fila = indice[origen] * (k + 1)
+            for a, destinos in movs.items():
+                for d in destinos:
+                    tabla[fila + columna[a]] = indice[d]
+        cuerpo = [_bytes_i32(tabla)]
+        total_destinos = 0
+    else:
+        listas: List[List[int]] = [[] for _ in range(n * (k + 1))]
+        for origen, movs in afn.trans.items():
+            for a, destinos in movs.items():
+                listas[indice[origen] * (k + 1) + columna[a]] = sorted(indice[d] for d in destinos)
+        for origen, destinos in afn.eps.items():
+            listas[indice[origen] * (k + 1) + k] = sorted(indice[d] for d in destinos)
+        inicios = [0]
+        for lista in listas:
+            inicios.append(inicios[-1] + len(lista))
+        inicios_b = _bytes_i32(inicios)
+        cuerpo = [inicios_b, b"\0" * (_alinear(len(inicios_b)) - len(inicios_b)),
+                  _bytes_i32(d for lista in listas for d in lista)]
+        total_destinos = inicios[-1]
+
+    cabecera = _CABECERA.pack(MAGICO, VERSION, DETERMINISTA if afn.determinista else 0,
+                              n, k, indice[afn.inicial], len(meta), total_destinos, 0)
+    partes = [cabecera, meta, b"\0" * (_alinear(len(meta)) - len(meta)),
+              bytes(finales), b"\0" * (_alinear(n + 1) - (n + 1))] + cuerpo
+    return b"".join(partes)
+
+
+def guardar_binario(automata: dict, ruta: str):
+    with open(ruta, "wb") as f:
+        f.write(exportar_binario(automata))
+
+
+class AutomataBinario:
+    """
+    Autómata finito leído del formato binario. Las tablas (finales, tabla o
+    inicios/destinos) son vistas sobre el buffer original, sin copiarlo.
+    """
+
+    def __init__(self, buffer, ruta: Optional[str] = None):
+        if len(buffer) < _CABECERA.size:
+            raise ValueError("El archivo es demasiado corto para ser un autómata binario.")
+        (magico, version, banderas, n, k, inicial,
+         largo_meta, total_destinos, _) = _CABECERA.unpack_from(buffer, 0)
+        if magico != MAGICO:
+            raise ValueError("No es un autómata en formato binario (firma incorrecta).")
+        if version != VERSION:
+            raise ValueError(f"Versión del formato binario no soportada: {version}.")
+        self.buffer = buffer
+        self.ruta = ruta
+        self.determinista = bool(banderas & DETERMINISTA)
+        self.inicial = inicial
+        pos = _CABECERA.size
+        try:
+            meta = json.loads(bytes(buffer[pos:pos + largo_meta]).decode("utf-8"))
+            self.estados: List[str] = meta["estados"]
+            self.simbolos: List[str] = meta["simbolos"]
+            self.extra: dict = meta.get("extra", {})
+            if len(self.estados) != n or len(self.simbolos) != k:
+                raise ValueError("Los metadatos no coinciden con la cabecera.")
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError("Los metadatos del autómata binario están incompletos.")
+        if inicial >= n:
+            raise ValueError(f"El estado inicial ({inicial}) no existe: hay {n} estados.")
+        pos = _alinear(pos + largo_meta)
+        pos_finales = pos
+        pos = _alinear(pos + n + 1)
+        if self.determinista:
+            fin = pos + 4 * (n + 1) * (k + 1)
+        else:
+            pos_destinos = _alinear(pos + 4 * (n * (k + 1) + 1))
+            fin = pos_destinos + 4 * total_destinos
+        if fin > len(buffer):
+            raise ValueError("El archivo está truncado.")
+        self.finales = _vista(buffer, pos_finales, n + 1, "B")
+        if self.determinista:
+            self.tabla = _vista(buffer, pos, (n + 1) * (k + 1), "i")
+            if _fuera_de_rango(self.tabla, 0, n):
+                raise ValueError("La tabla de transición apunta a estados que no existen.")
+            if np is not None:
+                self.tabla = self.tabla.reshape(n + 1, k + 1)
+            self.inicios = self.destinos = None
+        else:
+            self.tabla = None
+            self.inicios = _vista(buffer, pos, n * (k + 1) + 1, "i")
+            self.destinos = _vista(buffer, pos_destinos, total_destinos, "i")
+            if self.inicios[0] != 0 or self.inicios[-1] != total_destinos or _decrece(self.inicios):
+                raise ValueError("Los índices de destinos (CSR) no son crecientes.")
+            if _fuera_de_rango(self.destinos, 0, n - 1):
+                raise ValueError("Hay destinos que apuntan a estados que no existen.")
+
+    def __reduce__(self):
+        # Entre procesos viaja la ruta (cada uno mapea el archivo) o, si no hay, los bytes.
+        if self.ruta is not None:
+            return cargar_binario, (self.ruta,)
+        return AutomataBinario, (bytes(self.buffer),)
+
+    def destinos_de(self, estado: int, columna: int) -> List[int]:
+        """Destinos de (estado, columna); en un NFA la columna len(simbolos) es ε."""
+        k = len(self.simbolos)
+        if self.determinista:
+            if np is not None:
+                d = int(self.tabla[estado, columna])
+            else:
+                d = self.tabla[estado * (k + 1) + columna]
+            return [] if d == len(self.estados) else [d]
+        i = estado * (k + 1) + columna
+        return [int(d) for d in self.destinos[self.inicios[i]:self.inicios[i + 1]]]
+
+    def a_dict(self) -> dict:
+        """Dict en el formato de regex_to_dfa (destinos como listas si es un NFA, ε como "")."""
+        nombres, simbolos = self.estados, self.simbolos
+        n, k = len(nombres), len(simbolos)
+        transiciones: Dict[str, Dict[str, Union[str, List[str]]]] = {}
+        if self.determinista:
+            plana = self.tabla.ravel().tolist() if np is not None else list(self.tabla)
+            for q in range(n):
+                fila = plana[q * (k + 1):q * (k + 1) + k]
+                movs = {a: nombres[d] for a, d in zip(simbolos, fila) if d != n}
+                if movs:
+                    transiciones[nombres[q]] = movs
+        else:
+            inicios, destinos = list(self.inicios), list(self.destinos)
+            columnas = simbolos + [""]
+            for q in range(n):
+                movs = {}
+                for c, a in enumerate(columnas):
+                    i = q * (k + 1) + c
+                    if inicios[i] != inicios[i + 1]:
+                        movs[a] = [nombres[d] for d in destinos[inicios[i]:inicios[i + 1]]]
+                if movs:
+                    transiciones[nombres[q]] = movs
+        datos = {
+            "states": list(nombres),
+            "input_symbols": list(simbolos),
+            "initial_state": nombres[self.inicial],
+            "final_states": [s for q, s in enumerate(nombres) if self.finales[q]],
+            "transitions": transiciones,
+        }
+        datos.update(self.extra)
+        return datos
+
+
+def cargar_binario(fuente: Union[str, bytes, bytearray, memoryview]) -> AutomataBinario:
+    """Desde bytes, o desde una ruta con mmap de solo lectura (compartido entre procesos)."""
+    if not isinstance(fuente, str):
+        return AutomataBinario(fuente)
+    with open(fuente, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return AutomataBinario(mapa, ruta=fuente)
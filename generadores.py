@@ -0,0 +1,201 @@
+import random
+from typing import List
+
+from canonico import LETRAS_NO_TERMINALES
+
+def _gen_type3_regular(rnd: random.Random) -> str:
+    NT = ["S","A","B","C"]
+    T  = rnd.sample(["a","b","c"], k=2)  
+    n_rules = rnd.randint(5,8)
+    rules = set()
+
+    if rnd.random() < .6: rules.add("S -> ε")
+    for _ in range(rnd.randint(1,3)):
+        rules.add(f"S -> {rnd.choice(T)}")
+        rules.add(f"S -> {rnd.choice(T)}{rnd.choice(NT)}")
+
+    for A in ["A","B","C"]:
+        if rnd.random() < .8:
+            rules.add(f"{A} -> {rnd.choice(T)}{A}")
+        if rnd.random() < .8:
+            rules.add(f"{A} -> {rnd.choice(T)}{rnd.choice(NT)}")
+        if rnd.random() < .7:
+            rules.add(f"{A} -> {rnd.choice(T)}")
+        if rnd.random() < .3:
+            rules.add(f"{A} -> ε")
+
+    rules = list(rules)
+    rnd.shuffle(rules)
+    return "\n".join(rules[:n_rules]) or "S -> a | ε"
+
+def _gen_type2_cfg(rnd: random.Random) -> str:
+
+    T = rnd.sample(["a","b","c"], k=2)
+    a, b = T[0], T[1]
+    cand = []
+    cand.append(f"S -> {a} S {b} | ε")
+    cand.append(f"S -> {a} S {a} | {b} S {b} | {a} | {b} | ε")
+    cand.append(f"S -> {a} S {b} | A\nA -> {a} A | {b} | ε")
+    cand.append(f"S -> {a} S {b} | S S | ε")
+
+    rules = rnd.choice(cand)
+    return rules
+
+def _gen_type1_cs(rnd: random.Random) -> str:
+    T = rnd.sample(["a","b","c"], k=2)
+    a, b = T[0], T[1]
+    base = [
+        f"S -> {a} S B | {a} B",
+        "A B -> B A",            
+        f"B {a} -> {a} B",       
+        "A -> " + a,
+        "B -> " + b,
+    ]
+    if rnd.random() < .5: base.append("S A -> A S")
+    if rnd.random() < .5: base.append("B B -> B B")
+    return "\n".join(base)
+
+def _gen_type0_unrestricted(rnd: random.Random) -> str:
+    T = rnd.sample(["a","b","c"], k=2)
+    a, b = T[0], T[1]
+    base = [
+        "S -> A B | " + a,
+        "A B -> A",                 
+        f"A -> {a} A | {a}",
+        f"B -> {b} B | {b}",
+    ]
+    if rnd.random() < .6:
+        base.append("S A -> ε")
+    if rnd.random() < .4:
+        base.append("B A -> B")
+    return "\n".join(base)
+
+def generar_gramatica_por_tipo(tipo: int, rnd: random.Random = None) -> str:
+    rnd = rnd or random
+    if tipo == 3: return _gen_type3_regular(rnd)
+    if tipo == 2: return _gen_type2_cfg(rnd)
+    if tipo == 1: return _gen_type1_cs(rnd)
+    if tipo == 0: return _gen_type0_unrestricted(rnd)
+    return _gen_type2_cfg(rnd)
+
+
+# ---------------------------------------------------------------------------
+# Generadores escalables para benchmarks: mismas familias que los de arriba,
+# pero con n producciones. Los símbolos son de un carácter, así que los no
+# terminales salen de las mayúsculas (ASCII y después Unicode) y los
+# terminales de las minúsculas.
+# ---------------------------------------------------------------------------
+
+_MINUSCULAS = "abcdefghijklmnopqrstuvwxyz" + "".join(
+    chr(c) for c in range(0xDF, 0x2000) if chr(c).islower() and len(chr(c).upper()) == 1
+)
+
+
+def _alfabetos(n: int, rnd: random.Random):
+    """~√n no terminales (S primero) y unos pocos terminales."""
+    k = max(2, min(len(LETRAS_NO_TERMINALES), int(n ** 0.5)))
+    NT = list(LETRAS_NO_TERMINALES[:k])
+    T = list(_MINUSCULAS[:max(2, min(8, k))])
+    return NT, T
+
+
+def _unir(reglas: List[str]) -> str:
+    return "\n".join(reglas)
+
+
+def gramatica_regular_escalable(n: int, rnd: random.Random = None) -> str:
+    """Tipo 3 con n producciones A → aB | a | ε; todos los no terminales alcanzables."""
+    rnd = rnd or random.Random(0)
+    NT, T = _alfabetos(n, rnd)
+    reglas = [f"{NT[i]} -> {rnd.choice(T)}{NT[i + 1]}" for i in range(len(NT) - 1)]
+    reglas.append(f"{NT[-1]} -> {rnd.choice(T)}")
+    while len(reglas) < n:
+        A = rnd.choice(NT)
+        r = rnd.random()
+        if r < 0.75:
+            reglas.append(f"{A} -> {rnd.choice(T)}{rnd.choice(NT)}")
+        elif r < 0.97:
+            reglas.append(f"{A} -> {rnd.choice(T)}")
+        else:
+            reglas.append(f"{A} -> ε")
+    return _unir(reglas[:n])
+
+
+def gramatica_libre_escalable(n: int, rnd: random.Random = None) -> str:
+    """Tipo 2 con n producciones de longitud 1..4 (recursión por ambos lados)."""
+    rnd = rnd or random.Random(0)
+    NT, T = _alfabetos(n, rnd)
+    reglas = [f"{NT[i]} -> {rnd.choice(T)}{NT[i + 1]}{rnd.choice(T)}" for i in range(len(NT) - 1)]
+    reglas += [f"{A} -> {rnd.choice(T)}" for A in NT]
+    while len(reglas) < n:
+        largo = rnd.randint(1, 4)
+        rhs = "".join(rnd.choice(NT) if rnd.random() < 0.4 else rnd.choice(T) for _ in range(largo))
+        reglas.append(f"{rnd.choice(NT)} -> {rhs}")
+    return _unir(reglas[:n])
+
+
+def gramatica_sensible_escalable(n: int, rnd: random.Random = None) -> str:
+    """Tipo 1: como la libre, con un 20 % de reglas con contexto que no reducen longitud."""
+    rnd = rnd or random.Random(0)
+    base = gramatica_libre_escalable(n, rnd).split("\n")
+    NT, T = _alfabetos(n, rnd)
+    for i in range(0, len(base), 5):
+        a, B, C = rnd.choice(T), rnd.choice(NT), rnd.choice(NT)
+        base[i] = f"{B}{a} -> {a}{C}"
+    return _unir(base)
+
+
+def gramatica_general_escalable(n: int, rnd: random.Random = None) -> str:
+    """Tipo 0: como la sensible, con algunas reglas que reducen longitud."""
+    rnd = rnd or random.Random(0)
+    base = gramatica_sensible_escalable(n, rnd).split("\n")
+    NT, _ = _alfabetos(n, rnd)
+    for i in range(3, len(base), 10):
+        base[i] = f"{rnd.choice(NT)}{rnd.choice(NT)} -> {rnd.choice(NT)}"
+    return _unir(base)
+
+
+def gramatica_escalable(tipo: int, n: int, rnd: random.Random = None) -> str:
+    if tipo == 3: return gramatica_regular_escalable(n, rnd)
+    if tipo == 1: return gramatica_sensible_escalable(n, rnd)
+    if tipo == 0: return gramatica_general_escalable(n, rnd)
+    return gramatica_libre_escalable(n, rnd)
+
+
+def afd_escalable(n: int, simbolos: int = 2, rnd: random.Random = None) -> dict:
+    """AFD completo de n estados en el formato JSON de la app."""
+    rnd = rnd or random.Random(0)
+    alfabeto = list(_MINUSCULAS[:simbolos])
+    estados = [f"q{i}" for i in range(n)]
+    trans = {}
+    for i, q in enumerate(estados):
+        movs = {a: rnd.choice(estados) for a in alfabeto}
+        movs[alfabeto[0]] = estados[(i + 1) % n]
+        trans[q] = movs
+    return {
+        "states": estados,
+        "input_symbols": alfabeto,
+        "initial_state": estados[0],
+        "final_states": [q for q in estados if rnd.random() < 0.3] or [estados[-1]],
+        "transitions": trans,
+    }
+
+
+def regex_escalable(n: int, rnd: random.Random = None) -> str:
+    """Expresión de longitud ~n: alternancias y estrellas anidadas sobre {a, b, c}."""
+    rnd = rnd or random.Random(0)
+    partes = []
+    largo = 0
+    while largo < n:
+        r = rnd.random()
+        if r < 0.4:
+            p = rnd.choice("abc")
+        elif r < 0.7:
+            p = f"({rnd.choice('abc')}|{rnd.choice('abc')})"
+        elif r < 0.9:
+            p = f"({rnd.choice('abc')}{rnd.choice('abc')})*"
+        else:
+            p = f"({rnd.choice('abc')}|{rnd.choice('abc')}{rnd.choice('abc')})+"
+        partes.append(p)
+        largo += len(p)
+    return "".join(partes)
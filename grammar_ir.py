@@ -0,0 +1,142 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from trazas import medido
+
+EPSILON = "ε"
+
+
+class GramaticaCompilada:
+    """
+    Representación intermedia compartida de una gramática.
+
+    - Los símbolos (terminales y no terminales) se internan como enteros pequeños.
+    - Cada producción es un par (lhs, rhs) de tuplas de enteros; ε es la tupla vacía.
+    - Se conservan los textos originales de cada regla para las explicaciones.
+    - Índices: producciones por LHS y alternativas por no terminal (reglas A → α).
+
+    La instancia es inmutable en la práctica: se comparte entre clasificación,
+    derivación, construcción de PDA y equivalencia.
+    """
+
+    __slots__ = (
+        "simbolos", "ids", "es_nt", "es_t",
+        "producciones", "textos", "epsilon",
+        "orden_lhs", "por_lhs", "prods_de", "inicio", "inicio_lhs",
+    )
+
+    def __init__(self):
+        self.simbolos: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.es_nt = bytearray()
+        self.es_t = bytearray()
+        self.producciones: List[Tuple[Tuple[int, ...], Tuple[int, ...]]] = []
+        self.textos: List[Tuple[str, str]] = []
+        self.epsilon = bytearray()
+        self.orden_lhs: List[Tuple[int, ...]] = []
+        self.por_lhs: Dict[Tuple[int, ...], List[int]] = {}
+        self.prods_de: Dict[int, List[Tuple[int, ...]]] = {}
+        self.inicio: Optional[int] = None
+        self.inicio_lhs: Tuple[int, ...] = ()
+
+    def _intern(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = len(self.simbolos)
+            self.ids[s] = i
+            self.simbolos.append(s)
+            self.es_nt.append(1 if s.isupper() else 0)
+            self.es_t.append(1 if s.islower() else 0)
+        return i
+
+    def _agregar(self, izq: str, der: str):
+        lhs = tuple(self._intern(c) for c in izq)
+        es_eps = der == EPSILON
+        rhs = () if es_eps else tuple(self._intern(c) for c in der)
+        idx = len(self.producciones)
+        self.producciones.append((lhs, rhs))
+        self.textos.append((izq, der))
+        self.epsilon.append(1 if es_eps else 0)
+        if lhs not in self.por_lhs:
+            self.por_lhs[lhs] = []
+            self.orden_lhs.append(lhs)
+        self.por_lhs[lhs].append(idx)
+        if len(lhs) == 1 and self.es_nt[lhs[0]]:
+            self.prods_de.setdefault(lhs[0], []).append(rhs)
+
+    @classmethod
+    def desde_reglas(cls, reglas: Iterable[Tuple[str, str]]) -> "GramaticaCompilada":
+        """Gramática a partir de pares (izq, der) ya separados; el primer LHS es el inicial."""
+        g = cls()
+        for izq, der in reglas:
+            g._agregar(izq, der)
+        if g.orden_lhs:
+            g.inicio_lhs = g.orden_lhs[0]
+            if len(g.inicio_lhs) == 1:
+                g.inicio = g.inicio_lhs[0]
+        return g
+
+    @property
+    def vacia(self) -> bool:
+        return not self.producciones
+
+    @property
+    def libre_de_contexto(self) -> bool:
+        """True si todos los LHS son un solo no terminal (A → α)."""
+        return all(len(l) == 1 and self.es_nt[l[0]] for l in self.orden_lhs)
+
+    def nombre(self, ids) -> str:
+        return "".join(self.simbolos[i] for i in ids)
+
+    def nonterminales(self) -> List[int]:
+        return [i for i, f in enumerate(self.es_nt) if f]
+
+    def terminales(self) -> List[int]:
+        return [i for i, f in enumerate(self.es_nt) if not f]
+
+    def a_texto(self) -> str:
+        """Una línea "A -> α | β" por LHS, en el orden de aparición."""
+        return "\n".join(f"{izq} -> {' | '.join(ders)}" for izq, ders in self.a_dict().items())
+
+    def a_dict(self) -> Dict[str, List[str]]:
+        """Formato histórico de leer_gramatica: {LHS: [producciones como texto]}."""
+        gr: Dict[str, List[str]] = {}
+        for izq, der in self.textos:
+            gr.setdefault(izq, []).append(der)
+        return gr
+
+
+def _partir_linea(linea: str):
+    if "->" in linea:
+        return linea.split("->", 1)
+    return linea.split("→", 1)
+
+
+def reglas_de_linea(linea: str) -> List[Tuple[str, str]]:
+    """Alternativas (izq, der) de una línea, ya sin espacios; [] si no es una regla."""
+    linea = linea.strip()
+    if not linea or ("->" not in linea and "→" not in linea):
+        return []
+    izq, der = _partir_linea(linea)
+    izq = izq.replace(" ", "")
+    reglas = []
+    for p in der.split("|"):
+        p = p.strip()
+        if p != EPSILON:
+            p = p.replace(" ", "")
+        reglas.append((izq, p))
+    return reglas
+
+
+@lru_cache(maxsize=256)
+@medido("parseo de gramática")
+def compilar_gramatica(texto: str) -> GramaticaCompilada:
+    """
+    Compila una gramática desde texto (una producción por línea, -> o → y |).
+    Los símbolos son caracteres; los espacios se ignoran. Las llamadas repetidas
+    con el mismo texto devuelven la misma instancia, así que una petición
+    parsea la gramática una sola vez.
+    """
+    return GramaticaCompilada.desde_reglas(
+        regla for linea in texto.strip().split("\n") for regla in reglas_de_linea(linea)
+    )
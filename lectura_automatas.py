@@ -0,0 +1,381 @@
+"""
+Lectura por claves del JSON de un autómata, pensada para autómatas
+generados por máquina con decenas de miles de transiciones.
+
+    auto = leer_automata(texto)          # ValueError si supera el límite (no recorre nada)
+    auto.huella                          # BLAKE2b del texto: clave de caché sin parsear
+    "states" in auto, auto["type"]       # lee claves del objeto raíz hasta encontrarla
+    auto.filas(cantidad=500)             # primeras filas de δ: solo los orígenes necesarios
+    auto.estadisticas()                  # conteos de "transitions", en la misma pasada
+    auto["transitions"]                  # dict completo, solo si se pide
+
+El objeto raíz se recorre clave a clave y solo hasta donde haga falta: los
+valores pequeños se decodifican con raw_decode y "transitions" no se lee
+mientras no haya que pasar por encima de él para llegar a una clave
+posterior. Cuando hay que leerlo, se decodifica origen a origen, se
+acumulan las estadísticas en la misma pasada y los orígenes ya leídos se
+guardan para que la tabla y el grafo no vuelvan a decodificarlos.
+
+Para saber que una clave no está sin recorrer todo el texto se busca antes
+su literal ("tape_symbols", con comillas): si no aparece en ninguna parte,
+no puede ser una clave del objeto raíz. Los errores de sintaxis posteriores
+a la última clave leída aparecen (json.JSONDecodeError) cuando se lee esa
+parte.
+
+El tamaño se comprueba antes que nada contra el límite (CHOMSKY_MAX_AUTOMATA:
+bytes, o caracteres si ya es texto).
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+from collections.abc import Mapping
+from json.decoder import WHITESPACE, scanstring
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+VARIABLE_LIMITE = "CHOMSKY_MAX_AUTOMATA"
+LIMITE_POR_DEFECTO = 32 * 1024 * 1024
+
+_DECODIFICADOR = json.JSONDecoder()
+# Una clave ASCII escrita con escapes (tape_symbols) no aparece como literal.
+_ESCAPE_ASCII = re.compile(r"\\u00[0-7]")
+
+
+def limite_por_defecto() -> int:
+    try:
+        return int(os.environ.get(VARIABLE_LIMITE, "") or LIMITE_POR_DEFECTO)
+    except ValueError:
+        return LIMITE_POR_DEFECTO
+
+
+def comprobar_tamano(texto: Union[str, bytes], limite: Optional[int] = None):
+    """ValueError si el texto supera el límite; no lo recorre."""
+    limite = limite_por_defecto() if limite is None else limite
+    if limite and len(texto) > limite:
+        unidad = "bytes" if isinstance(texto, (bytes, bytearray)) else "caracteres"
+        raise ValueError(
+            f"El autómata ocupa {len(texto):,} {unidad} y el límite es {limite:,} "
+            f"(ajústalo con {VARIABLE_LIMITE})."
+        )
+
+
+def _espacios(texto: str, i: int) -> int:
+    c = texto[i:i + 1]
+    if c == " ":
+        i += 1
+        c = texto[i:i + 1]
+    if c and c not in " \t\n\r":
+        return i
+    return WHITESPACE.match(texto, i).end()
+
+
+def _error(mensaje: str, texto: str, i: int):
+    return json.JSONDecodeError(mensaje, texto, i)
+
+
+def _objeto(texto: str, i: int) -> Iterator[Tuple[str, int]]:
+    """Recorre un objeto JSON que empieza en texto[i]: da (clave, posición del valor).
+
+    Quien consume debe devolver con send() la posición tras el valor.
+    """
+    if texto[i:i + 1] != "{":
+        raise _error("Se esperaba un objeto", texto, i)
+    i = _espacios(texto, i + 1)
+    if texto[i:i + 1] == "}":
+        return i + 1
+    while True:
+        if texto[i:i + 1] != '"':
+            raise _error("Se esperaba una clave entre comillas", texto, i)
+        clave, i = scanstring(texto, i + 1)
+        i = _espacios(texto, i)
+        if texto[i:i + 1] != ":":
+            raise _error("Se esperaba ':'", texto, i)
+        i = yield clave, _espacios(texto, i + 1)
+        i = _espacios(texto, i)
+        c = texto[i:i + 1]
+        if c == "}":
+            return i + 1
+        if c != ",":
+            raise _error("Se esperaba ',' o '}'", texto, i)
+        i = _espacios(texto, i + 1)
+
+
+class _Recorrido:
+    """Recorrido de un objeto JSON par a par, que se puede pausar y retomar."""
+
+    def __init__(self, texto: str, i: int):
+        self._pares = _objeto(texto, i)
+        self.fin: Optional[int] = None
+        self._siguiente(None)
+
+    def _siguiente(self, pos: Optional[int]):
+        try:
+            self.actual = next(self._pares) if pos is None else self._pares.send(pos)
+        except StopIteration as fin:
+            self.actual, self.fin = None, fin.value
+
+    def avanzar(self, pos: int):
+        """Pasa al par siguiente; `pos` es la posición tras el valor actual."""
+        self._siguiente(pos)
+
+
+def _recordar_error(metodo):
+    """Un error de sintaxis deja el recorrido roto: las llamadas siguientes lo repiten."""
+    @functools.wraps(metodo)
+    def envoltura(self):
+        if self._fallo is not None:
+            raise self._fallo
+        try:
+            return metodo(self)
+        except ValueError as e:
+            self._fallo = e
+            raise
+    return envoltura
+
+
+def _filas(fuentes, desde: int, cantidad: Optional[int]) -> Iterator[dict]:
+    n = 0
+    for origen, movs in fuentes:
+        if not isinstance(movs, dict):
+            continue
+        for simbolo, destino in movs.items():
+            for d in destino if isinstance(destino, list) else [destino]:
+                if n >= desde:
+                    if cantidad is not None and n >= desde + cantidad:
+                        return
+                    yield {"Desde": origen, "Símbolo": simbolo, "Hacia": d}
+                n += 1
+
+
+class AutomataLeido(Mapping):
+    """
+    Autómata leído por claves. Se comporta como el dict del JSON (Mapping),
+    pero cada clave se lee la primera vez que se pregunta por ella y
+    "transitions" se decodifica origen a origen cuando hace falta.
+    json.JSONDecodeError o ValueError si la parte leída no es válida.
+    """
+
+    def __init__(self, texto: str, limite: Optional[int] = None):
+        comprobar_tamano(texto, limite)
+        i = _espacios(texto, 0)
+        if texto[i:i + 1] != "{":
+            raise ValueError("El autómata debe ser un objeto JSON ({...}).")
+        self._texto = texto
+        self._huella: Optional[str] = None
+        self._escapes: Optional[bool] = None
+        self._inicio = i
+        self._raiz: Optional[_Recorrido] = None
+        self._campos: dict = {}
+        self._orden: List[str] = []
+        self._completo = False
+        self._en_delta = False
+        self._fallo: Optional[ValueError] = None
+        self._reiniciar_delta()
+
+    def _reiniciar_delta(self):
+        self._delta: Optional[_Recorrido] = None
+        self._delta_inicio = 0
+        self._origenes: List[Tuple[str, object]] = []
+        self._transiciones: Optional[dict] = None
+        self.origenes = self.pares = self.destinos = self.epsilon = self.varios = 0
+        self.simbolos: set = set()
+
+    @property
+    def huella(self) -> str:
+        if self._huella is None:
+            self._huella = hashlib.blake2b(self._texto.encode("utf-8"), digest_size=16).hexdigest()
+        return self._huella
+
+    # --- objeto raíz -------------------------------------------------------
+
+    @_recordar_error
+    def _leer_clave(self) -> bool:
+        """Lee el siguiente par del objeto raíz; False si ya no quedan."""
+        if self._en_delta:
+            # La raíz está parada sobre "transitions": para seguir hay que leerlo entero.
+            self._raiz.avanzar(self._fin_transiciones())
+            self._en_delta = False
+        if self._completo:
+            return False
+        if self._raiz is None:
+            self._raiz = _Recorrido(self._texto, self._inicio)
+        if self._raiz.actual is None:
+            if _espacios(self._texto, self._raiz.fin) != len(self._texto):
+                raise _error("Contenido extra tras el objeto", self._texto, self._raiz.fin)
+            self._completo = True
+            return False
+        clave, i = self._raiz.actual
+        if clave not in self._orden:
+            self._orden.append(clave)
+        if clave == "transitions":
+            self._campos.pop(clave, None)
+            self._reiniciar_delta()
+            if self._texto[i:i + 1] == "{":
+                self._delta = _Recorrido(self._texto, i)
+                self._delta_inicio = i
+                self._en_delta = True
+                return True
+        valor, fin = _DECODIFICADOR.raw_decode(self._texto, i)
+        self._campos[clave] = valor
+        self._raiz.avanzar(fin)
+        return True
+
+    def _puede_estar(self, clave: str) -> bool:
+        """False solo si la clave no aparece en ninguna parte del texto."""
+        if self._escapes is None:
+            self._escapes = _ESCAPE_ASCII.search(self._texto) is not None
+        return self._escapes or json.dumps(clave) in self._texto
+
+    def _buscar(self, clave: str) -> bool:
+        if clave in self._orden:
+            return True
+        if not self._puede_estar(clave):
+            return False
+        while self._leer_clave():
+            if self._orden[-1] == clave:
+                return True
+        return clave in self._orden
+
+    def claves_leidas(self) -> List[str]:
+        """Claves del objeto raíz leídas hasta ahora, en orden."""
+        return list(self._orden)
+
+    @property
+    def leido_entero(self) -> bool:
+        return self._completo
+
+    def claves(self) -> List[str]:
+        while self._leer_clave():
+            pass
+        return list(self._orden)
+
+    def __getitem__(self, clave: str):
+        if not self._buscar(clave):
+            raise KeyError(clave)
+        if clave in self._campos:
+            return self._campos[clave]
+        if self._transiciones is None:
+            self._leer_origenes()
+            self._transiciones = dict(self._origenes)
+        return self._transiciones
+
+    def __iter__(self):
+        return iter(self.claves())
+
+    def __len__(self) -> int:
+        return len(self.claves())
+
+    def __contains__(self, clave) -> bool:
+        return isinstance(clave, str) and self._buscar(clave)
+
+    # --- "transitions", origen a origen ------------------------------------
+
+    def _contar(self, nuevos):
+        """Guarda los pares (origen, movimientos) y suma sus conteos."""
+        origenes, pares, destinos, epsilon, varios = 0, 0, 0, 0, 0
+        simbolos = self.simbolos
+        for origen, movs in nuevos:
+            self._origenes.append((origen, movs))
+            origenes += 1
+            if not isinstance(movs, dict):
+                continue
+            pares += len(movs)
+            for simbolo, destino in movs.items():
+                simbolos.add(simbolo)
+                epsilon += simbolo == ""
+                if isinstance(destino, list):
+                    destinos += len(destino)
+                    varios += len(destino) > 1
+                else:
+                    destinos += 1
+        self.origenes += origenes
+        self.pares += pares
+        self.destinos += destinos
+        self.epsilon += epsilon
+        self.varios += varios
+
+    @_recordar_error
+    def _leer_origen(self) -> bool:
+        """Decodifica el siguiente origen de δ y lo cuenta; False si no quedan."""
+        delta = self._delta
+        if delta is None or delta.actual is None:
+            return False
+        origen, i = delta.actual
+        movs, fin = _DECODIFICADOR.raw_decode(self._texto, i)
+        self._contar([(origen, movs)])
+        delta.avanzar(fin)
+        return True
+
+    @_recordar_error
+    def _leer_origenes(self):
+        """Termina de leer δ decodificando el resto de una vez (en C) y contándolo."""
+        delta = self._delta
+        if delta is None or delta.actual is None:
+            return
+        if not self._origenes:
+            resto, delta.fin = _DECODIFICADOR.raw_decode(self._texto, self._delta_inicio)
+        else:
+            # Lo que falta se lee como un objeto que empieza en el origen actual.
+            origen, i = delta.actual
+            prefijo = "{" + json.dumps(origen) + ":"
+            resto, fin = _DECODIFICADOR.raw_decode(prefijo + self._texto[i:])
+            delta.fin = i + fin - len(prefijo)
+        delta.actual = None
+        self._contar(resto.items())
+
+    def _fin_transiciones(self) -> int:
+        """Termina de leer δ y devuelve la posición tras el objeto."""
+        self._leer_origenes()
+        return self._delta.fin
+
+    def _iter_origenes(self) -> Iterator[Tuple[str, object]]:
+        if not self._buscar("transitions") or self._delta is None:
+            return
+        k = 0
+        while k < len(self._origenes) or self._leer_origen():
+            yield self._origenes[k]
+            k += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Conteos de "transitions" (se termina de leer δ si hacía falta)."""
+        self._buscar("transitions")
+        self._leer_origenes()
+        return {
+            "estados de origen": self.origenes,
+            "pares (origen, símbolo)": self.pares,
+            "destinos": self.destinos,
+            "transiciones ε": self.epsilon,
+            "destinos múltiples": self.varios,
+            "símbolos distintos": len(self.simbolos),
+        }
+
+    def filas(self, desde: int = 0, cantidad: Optional[int] = None) -> Iterator[dict]:
+        """Filas {"Desde", "Símbolo", "Hacia"} de δ, leyendo solo los orígenes necesarios."""
+        return _filas(self._iter_origenes(), desde, cantidad)
+
+    def a_dict(self) -> dict:
+        return {clave: self[clave] for clave in self.claves()}
+
+
+def leer_automata(texto: Union[str, bytes], limite: Optional[int] = None) -> AutomataLeido:
+    """Comprueba el límite y prepara la lectura por claves; ValueError si lo supera."""
+    if isinstance(texto, (bytes, bytearray)):
+        comprobar_tamano(texto, limite)
+        texto = bytes(texto).decode("utf-8")
+    return AutomataLeido(texto, limite)
+
+
+def filas_transiciones(automata: Mapping, cantidad: Optional[int] = None) -> Iterator[dict]:
+    """Primeras `cantidad` filas de δ de un AutomataLeido o de un dict ya decodificado."""
+    if isinstance(automata, AutomataLeido):
+        return automata.filas(cantidad=cantidad)
+    trans = automata.get("transitions")
+    return _filas(trans.items() if isinstance(trans, dict) else (), 0, cantidad)
+
+
+def total_transiciones(automata: Mapping) -> int:
+    """Número de filas de δ (destinos); en un AutomataLeido sale de las estadísticas."""
+    if isinstance(automata, AutomataLeido):
+        return automata.estadisticas()["destinos"]
+    return sum(1 for _ in filas_transiciones(automata))
@@ -1,6 +1,15 @@
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Tuple, Optional, List, Dict
 import graphviz
 
+from automatas_finitos import minimizar_afd
+from grammar_ir import compilar_gramatica
+from almacen_resultados import clave_gramatica
+from cache_resultados import cacheado, sin_normalizar
+from render_cache import renderizar
+from trazas import medido, tramo
+
 try:
     from automata.fa.nfa import NFA
     from automata.fa.dfa import DFA
@@ -8,31 +17,309 @@ except ImportError:
     NFA = None
     DFA = None
 
-def regex_to_dfa(pattern: str) -> Tuple[Optional[dict], Optional[str]]:
-    if not pattern or not pattern.strip():
-        return None, "La expresión regular está vacía."
-    if NFA is None or DFA is None:
-        return None, "automata-lib no está instalada. Instálala con: pip install automata-lib"
-    try:
-        nfa = NFA.from_regex(pattern)
-        dfa = DFA.from_nfa(nfa)
-    except Exception as e:
-        return None, f"No se pudo construir el DFA desde la expresión regular: {e}"
+_META = set("|*+?(){}")
+_NO_SOPORTADOS = set("&^")
+
+
+class _ParserRegex:
+    """
+    Descenso recursivo para la sintaxis de regex de la app:
+    literales, concatenación, |, *, +, ?, {n}, {n,}, {n,m}, paréntesis,
+    escape con \\ y ε. Los espacios se ignoran.
+    Produce un árbol con nodos ("eps",), ("sym", c), ("cat", [..]),
+    ("alt", [..]) y ("star", nodo); las repeticiones se expanden en copias.
+    """
+
+    def __init__(self, patron: str):
+        self.s = "".join(patron.split())
+        self.i = 0
+
+    def error(self, msg: str):
+        raise ValueError(f"{msg} (posición {self.i})")
+
+    def ver(self) -> Optional[str]:
+        return self.s[self.i] if self.i < len(self.s) else None
+
+    def analizar(self):
+        nodo = self.alternativa()
+        if self.i != len(self.s):
+            self.error(f"Símbolo inesperado '{self.s[self.i]}'")
+        return nodo
+
+    def alternativa(self):
+        ramas = [self.concatenacion()]
+        while self.ver() == "|":
+            self.i += 1
+            ramas.append(self.concatenacion())
+        return ramas[0] if len(ramas) == 1 else ("alt", ramas)
+
+    def concatenacion(self):
+        partes = []
+        while self.ver() is not None and self.ver() not in "|)":
+            partes.append(self.postfijo())
+        if not partes:
+            return ("eps",)
+        return partes[0] if len(partes) == 1 else ("cat", partes)
+
+    def postfijo(self):
+        nodo = self.atomo()
+        while self.ver() is not None and self.ver() in "*+?{":
+            op = self.s[self.i]
+            self.i += 1
+            if op == "*":
+                nodo = ("star", nodo)
+            elif op == "+":
+                nodo = ("cat", [nodo, ("star", nodo)])
+            elif op == "?":
+                nodo = ("alt", [nodo, ("eps",)])
+            else:
+                nodo = self.repeticion(nodo)
+        return nodo
+
+    def repeticion(self, nodo):
+        fin = self.s.find("}", self.i)
+        if fin < 0:
+            self.error("Falta '}'")
+        cuerpo = self.s[self.i:fin]
+        self.i = fin + 1
+        try:
+            if "," in cuerpo:
+                a, b = cuerpo.split(",", 1)
+                n, m = int(a or 0), (int(b) if b else None)
+            else:
+                n = m = int(cuerpo)
+        except ValueError:
+            self.error(f"Repetición inválida '{{{cuerpo}}}'")
+        if m is not None and m < n:
+            self.error(f"Repetición inválida '{{{cuerpo}}}'")
+        partes = [nodo] * n
+        if m is None:
+            partes.append(("star", nodo))
+        else:
+            partes += [("alt", [nodo, ("eps",)])] * (m - n)
+        if not partes:
+            return ("eps",)
+        return partes[0] if len(partes) == 1 else ("cat", partes)
+
+    def atomo(self):
+        c = self.ver()
+        if c == "(":
+            self.i += 1
+            nodo = self.alternativa()
+            if self.ver() != ")":
+                self.error("Falta ')'")
+            self.i += 1
+            return nodo
+        if c == "\\":
+            if self.i + 1 >= len(self.s):
+                self.error("Escape incompleto")
+            self.i += 2
+            return ("sym", self.s[self.i - 1])
+        if c in _META:
+            self.error(f"Operador '{c}' sin operando")
+        if c in _NO_SOPORTADOS:
+            self.error(f"Operador '{c}' no soportado")
+        self.i += 1
+        if c == "ε":
+            return ("eps",)
+        return ("sym", c)
+
+
+class RegexCompilada:
+    """
+    Regex compilada con la construcción de Glushkov: un estado por aparición
+    de símbolo (posición) más el inicial, sin transiciones ε.
+
+    Los estados del DFA son máscaras de bits de posiciones y se calculan bajo
+    demanda (DFA perezoso). La caché de estados es LRU y acotada por
+    max_estados, de modo que una regex como (a|b)*a(a|b){12} puede probarse
+    contra cadenas sin construir sus 2^13 estados.
+    """
+
+    def __init__(self, patron: str, max_estados: int = 4096):
+        arbol = _ParserRegex(patron).analizar()
+        self.simbolo_de: List[Optional[str]] = [None]  # posición 0 = estado inicial
+        self.siguientes: List[int] = [0]
+        _, primeros, ultimos = self._glushkov(arbol)
+        self.siguientes[0] = primeros
+        self.finales = ultimos | (1 if self._nulo else 0)
+        self.por_simbolo: Dict[str, int] = {}
+        for p, c in enumerate(self.simbolo_de):
+            if c is not None:
+                self.por_simbolo[c] = self.por_simbolo.get(c, 0) | (1 << p)
+        self.alfabeto = sorted(self.por_simbolo)
+        self.inicial = 1
+        self.max_estados = max_estados
+        self._cache: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+
+    def _glushkov(self, arbol):
+        """Devuelve (anulable, primeros, últimos) y rellena siguientes."""
+        nulo, primeros, ultimos = self._visitar(arbol)
+        self._nulo = nulo
+        return nulo, primeros, ultimos
 
+    def _enlazar(self, desde: int, hacia: int):
+        sig = self.siguientes
+        while desde:
+            bajo = desde & -desde
+            sig[bajo.bit_length() - 1] |= hacia
+            desde ^= bajo
+
+    def _visitar(self, nodo):
+        tipo = nodo[0]
+        if tipo == "eps":
+            return True, 0, 0
+        if tipo == "sym":
+            p = len(self.simbolo_de)
+            self.simbolo_de.append(nodo[1])
+            self.siguientes.append(0)
+            return False, 1 << p, 1 << p
+        if tipo == "alt":
+            nulo, prim, ult = False, 0, 0
+            for h in nodo[1]:
+                n, f, l = self._visitar(h)
+                nulo, prim, ult = nulo or n, prim | f, ult | l
+            return nulo, prim, ult
+        if tipo == "star":
+            _, prim, ult = self._visitar(nodo[1])
+            self._enlazar(ult, prim)
+            return True, prim, ult
+        # cat: los últimos acumulados enlazan con los primeros de cada hijo
+        nulo, prim, ult = True, 0, 0
+        for h in nodo[1]:
+            n, f, l = self._visitar(h)
+            self._enlazar(ult, f)
+            if nulo:
+                prim |= f
+            ult = (ult | l) if n else l
+            nulo = nulo and n
+        return nulo, prim, ult
+
+    def mover(self, estado: int, simbolo: str) -> int:
+        fila = self._cache.get(estado)
+        if fila is None:
+            fila = {}
+            self._cache[estado] = fila
+            if len(self._cache) > self.max_estados:
+                self._cache.popitem(last=False)
+        else:
+            try:
+                self._cache.move_to_end(estado)
+            except KeyError:  # expulsado por otra sesión entre get y move
+                pass
+        destino = fila.get(simbolo)
+        if destino is None:
+            alcanzables = 0
+            resto = estado
+            sig = self.siguientes
+            while resto:
+                bajo = resto & -resto
+                alcanzables |= sig[bajo.bit_length() - 1]
+                resto ^= bajo
+            destino = alcanzables & self.por_simbolo.get(simbolo, 0)
+            fila[simbolo] = destino
+        return destino
+
+    def acepta_estado(self, estado: int) -> bool:
+        return bool(estado & self.finales)
+
+    def coincide(self, cadena: str) -> bool:
+        estado = self.inicial
+        for ch in cadena:
+            estado = self.mover(estado, ch)
+            if not estado:
+                return False
+        return self.acepta_estado(estado)
+
+    @medido("construcción de subconjuntos (regex)")
+    def materializar(self, max_estados: Optional[int] = None) -> Tuple[dict, bool]:
+        """
+        Recorre el DFA en BFS y lo devuelve en el formato de regex_to_dfa.
+        Con max_estados se detiene al alcanzar ese número de estados y
+        devuelve (vista previa, True); los estados sin expandir quedan sin
+        transiciones salientes.
+        """
+        ids = {self.inicial: 0}
+        orden = [self.inicial]
+        transiciones: Dict[str, Dict[str, str]] = {}
+        truncado = False
+        i = 0
+        while i < len(orden):
+            estado = orden[i]
+            movs = {}
+            for a in self.alfabeto:
+                d = self.mover(estado, a)
+                if not d:
+                    continue
+                if d not in ids:
+                    if max_estados is not None and len(orden) >= max_estados:
+                        truncado = True
+                        continue
+                    ids[d] = len(orden)
+                    orden.append(d)
+                movs[a] = f"q{ids[d]}"
+            transiciones[f"q{i}"] = movs
+            i += 1
+        dfa_dict = {
+            "states": [f"q{i}" for i in range(len(orden))],
+            "input_symbols": list(self.alfabeto),
+            "initial_state": "q0",
+            "final_states": [f"q{ids[e]}" for e in orden if self.acepta_estado(e)],
+            "transitions": transiciones,
+        }
+        return dfa_dict, truncado
+
+
+@lru_cache(maxsize=128)
+def compilar_regex(patron: str) -> RegexCompilada:
+    return RegexCompilada(patron)
+
+def _regex_to_dfa_automata_lib(pattern: str) -> dict:
+    nfa = NFA.from_regex(pattern)
+    dfa = DFA.from_nfa(nfa)
     transitions: Dict[str, Dict[str, str]] = {}
     for state, trans in dfa.transitions.items():
         o = str(state)
         transitions[o] = {}
         for symbol, dest in trans.items():
             transitions[o][str(symbol)] = str(dest)
-
-    dfa_dict = {
+    return {
         "states": [str(s) for s in dfa.states],
         "input_symbols": [str(a) for a in dfa.input_symbols],
         "initial_state": str(dfa.initial_state),
         "final_states": [str(s) for s in dfa.final_states],
         "transitions": transitions,
     }
+
+@cacheado(normalizar=sin_normalizar, persistir=(str,))
+def regex_to_dfa(pattern: str, minimizar: bool = True,
+                 max_estados: Optional[int] = 5000) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Construye el DFA de la expresión regular con el compilador propio
+    (Glushkov + DFA perezoso). Por defecto se minimiza con Hopcroft y los
+    estados quedan como q0, q1, ... (ver minimizar_afd).
+
+    Si el DFA supera max_estados se devuelve una vista previa con los
+    primeros estados y la clave "truncado": True (sin minimizar). Los
+    operadores que el compilador propio no soporta se delegan en
+    automata-lib cuando está instalada.
+    """
+    if not pattern or not pattern.strip():
+        return None, "La expresión regular está vacía."
+    try:
+        dfa_dict, truncado = compilar_regex(pattern).materializar(max_estados)
+    except ValueError as e:
+        if NFA is None or DFA is None:
+            return None, f"No se pudo construir el DFA desde la expresión regular: {e}"
+        try:
+            dfa_dict, truncado = _regex_to_dfa_automata_lib(pattern), False
+        except Exception as e2:
+            return None, f"No se pudo construir el DFA desde la expresión regular: {e2}"
+
+    if truncado:
+        dfa_dict["truncado"] = True
+    elif minimizar:
+        dfa_dict = minimizar_afd(dfa_dict)
     return dfa_dict, None
 
 def dfa_to_regular_grammar(dfa_dict: dict) -> List[str]:
@@ -49,6 +336,7 @@ def dfa_to_regular_grammar(dfa_dict: dict) -> List[str]:
         reglas.append(f"{start} → ε")
     return reglas
 
+@cacheado(normalizar=sin_normalizar, persistir=(str,))
 def regex_to_dfa_and_grammar(pattern: str):
     dfa, err = regex_to_dfa(pattern)
     if err:
@@ -56,67 +344,55 @@ def regex_to_dfa_and_grammar(pattern: str):
     reglas = dfa_to_regular_grammar(dfa)
     return dfa, reglas, None
 
-def render_dfa_graphviz(dfa_dict: dict, filename: str = "dfa") -> str:
-    dot = graphviz.Digraph(format="png")
-    dot.attr(rankdir="LR")
-    finals = set(str(s) for s in dfa_dict.get("final_states", []))
-    start = str(dfa_dict.get("initial_state", ""))
-    dot.node("ini", shape="point")
-    for s in dfa_dict.get("states", []):
-        s = str(s)
-        dot.node(s, shape=("doublecircle" if s in finals else "circle"))
-    if start:
-        dot.edge("ini", start)
-    for origen, movs in dfa_dict.get("transitions", {}).items():
-        for simb, dest in movs.items():
-            dot.edge(str(origen), str(dest), label=str(simb))
-    dot.render(filename, cleanup=True)
-    return filename + ".png"
-
-def _leer_glc(texto: str) -> Dict[str, List[str]]:
-    gr: Dict[str, List[str]] = {}
-    for linea in texto.strip().split("\n"):
-        linea = linea.strip()
-        if not linea or ("->" not in linea and "→" not in linea):
-            continue
-        if "->" in linea:
-            izq, der = linea.split("->", 1)
-        else:
-            izq, der = linea.split("→", 1)
-        A = izq.strip()
-        alternativas = [p.strip() for p in der.split("|")]
-        gr.setdefault(A, []).extend(alternativas)
-    return gr
+def render_dfa_graphviz(dfa_dict: dict, esperar: bool = True):
+    with tramo("generación DOT"):
+        dot = graphviz.Digraph(format="png")
+        dot.attr(rankdir="LR")
+        finals = set(str(s) for s in dfa_dict.get("final_states", []))
+        start = str(dfa_dict.get("initial_state", ""))
+        dot.node("ini", shape="point")
+        for s in dfa_dict.get("states", []):
+            s = str(s)
+            dot.node(s, shape=("doublecircle" if s in finals else "circle"))
+        if start:
+            dot.edge("ini", start)
+        for origen, movs in dfa_dict.get("transitions", {}).items():
+            for simb, dest in movs.items():
+                dot.edge(str(origen), str(dest), label=str(simb))
+    return renderizar(dot, esperar=esperar)
 
+@cacheado(persistir=(clave_gramatica,))
 def glc_to_pda(texto: str):
     if not texto or not texto.strip():
         return None, "La gramática está vacía."
-    gr = _leer_glc(texto)
-    if not gr:
+    g = compilar_gramatica(texto)
+    if g.vacia:
         return None, "No se pudieron leer producciones válidas."
 
-    start_symbol = next(iter(gr.keys()))
+    nom = g.simbolos
+    start_symbol = g.nombre(g.inicio_lhs)
     states = ["q"]
     input_symbols: set = set()
     stack_symbols: set = {start_symbol}
     transitions: Dict[str, Dict[str, List[dict]]] = {"q": {}}
+    eps_moves = transitions["q"].setdefault("", [])
 
-    for A, prods in gr.items():
+    for lhs in g.orden_lhs:
+        A = g.nombre(lhs)
         stack_symbols.add(A)
-        for prod in prods:
-            if prod in ("ε", ""):
-                transitions["q"].setdefault("", []).append({"pop": A, "push": ""})
+        for idx in g.por_lhs[lhs]:
+            rhs = g.producciones[idx][1]
+            if not rhs:
+                eps_moves.append({"pop": A, "push": ""})
                 continue
-            rhs_tokens = prod.split()
-            if len(rhs_tokens) == 1:
-                rhs_tokens = list(rhs_tokens[0])
-            for x in rhs_tokens:
-                if x.isupper():
-                    stack_symbols.add(x)
+            for x in rhs:
+                if g.es_nt[x]:
+                    stack_symbols.add(nom[x])
                 else:
-                    input_symbols.add(x)
-            push_str = "".join(reversed(rhs_tokens))
-            transitions["q"].setdefault("", []).append({"pop": A, "push": push_str})
+                    input_symbols.add(nom[x])
+            # El primer símbolo de push queda en la cima: A → aSb apila "aSb".
+            push_str = "".join(nom[x] for x in rhs)
+            eps_moves.append({"pop": A, "push": push_str})
 
     for a in sorted(input_symbols):
         transitions["q"].setdefault(a, []).append({"pop": a, "push": ""})
@@ -133,28 +409,28 @@ def glc_to_pda(texto: str):
     }
     return pda, None
 
-def render_pda_graphviz(pda_dict: dict, filename: str = "pda") -> str:
-    dot = graphviz.Digraph(format="png")
-    dot.attr(rankdir="LR")
-    states = [str(s) for s in pda_dict.get("states", [])]
-    initial = str(pda_dict.get("initial_state", states[0] if states else "q"))
-    finals = set(str(s) for s in pda_dict.get("final_states", []))
-    dot.node("ini", shape="point")
-    for s in states:
-        dot.node(s, shape=("doublecircle" if s in finals else "circle"))
-    if states:
-        dot.edge("ini", initial)
-    transitions = pda_dict.get("transitions", {})
-    for origen, movs in transitions.items():
-        for leer, lst in movs.items():
-            for t in lst:
-                to = str(t.get("to", origen))
-                pop = t.get("pop", "")
-                push = t.get("push", "")
-                lbl = f"{leer if leer else 'ε'}, {pop or 'ε'}→{push or 'ε'}"
-                dot.edge(str(origen), to, label=lbl)
-    dot.render(filename, cleanup=True)
-    return filename + ".png"
+def render_pda_graphviz(pda_dict: dict, esperar: bool = True):
+    with tramo("generación DOT"):
+        dot = graphviz.Digraph(format="png")
+        dot.attr(rankdir="LR")
+        states = [str(s) for s in pda_dict.get("states", [])]
+        initial = str(pda_dict.get("initial_state", states[0] if states else "q"))
+        finals = set(str(s) for s in pda_dict.get("final_states", []))
+        dot.node("ini", shape="point")
+        for s in states:
+            dot.node(s, shape=("doublecircle" if s in finals else "circle"))
+        if states:
+            dot.edge("ini", initial)
+        transitions = pda_dict.get("transitions", {})
+        for origen, movs in transitions.items():
+            for leer, lst in movs.items():
+                for t in lst:
+                    to = str(t.get("to", origen))
+                    pop = t.get("pop", "")
+                    push = t.get("push", "")
+                    lbl = f"{leer if leer else 'ε'}, {pop or 'ε'}→{push or 'ε'}"
+                    dot.edge(str(origen), to, label=lbl)
+    return renderizar(dot, esperar=esperar)
 
 def pda_to_transition_rows(pda_dict: dict) -> List[dict]:
     rows: List[dict] = []
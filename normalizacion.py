@@ -0,0 +1,452 @@
+"""
+Normalización de gramáticas libres de contexto sobre la representación
+compilada: símbolos productivos, alcanzables y anulables; eliminación de
+símbolos inútiles, de reglas ε y de reglas unitarias; forma normal de
+Chomsky.
+
+Los conjuntos se calculan con listas de trabajo e índices inversos
+(no terminal → reglas donde aparece), así que cada regla se revisa una
+vez por símbolo de su lado derecho en lugar de repetir pasadas completas.
+Solo se consideran las reglas A → α (las de LHS con contexto se ignoran,
+igual que en generar_cadenas).
+"""
+import heapq
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+from canonico import LETRAS_NO_TERMINALES
+from grammar_ir import EPSILON, GramaticaCompilada, compilar_gramatica
+from trazas import medido
+
+Reglas = Dict[int, List[Tuple[int, ...]]]
+
+
+class _Simbolos:
+    """Tabla de símbolos de la gramática original, ampliable con no terminales nuevos."""
+
+    def __init__(self, g: GramaticaCompilada):
+        self.nombres = list(g.simbolos)
+        self.es_nt = bytearray(g.es_nt)
+        self._libres = (c for c in LETRAS_NO_TERMINALES if c not in g.ids)
+
+    def nuevo_nt(self) -> int:
+        nombre = next(self._libres, None)
+        if nombre is None:
+            raise ValueError("No quedan nombres libres para nuevos no terminales.")
+        self.nombres.append(nombre)
+        self.es_nt.append(1)
+        return len(self.nombres) - 1
+
+
+def reglas_de(g: GramaticaCompilada) -> Reglas:
+    """Copia de las reglas A → α de g, sin duplicados."""
+    return {A: list(dict.fromkeys(prods)) for A, prods in g.prods_de.items()}
+
+
+def _punto_fijo(reglas: Reglas, es_nt, terminales_valen: bool) -> Set[int]:
+    """
+    No terminales con alguna regla cuyos símbolos cumplen todos la propiedad.
+
+    Cada regla lleva la cuenta de no terminales que aún no la cumplen; cuando
+    un no terminal entra en el conjunto se descuentan solo las reglas donde
+    aparece (índice inverso). Los terminales la cumplen si terminales_valen.
+    """
+    duenio: List[int] = []
+    faltan: List[int] = []
+    usos: Dict[int, List[int]] = {}
+    conjunto: Set[int] = set()
+    trabajo: List[int] = []
+    for A, prods in reglas.items():
+        for rhs in prods:
+            if not terminales_valen and any(not es_nt[x] for x in rhs):
+                continue
+            r = len(duenio)
+            duenio.append(A)
+            cuenta = 0
+            for x in rhs:
+                if es_nt[x]:
+                    cuenta += 1
+                    usos.setdefault(x, []).append(r)
+            faltan.append(cuenta)
+            if cuenta == 0 and A not in conjunto:
+                conjunto.add(A)
+                trabajo.append(A)
+    while trabajo:
+        B = trabajo.pop()
+        for r in usos.get(B, ()):
+            faltan[r] -= 1
+            if faltan[r] == 0 and duenio[r] not in conjunto:
+                conjunto.add(duenio[r])
+                trabajo.append(duenio[r])
+    return conjunto
+
+
+def productivos(reglas: Reglas, es_nt) -> Set[int]:
+    """No terminales que derivan alguna cadena de terminales."""
+    return _punto_fijo(reglas, es_nt, terminales_valen=True)
+
+
+def anulables(reglas: Reglas, es_nt) -> Set[int]:
+    """No terminales que derivan ε (A ⇒* ε)."""
+    return _punto_fijo(reglas, es_nt, terminales_valen=False)
+
+
+def alcanzables(reglas: Reglas, es_nt, inicio: int) -> Set[int]:
+    """No terminales que aparecen en alguna forma sentencial desde el inicial."""
+    vistos = {inicio}
+    pila = [inicio]
+    while pila:
+        for rhs in reglas.get(pila.pop(), ()):
+            for x in rhs:
+                if es_nt[x] and x not in vistos:
+                    vistos.add(x)
+                    pila.append(x)
+    return vistos
+
+
+def eliminar_inutiles(reglas: Reglas, es_nt, inicio: int) -> Reglas:
+    """Quita las reglas con no terminales improductivos y después los inalcanzables."""
+    prod = productivos(reglas, es_nt)
+    utiles: Reglas = {}
+    for A, prods in reglas.items():
+        if A not in prod:
+            continue
+        quedan = [rhs for rhs in prods if all(not es_nt[x] or x in prod for x in rhs)]
+        if quedan:
+            utiles[A] = quedan
+    if inicio not in utiles:
+        return {}
+    alc = alcanzables(utiles, es_nt, inicio)
+    return {A: prods for A, prods in utiles.items() if A in alc}
+
+
+def eliminar_epsilon(reglas: Reglas, es_nt) -> Tuple[Reglas, Set[int]]:
+    """
+    Reglas sin producciones ε: cada regla se expande en las variantes que
+    omiten símbolos anulables. Devuelve (reglas, anulables).
+    """
+    nul = anulables(reglas, es_nt)
+    nuevas: Reglas = {}
+    for A, prods in reglas.items():
+        vistas = set()
+        for rhs in prods:
+            variantes = [()]
+            for x in rhs:
+                if x in nul:
+                    variantes = [v + (x,) for v in variantes] + variantes
+                else:
+                    variantes = [v + (x,) for v in variantes]
+            for v in variantes:
+                if v and v not in vistas:
+                    vistas.add(v)
+                    nuevas.setdefault(A, []).append(v)
+    return nuevas, nul
+
+
+def eliminar_unitarias(reglas: Reglas, es_nt) -> Reglas:
+    """Sustituye las cadenas A ⇒* B de reglas unitarias por las reglas no unitarias de B."""
+    unitarias: Dict[int, List[int]] = {}
+    propias: Reglas = {}
+    for A, prods in reglas.items():
+        for rhs in prods:
+            if len(rhs) == 1 and es_nt[rhs[0]]:
+                if rhs[0] != A:
+                    unitarias.setdefault(A, []).append(rhs[0])
+            else:
+                propias.setdefault(A, []).append(rhs)
+
+    nuevas: Reglas = {}
+    for A in reglas:
+        if A not in unitarias:
+            if A in propias:
+                nuevas[A] = propias[A]
+            continue
+        # Solo se recorren las aristas unitarias, no todas las reglas.
+        alcanzados = {A}
+        pila = [A]
+        while pila:
+            for C in unitarias.get(pila.pop(), ()):
+                if C not in alcanzados:
+                    alcanzados.add(C)
+                    pila.append(C)
+        lista = list(dict.fromkeys(rhs for B in alcanzados for rhs in propias.get(B, ())))
+        if lista:
+            nuevas[A] = lista
+    return nuevas
+
+
+def longitudes_minimas(reglas: Reglas, es_nt) -> Dict[int, int]:
+    """
+    Longitud de la cadena terminal más corta que deriva cada no terminal
+    productivo (los improductivos no aparecen).
+
+    Algoritmo de Knuth (Dijkstra generalizado): una regla entra en el montículo
+    con su suma cuando todos sus no terminales tienen ya el mínimo fijado.
+    """
+    duenio: List[int] = []
+    faltan: List[int] = []
+    suma: List[int] = []
+    usos: Dict[int, List[int]] = {}
+    monticulo: List[Tuple[int, int]] = []
+    for A, prods in reglas.items():
+        for rhs in prods:
+            r = len(duenio)
+            duenio.append(A)
+            cuenta = terminales = 0
+            for x in rhs:
+                if es_nt[x]:
+                    cuenta += 1
+                    usos.setdefault(x, []).append(r)
+                else:
+                    terminales += 1
+            faltan.append(cuenta)
+            suma.append(terminales)
+            if cuenta == 0:
+                monticulo.append((terminales, A))
+    heapq.heapify(monticulo)
+    minimo: Dict[int, int] = {}
+    while monticulo:
+        valor, A = heapq.heappop(monticulo)
+        if A in minimo:
+            continue
+        minimo[A] = valor
+        for r in usos.get(A, ()):
+            suma[r] += valor
+            faltan[r] -= 1
+            if faltan[r] == 0 and duenio[r] not in minimo:
+                heapq.heappush(monticulo, (suma[r], duenio[r]))
+    return minimo
+
+
+def primeros_terminales(reglas: Reglas, es_nt, nul: Set[int]) -> Dict[int, Set[int]]:
+    """
+    Terminales con los que puede empezar una cadena derivada de cada no
+    terminal. Las inclusiones FIRST(B) ⊆ FIRST(A) se guardan como índice
+    inverso B → [A] y solo se propagan los conjuntos que crecen.
+    """
+    primeros: Dict[int, Set[int]] = {A: set() for A in reglas}
+    incluye: Dict[int, List[int]] = {}
+    for A, prods in reglas.items():
+        for rhs in prods:
+            for x in rhs:
+                if not es_nt[x]:
+                    primeros[A].add(x)
+                    break
+                incluye.setdefault(x, []).append(A)
+                if x not in nul:
+                    break
+    trabajo = [A for A, ps in primeros.items() if ps]
+    while trabajo:
+        B = trabajo.pop()
+        for A in incluye.get(B, ()):
+            if not primeros[B] <= primeros[A]:
+                primeros[A] |= primeros[B]
+                trabajo.append(A)
+    return primeros
+
+
+class TablaPoda:
+    """
+    Datos por no terminal para podar búsquedas: longitud mínima de lo que
+    deriva (solo los productivos tienen mínimo), primeros terminales posibles
+    y anulables. Se calcula sobre las reglas productivas de la gramática.
+    """
+
+    __slots__ = ("es_nt", "minimo", "primeros", "anulables")
+
+    def __init__(self, g: GramaticaCompilada):
+        self.es_nt = g.es_nt
+        reglas = reglas_de(g)
+        prod = productivos(reglas, g.es_nt)
+        reglas = {
+            A: [rhs for rhs in prods if all(not g.es_nt[x] or x in prod for x in rhs)]
+            for A, prods in reglas.items() if A in prod
+        }
+        self.minimo = longitudes_minimas(reglas, g.es_nt)
+        self.anulables = {A for A, m in self.minimo.items() if m == 0}
+        self.primeros = primeros_terminales(reglas, g.es_nt, self.anulables)
+
+    def productivo(self, x: int) -> bool:
+        return not self.es_nt[x] or x in self.minimo
+
+    def minimo_de(self, simbolos) -> float:
+        """Longitud mínima de lo que deriva la secuencia (infinito si no deriva nada)."""
+        total = 0
+        for x in simbolos:
+            if not self.es_nt[x]:
+                total += 1
+            elif x in self.minimo:
+                total += self.minimo[x]
+            else:
+                return math.inf
+        return total
+
+    def primeros_de(self, simbolos) -> Set[int]:
+        """Terminales con los que puede empezar lo que deriva la secuencia."""
+        res: Set[int] = set()
+        for x in simbolos:
+            if not self.es_nt[x]:
+                res.add(x)
+                break
+            res |= self.primeros.get(x, set())
+            if x not in self.anulables:
+                break
+        return res
+
+
+@lru_cache(maxsize=256)
+def tabla_poda(g: GramaticaCompilada) -> TablaPoda:
+    """TablaPoda de g; como compilar_gramatica comparte instancias, se calcula una vez por gramática."""
+    return TablaPoda(g)
+
+
+def _aparecen_en_rhs(reglas: Reglas, A: int) -> bool:
+    return any(A in rhs for prods in reglas.values() for rhs in prods)
+
+
+def _separar_terminales(reglas: Reglas, tabla: _Simbolos) -> Reglas:
+    """En los lados derechos de longitud ≥ 2 cada terminal a pasa a un no terminal Tₐ → a."""
+    propio: Dict[int, int] = {}
+
+    def sustituto(x: int) -> int:
+        if tabla.es_nt[x]:
+            return x
+        if x not in propio:
+            propio[x] = tabla.nuevo_nt()
+        return propio[x]
+
+    nuevas: Reglas = {}
+    for A, prods in reglas.items():
+        nuevas[A] = [tuple(map(sustituto, rhs)) if len(rhs) >= 2 else rhs for rhs in prods]
+    for a, T in propio.items():
+        nuevas[T] = [(a,)]
+    return nuevas
+
+
+def _binarizar(reglas: Reglas, tabla: _Simbolos) -> Reglas:
+    """A → X₁X₂…Xₖ (k > 2) pasa a A → X₁Y₁, Y₁ → X₂Y₂, …, Yₖ₋₂ → Xₖ₋₁Xₖ."""
+    nuevas: Reglas = {}
+    for A, prods in reglas.items():
+        for rhs in prods:
+            destino = A
+            for x in rhs[:-2]:
+                Y = tabla.nuevo_nt()
+                nuevas.setdefault(destino, []).append((x, Y))
+                destino = Y
+            nuevas.setdefault(destino, []).append(rhs[-2:] if len(rhs) > 2 else rhs)
+    return nuevas
+
+
+def _partir_anulables(reglas: Reglas, tabla: _Simbolos, nul: Set[int], maximo: int = 2) -> Reglas:
+    """
+    Parte los lados derechos con más de `maximo` + 1 anulables en una cadena
+    A → α₁Y₁, Y₁ → α₂Y₂, … con a lo sumo `maximo` anulables por tramo, para
+    que eliminar_epsilon genere pocas variantes por regla (en lugar de 2ᵏ).
+    Si no quedan nombres libres la regla se deja entera.
+    """
+    nuevas: Reglas = {}
+    for A, prods in reglas.items():
+        for rhs in prods:
+            if sum(1 for x in rhs if x in nul) <= maximo + 1:
+                nuevas.setdefault(A, []).append(rhs)
+                continue
+            try:
+                partes, destino, tramo, cuenta = [], A, [], 0
+                for pos, x in enumerate(rhs):
+                    tramo.append(x)
+                    cuenta += x in nul
+                    if cuenta == maximo and pos + 1 < len(rhs):
+                        Y = tabla.nuevo_nt()
+                        partes.append((destino, tuple(tramo) + (Y,)))
+                        destino, tramo, cuenta = Y, [], 0
+                partes.append((destino, tuple(tramo)))
+            except ValueError:
+                partes = [(A, rhs)]
+            for izq, der in partes:
+                if der:
+                    nuevas.setdefault(izq, []).append(der)
+    return nuevas
+
+
+def _construir(tabla: _Simbolos, inicio: int, reglas: Reglas, con_vacia: bool) -> GramaticaCompilada:
+    """GramaticaCompilada con el inicial primero; con_vacia añade S → ε."""
+    def escribir(rhs):
+        return "".join(tabla.nombres[x] for x in rhs)
+
+    def pares() -> Iterable[Tuple[str, str]]:
+        S = tabla.nombres[inicio]
+        if con_vacia:
+            yield S, EPSILON
+        for rhs in reglas.get(inicio, ()):
+            yield S, escribir(rhs)
+        for A, prods in reglas.items():
+            if A != inicio:
+                for rhs in prods:
+                    yield tabla.nombres[A], escribir(rhs)
+
+    if not con_vacia and not reglas.get(inicio):
+        return GramaticaCompilada()
+    return GramaticaCompilada.desde_reglas(pares())
+
+
+def _inicio_propio(reglas: Reglas, tabla: _Simbolos, inicio: int, nul: bool) -> int:
+    """Nuevo inicial S₀ → S si S aparece a la derecha y hace falta S₀ → ε."""
+    if nul and _aparecen_en_rhs(reglas, inicio):
+        S0 = tabla.nuevo_nt()
+        reglas[S0] = [(inicio,)]
+        return S0
+    return inicio
+
+
+@medido("simplificación de la gramática")
+def simplificar(g: GramaticaCompilada) -> GramaticaCompilada:
+    """
+    Gramática equivalente sin símbolos inútiles, sin reglas ε (salvo S → ε
+    con S fuera de los lados derechos) y sin reglas unitarias. Todo símbolo
+    de un lado derecho aporta al menos un carácter, así que las búsquedas
+    por longitud pueden podar sin perder cadenas. Las reglas con muchos
+    anulables se parten antes de quitar las reglas ε (crecimiento lineal).
+    """
+    if g.vacia or g.inicio is None:
+        return GramaticaCompilada()
+    tabla = _Simbolos(g)
+    reglas = eliminar_inutiles(reglas_de(g), tabla.es_nt, g.inicio)
+    if not reglas:
+        return GramaticaCompilada()
+    genera_vacia = g.inicio in anulables(reglas, tabla.es_nt)
+    inicio = _inicio_propio(reglas, tabla, g.inicio, genera_vacia)
+    reglas = _partir_anulables(reglas, tabla, anulables(reglas, tabla.es_nt))
+    reglas, _ = eliminar_epsilon(reglas, tabla.es_nt)
+    reglas = eliminar_unitarias(reglas, tabla.es_nt)
+    reglas = eliminar_inutiles(reglas, tabla.es_nt, inicio)
+    return _construir(tabla, inicio, reglas, genera_vacia)
+
+
+@medido("forma normal de Chomsky")
+def forma_normal_chomsky(g: GramaticaCompilada) -> GramaticaCompilada:
+    """
+    Gramática equivalente en forma normal de Chomsky: reglas A → BC o A → a,
+    más S₀ → ε si el lenguaje contiene ε. Se binariza antes de quitar las
+    reglas ε para que el tamaño crezca de forma lineal.
+    """
+    if g.vacia or g.inicio is None:
+        return GramaticaCompilada()
+    tabla = _Simbolos(g)
+    reglas = eliminar_inutiles(reglas_de(g), tabla.es_nt, g.inicio)
+    if not reglas:
+        return GramaticaCompilada()
+    genera_vacia = g.inicio in anulables(reglas, tabla.es_nt)
+    inicio = _inicio_propio(reglas, tabla, g.inicio, genera_vacia)
+    reglas = _separar_terminales(reglas, tabla)
+    reglas = _binarizar(reglas, tabla)
+    reglas, _ = eliminar_epsilon(reglas, tabla.es_nt)
+    reglas = eliminar_unitarias(reglas, tabla.es_nt)
+    reglas = eliminar_inutiles(reglas, tabla.es_nt, inicio)
+    return _construir(tabla, inicio, reglas, genera_vacia)
+
+
+def formas_normalizadas(texto: str) -> Tuple[str, str]:
+    """(gramática simplificada, forma normal de Chomsky) como texto, para mostrarlas."""
+    g = compilar_gramatica(texto)
+    return simplificar(g).a_texto(), forma_normal_chomsky(g).a_texto()
@@ -0,0 +1,160 @@
+import hashlib
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+from trazas import tramo_en_segundo_plano
+
+
+class CacheRender:
+    """
+    LRU en memoria de imágenes de Graphviz indexada por el hash del código DOT
+    y el formato. Como la clave es el contenido, dos sesiones que dibujan el
+    mismo grafo comparten la imagen y nunca ven la de otra sesión.
+
+    Se limita tanto el número de entradas como el total de bytes guardados.
+    """
+
+    def __init__(self, max_entradas: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(fuente: str, formato: str) -> str:
+        return hashlib.sha256(f"{formato}\0{fuente}".encode("utf-8")).hexdigest()
+
+    def obtener(self, clave: str):
+        with self._lock:
+            img = self._datos.get(clave)
+            if img is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return img
+
+    def guardar(self, clave: str, img: bytes):
+        with self._lock:
+            previa = self._datos.pop(clave, None)
+            if previa is not None:
+                self._bytes -= len(previa)
+            self._datos[clave] = img
+            self._bytes += len(img)
+            while self._datos and (len(self._datos) > self.max_entradas or self._bytes > self.max_bytes):
+                _, vieja = self._datos.popitem(last=False)
+                self._bytes -= len(vieja)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+
+cache_render = CacheRender()
+
+
+class RenderOcupado(RuntimeError):
+    """La cola de dibujo está llena; el llamador debe mostrar la alternativa en texto."""
+
+
+def _dibujar(fuente: str, formato: str, motor: str, timeout: float) -> bytes:
+    try:
+        res = subprocess.run(
+            [motor, f"-T{formato}"],
+            input=fuente.encode("utf-8"),
+            capture_output=True,
+            timeout=timeout,
+        )
+    except FileNotFoundError:
+        raise RuntimeError(f"No se encontró el ejecutable '{motor}' de Graphviz.") from None
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"Graphviz superó {timeout:g} s dibujando el grafo.") from None
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.decode("utf-8", "replace").strip() or "Graphviz falló.")
+    return res.stdout
+
+
+class ServicioRender:
+    """
+    Dibuja en segundo plano con un pool acotado de hilos (cada trabajo es un
+    proceso `dot` independiente, así que los hilos no compiten por el GIL).
+
+    - solicitar() devuelve un Future con los bytes de la imagen.
+    - Un mismo DOT pedido dos veces mientras se dibuja comparte el Future.
+    - Cada proceso `dot` se mata al superar `timeout` segundos.
+    - Con más de `max_pendientes` trabajos en curso se rechaza con RenderOcupado.
+    """
+
+    def __init__(self, max_hilos: int = 2, max_pendientes: int = 8, timeout: float = 20.0,
+                 cache: CacheRender = cache_render):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_pendientes = max_pendientes
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="render")
+        self._en_curso: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def solicitar(self, dot, formato: str = "png") -> Future:
+        fuente = dot.source
+        clave = CacheRender.clave(fuente, formato)
+        img = self.cache.obtener(clave)
+        if img is not None:
+            listo: Future = Future()
+            listo.set_result(img)
+            return listo
+        with self._lock:
+            futuro = self._en_curso.get(clave)
+            if futuro is not None:
+                return futuro
+            if len(self._en_curso) >= self.max_pendientes:
+                ocupado: Future = Future()
+                ocupado.set_exception(RenderOcupado("Hay demasiados grafos dibujándose; inténtalo de nuevo."))
+                return ocupado
+            motor = getattr(dot, "engine", None) or "dot"
+            futuro = self._pool.submit(_dibujar, fuente, formato, motor, self.timeout)
+            self._en_curso[clave] = futuro
+        # El tramo se anota desde este hilo; el de dibujo no toca el registro de la petición.
+        tramo_en_segundo_plano("dot (Graphviz)", futuro)
+        futuro.add_done_callback(lambda f: self._terminar(clave, f))
+        return futuro
+
+    def _terminar(self, clave: str, futuro: Future):
+        with self._lock:
+            self._en_curso.pop(clave, None)
+        if not futuro.cancelled() and futuro.exception() is None:
+            self.cache.guardar(clave, futuro.result())
+
+
+servicio_render = ServicioRender()
+
+
+def renderizar(dot, formato: str = "png", esperar: bool = True):
+    """
+    Dibuja un graphviz.Digraph sin archivos intermedios, reutilizando el
+    resultado si ese mismo DOT ya se dibujó antes.
+
+    Con esperar=True devuelve los bytes de la imagen; con esperar=False
+    devuelve el Future del servicio de dibujo para no bloquear al llamador.
+    """
+    futuro = servicio_render.solicitar(dot, formato)
+    return futuro.result() if esperar else futuro
+
+
+def estadisticas_render() -> Dict[str, int]:
+    return cache_render.estadisticas()
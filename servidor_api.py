@@ -0,0 +1,275 @@
+"""
+API HTTP local (JSON) para el clasificador y los conversores, solo con la
+biblioteca estándar.
+
+    python servidor_api.py --puerto 8765 --procesos 4
+
+Rutas (POST con cuerpo JSON, salvo /salud):
+  /clasificar/gramatica   {"texto": "S -> aS | b"}
+  /clasificar/automata    {"automata": {...}}  (objeto o texto JSON)
+  /convertir/regex        {"regex": "(a|b)*abb"}
+  /convertir/glc          {"texto": "S -> aSb | ε"}
+  /comparar               {"g1": "...", "g2": "...", "max_len": 6}
+  GET /salud
+
+El trabajo de CPU se hace en un pool de procesos. Si hay más de --cola
+peticiones en curso se responde 503 con Retry-After, y las que superan
+--timeout segundos reciben 504; en ese caso el pool se recicla para no
+dejar el proceso colgado. Las conexiones HTTP/1.1 se mantienen abiertas
+(keep-alive) hasta --inactividad segundos sin peticiones.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+MAX_CUERPO = 1024 * 1024
+MAX_CABECERAS = 64
+
+
+def _clasificar_gramatica(datos: dict) -> dict:
+    from chomsky_classifier import clasificar_con_explicacion
+    tipo, explicacion, pasos = clasificar_con_explicacion(_texto(datos, "texto"))
+    return {"tipo": tipo, "explicacion": explicacion, "pasos": pasos}
+
+
+def _clasificar_automata(datos: dict) -> dict:
+    from chomsky_classifier import clasificar_automata
+    auto = datos.get("automata")
+    if auto is None:
+        raise ValueError("Falta el campo 'automata'.")
+    tipo, explicacion, _, pasos = clasificar_automata(auto if isinstance(auto, str) else json.dumps(auto))
+    return {"tipo": tipo, "explicacion": explicacion, "pasos": pasos}
+
+
+def _convertir_regex(datos: dict) -> dict:
+    from model_converters import regex_to_dfa_and_grammar
+    dfa, reglas, err = regex_to_dfa_and_grammar(_texto(datos, "regex"))
+    return {"dfa": dfa, "gramatica": reglas, "error": err}
+
+
+def _convertir_glc(datos: dict) -> dict:
+    from model_converters import glc_to_pda
+    pda, err = glc_to_pda(_texto(datos, "texto"))
+    return {"pda": pda, "error": err}
+
+
+def _comparar(datos: dict) -> dict:
+    from Equivalencias import comparar_gramaticas
+    max_len = datos.get("max_len", 6)
+    if not isinstance(max_len, int) or not 0 <= max_len <= 14:
+        raise ValueError("'max_len' debe ser un entero entre 0 y 14.")
+    veredicto, L1, L2 = comparar_gramaticas(_texto(datos, "g1"), _texto(datos, "g2"), max_len)
+    return {"veredicto": veredicto, "cadenas_g1": sorted(L1), "cadenas_g2": sorted(L2)}
+
+
+def _texto(datos: dict, campo: str) -> str:
+    valor = datos.get(campo)
+    if not isinstance(valor, str):
+        raise ValueError(f"Falta el campo de texto '{campo}'.")
+    return valor
+
+
+OPERACIONES = {
+    "/clasificar/gramatica": _clasificar_gramatica,
+    "/clasificar/automata": _clasificar_automata,
+    "/convertir/regex": _convertir_regex,
+    "/convertir/glc": _convertir_glc,
+    "/comparar": _comparar,
+}
+
+
+def _ejecutar(ruta: str, datos: dict) -> Tuple[int, dict]:
+    """Se ejecuta dentro de un proceso del pool."""
+    try:
+        return 200, OPERACIONES[ruta](datos)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    except Exception as e:
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+
+
+class ServidorAPI:
+    def __init__(self, procesos: Optional[int] = None, max_cola: int = 64,
+                 timeout: float = 10.0, inactividad: float = 15.0):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.pool = self._nuevo_pool()
+        self.max_cola = max_cola
+        self.timeout = timeout
+        self.inactividad = inactividad
+        self.en_curso = 0
+        self.atendidas = 0
+        self.rechazadas = 0
+
+    def _nuevo_pool(self) -> ProcessPoolExecutor:
+        # Con fork, los procesos que se crean mientras hay conexiones abiertas
+        # heredan sus sockets y el cliente no ve el cierre hasta que el
+        # proceso muere; forkserver los crea desde un proceso limpio.
+        metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+        return ProcessPoolExecutor(max_workers=self.procesos, mp_context=multiprocessing.get_context(metodo))
+
+    async def _leer_peticion(self, reader: asyncio.StreamReader):
+        """Devuelve (método, ruta, versión, cabeceras, cuerpo) o None si se cerró la conexión."""
+        linea = await asyncio.wait_for(reader.readline(), self.inactividad)
+        if not linea:
+            return None
+        partes = linea.decode("latin-1").split()
+        if len(partes) != 3:
+            raise ValueError("Línea de petición inválida.")
+        metodo, ruta, version = partes
+        cabeceras = {}
+        while True:
+            linea = await asyncio.wait_for(reader.readline(), self.inactividad)
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            if len(cabeceras) >= MAX_CABECERAS:
+                raise ValueError("Demasiadas cabeceras.")
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        largo = int(cabeceras.get("content-length", "0") or 0)
+        if largo < 0 or largo > MAX_CUERPO:
+            raise OverflowError
+        cuerpo = await asyncio.wait_for(reader.readexactly(largo), self.timeout) if largo else b""
+        return metodo.upper(), ruta.split("?", 1)[0], version, cabeceras, cuerpo
+
+    async def _responder(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[int, dict, dict]:
+        if ruta == "/salud":
+            return 200, {
+                "estado": "ok",
+                "en_curso": self.en_curso,
+                "atendidas": self.atendidas,
+                "rechazadas": self.rechazadas,
+            }, {}
+        if ruta not in OPERACIONES:
+            return 404, {"error": f"Ruta desconocida: {ruta}"}, {}
+        if metodo != "POST":
+            return 405, {"error": "Usa POST."}, {"Allow": "POST"}
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, {"error": "El cuerpo no es JSON válido."}, {}
+        if not isinstance(datos, dict):
+            return 400, {"error": "El cuerpo debe ser un objeto JSON."}, {}
+        if self.en_curso >= self.max_cola:
+            self.rechazadas += 1
+            return 503, {"error": "Servidor ocupado, reintenta en un momento."}, {"Retry-After": "1"}
+
+        # El hueco se libera cuando termina el trabajo en el pool, no cuando
+        # se deja de esperarlo: un 504 no debe abrir sitio mientras el proceso
+        # sigue ocupado.
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            futuro = pool.submit(_ejecutar, ruta, datos)
+        except BrokenProcessPool:
+            self._reciclar(pool)
+            return 503, {"error": "Se reinició el pool de procesos, reintenta."}, {"Retry-After": "1"}
+        self.en_curso += 1
+        futuro.add_done_callback(lambda _: loop.call_soon_threadsafe(self._liberar))
+        try:
+            estado, resultado = await asyncio.wait_for(asyncio.wrap_future(futuro), self.timeout)
+            self.atendidas += 1
+            return estado, resultado, {}
+        except asyncio.TimeoutError:
+            if not futuro.done():
+                self._reciclar(pool)
+            return 504, {"error": f"La operación superó {self.timeout:g} s."}, {}
+        except BrokenProcessPool:
+            self._reciclar(pool)
+            return 503, {"error": "Se reinició el pool de procesos, reintenta."}, {"Retry-After": "1"}
+
+    def _liberar(self):
+        self.en_curso -= 1
+
+    def _reciclar(self, pool: ProcessPoolExecutor):
+        """
+        Sustituye el pool por uno nuevo y mata los procesos del viejo, para
+        que un trabajo colgado no ocupe un proceso para siempre. Los demás
+        trabajos de ese pool terminan con BrokenProcessPool (503).
+        """
+        if pool is not self.pool:
+            return
+        self.pool = self._nuevo_pool()
+        terminar = getattr(pool, "terminate_workers", None)
+        if terminar is not None:
+            terminar()
+            return
+        for proceso in list((pool._processes or {}).values()):
+            proceso.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                extra = {}
+                try:
+                    peticion = await self._leer_peticion(reader)
+                    if peticion is None:
+                        break
+                    metodo, ruta, version, cabeceras, cuerpo = peticion
+                    estado, resultado, extra = await self._responder(metodo, ruta, cuerpo)
+                    conexion = cabeceras.get("connection", "").lower()
+                    seguir = conexion != "close" and (version == "HTTP/1.1" or conexion == "keep-alive")
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except OverflowError:
+                    estado, resultado, seguir = 413, {"error": "Cuerpo demasiado grande."}, False
+                except ValueError as e:
+                    estado, resultado, seguir = 400, {"error": str(e)}, False
+                except Exception as e:
+                    estado, resultado, seguir = 500, {"error": f"{type(e).__name__}: {e}"}, False
+
+                datos = json.dumps(resultado, ensure_ascii=False).encode("utf-8")
+                cabecera = [
+                    f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(datos)}",
+                    "Connection: " + ("keep-alive" if seguir else "close"),
+                ] + [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(cabecera) + "\r\n\r\n").encode("latin-1") + datos)
+                await writer.drain()
+                if not seguir:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def servir(self, host: str, puerto: int):
+        servidor = await asyncio.start_server(self.atender, host, puerto, backlog=1024)
+        print(f"API escuchando en http://{host}:{puerto}")
+        async with servidor:
+            await servidor.serve_forever()
+
+    def cerrar(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP local del clasificador de Chomsky.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, núcleos)")
+    parser.add_argument("--cola", type=int, default=64, help="peticiones en curso antes de responder 503")
+    parser.add_argument("--timeout", type=float, default=10.0, help="segundos por petición antes de responder 504")
+    parser.add_argument("--inactividad", type=float, default=15.0, help="segundos de keep-alive sin peticiones")
+    args = parser.parse_args(argv)
+
+    api = ServidorAPI(args.procesos, args.cola, args.timeout, args.inactividad)
+    try:
+        asyncio.run(api.servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.cerrar()
+
+
+if __name__ == "__main__":
+    main()
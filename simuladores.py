@@ -0,0 +1,543 @@
+import time
+from collections import deque
+from typing import Dict, List, Sequence, Tuple, Union
+
+from automatas_finitos import AFNCompacto
+from formato_binario import AutomataBinario
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class AutomataVectorizado:
+    """
+    Simulador por lotes de un autómata finito sobre tablas NumPy.
+
+    - DFA: tabla densa int32[estados + 1, símbolos + 1]; la última fila es el
+      sumidero y la última columna recoge los caracteres fuera del alfabeto.
+    - NFA (o con transiciones ε): cada configuración es un conjunto de
+      estados en palabras uint64 y la tabla guarda, por estado y símbolo, la
+      máscara de destinos ya cerrada por ε.
+
+    Las cadenas se ordenan por longitud y se avanzan todas a la vez: en el
+    paso t solo se actualiza el prefijo del lote con longitud > t.
+    """
+
+    def __init__(self, automata: Union[dict, AutomataBinario]):
+        if np is None:
+            raise ImportError("numpy no está instalada. Instálala con: pip install numpy")
+        if isinstance(automata, AutomataBinario):
+            if automata.determinista:
+                self._desde_binario(automata)
+                return
+            automata = automata.a_dict()
+        afn = AFNCompacto(automata)
+        if any(len(a) != 1 for a in afn.alfabeto):
+            raise ValueError("La simulación por lotes requiere símbolos de un solo carácter.")
+        self.alfabeto = afn.alfabeto
+        columnas = {a: k for k, a in enumerate(self.alfabeto)}
+        self._desconocido = len(self.alfabeto)
+        limite = max((ord(a) for a in self.alfabeto), default=0) + 1
+        self._lut = np.full(limite, self._desconocido, dtype=np.int32)
+        for a, k in columnas.items():
+            self._lut[ord(a)] = k
+
+        estados = sorted(
+            {afn.inicial} | afn.finales | set(afn.trans) | set(afn.eps)
+            | {d for movs in afn.trans.values() for ds in movs.values() for d in ds}
+            | {d for ds in afn.eps.values() for d in ds}
+        )
+        ids = {s: i for i, s in enumerate(estados)}
+        self.n_estados = len(estados)
+        self.determinista = not afn.eps and all(
+            len(ds) <= 1 for movs in afn.trans.values() for ds in movs.values()
+        )
+        if self.determinista:
+            self._compilar_afd(afn, ids, columnas)
+        else:
+            self._compilar_afn(afn, estados, ids, columnas)
+
+    def _desde_binario(self, auto: AutomataBinario):
+        # El archivo ya guarda la tabla densa con la misma disposición: se usa sin copiarla.
+        self.alfabeto = list(auto.simbolos)
+        if any(len(a) != 1 for a in self.alfabeto):
+            raise ValueError("La simulación por lotes requiere símbolos de un solo carácter.")
+        self._desconocido = len(self.alfabeto)
+        limite = max((ord(a) for a in self.alfabeto), default=0) + 1
+        self._lut = np.full(limite, self._desconocido, dtype=np.int32)
+        for k, a in enumerate(self.alfabeto):
+            self._lut[ord(a)] = k
+        self.n_estados = len(auto.estados)
+        self.determinista = True
+        self.tabla = auto.tabla
+        self.inicial = auto.inicial
+        self.finales = auto.finales.view(np.bool_)
+
+    def _compilar_afd(self, afn: AFNCompacto, ids: Dict[str, int], columnas: Dict[str, int]):
+        n = self.n_estados
+        tabla = np.full((n + 1, len(columnas) + 1), n, dtype=np.int32)
+        for origen, movs in afn.trans.items():
+            for a, ds in movs.items():
+                for d in ds:
+                    tabla[ids[origen], columnas[a]] = ids[d]
+        self.tabla = tabla
+        self.inicial = ids[afn.inicial]
+        self.finales = np.zeros(n + 1, dtype=bool)
+        for s in afn.finales:
+            if s in ids:
+                self.finales[ids[s]] = True
+
+    def _mascara(self, estados) -> "np.ndarray":
+        m = np.zeros(self._palabras, dtype=np.uint64)
+        for s in estados:
+            i = self._ids[s]
+            m[i >> 6] |= np.uint64(1) << np.uint64(i & 63)
+        return m
+
+    def _compilar_afn(self, afn: AFNCompacto, estados: List[str], ids: Dict[str, int], columnas: Dict[str, int]):
+        self._ids = ids
+        self._palabras = (self.n_estados + 63) // 64
+        tabla = np.zeros((self.n_estados, len(columnas) + 1, self._palabras), dtype=np.uint64)
+        for origen, movs in afn.trans.items():
+            for a, ds in movs.items():
+                tabla[ids[origen], columnas[a]] = self._mascara(afn.clausura(ds))
+        self.tabla = tabla
+        self.inicial = self._mascara(afn.clausura([afn.inicial]))
+        self.finales = self._mascara(afn.finales & set(ids))
+
+    def _codificar(self, cadenas: Sequence[str]):
+        longitudes = np.fromiter((len(c) for c in cadenas), dtype=np.int64, count=len(cadenas))
+        orden = np.argsort(-longitudes, kind="stable")
+        long_ord = longitudes[orden]
+        maximo = int(long_ord[0]) if len(long_ord) else 0
+        codigos = np.full((len(cadenas), maximo), self._desconocido, dtype=np.int32)
+        if maximo:
+            texto = "".join(cadenas[i] for i in orden)
+            puntos = np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32)
+            fuera = puntos >= len(self._lut)
+            cols = self._lut[np.where(fuera, 0, puntos)]
+            cols[fuera] = self._desconocido
+            filas = np.repeat(np.arange(len(cadenas)), long_ord)
+            inicios = np.cumsum(long_ord) - long_ord
+            posiciones = np.arange(len(puntos)) - np.repeat(inicios, long_ord)
+            codigos[filas, posiciones] = cols
+        activos = [int(np.searchsorted(-long_ord, -t, side="left")) for t in range(maximo)]
+        return orden, codigos, activos
+
+    def aceptar(self, cadenas: Sequence[str]) -> "np.ndarray":
+        """Devuelve un array booleano: resultado[i] indica si se acepta cadenas[i]."""
+        cadenas = list(cadenas)
+        resultado = np.zeros(len(cadenas), dtype=bool)
+        if not cadenas:
+            return resultado
+        orden, codigos, activos = self._codificar(cadenas)
+        # activos[t] = número de cadenas (ya ordenadas) con longitud > t
+        if self.determinista:
+            estado = np.full(len(cadenas), self.inicial, dtype=np.int32)
+            for t, k in enumerate(activos):
+                estado[:k] = self.tabla[estado[:k], codigos[:k, t]]
+            resultado[orden] = self.finales[estado]
+            return resultado
+
+        estado = np.tile(self.inicial, (len(cadenas), 1))
+        uno = np.uint64(1)
+        for t, k in enumerate(activos):
+            actual = estado[:k]
+            simbolos = codigos[:k, t]
+            nuevo = np.zeros_like(actual)
+            for i in range(self.n_estados):
+                sel = ((actual[:, i >> 6] >> np.uint64(i & 63)) & uno).astype(bool)
+                if sel.any():
+                    nuevo[sel] |= self.tabla[i, simbolos[sel]]
+            estado[:k] = nuevo
+        resultado[orden] = (estado & self.finales).any(axis=1)
+        return resultado
+
+
+def aceptar_lote(automata: Union[dict, AutomataBinario], cadenas: Sequence[str]) -> "np.ndarray":
+    """Atajo: compila el autómata y prueba todas las cadenas en una llamada."""
+    return AutomataVectorizado(automata).aceptar(cadenas)
+
+
+def _tokenizar_pila(texto: str, simbolos: List[str]) -> List[str]:
+    """Divide un push en símbolos de pila: coincidencia más larga, o por caracteres."""
+    if all(len(s) <= 1 for s in simbolos):
+        return list(texto)
+    largos = sorted((s for s in simbolos if s), key=len, reverse=True)
+    res, i = [], 0
+    while i < len(texto):
+        for s in largos:
+            if texto.startswith(s, i):
+                res.append(s)
+                i += len(s)
+                break
+        else:
+            res.append(texto[i])
+            i += 1
+    return res
+
+
+_RAIZ = ("raiz",)
+
+
+class SimuladorPDA:
+    """
+    Aceptación de un PDA (formato de glc_to_pda / tutor.AUTOMATA_BANK):
+    transitions = {estado: {leer: [{"pop": X, "push": γ, "to": destino}]}},
+    leer = "" para ε, "to" opcional (por defecto el mismo estado). El primer
+    símbolo de γ queda en la cima ("aSb" deja a arriba), como en glc_to_pda
+    y en el PDA de aⁿbⁿ del banco del tutor. Acepta por estado final si hay final_states; si no, por pila vacía.
+
+    En vez de explorar configuraciones completas (infinitas con ciclos ε que
+    apilan, p. ej. S → Sa), se resumen marcos (estado, posición, cima): para
+    cada marco se calculan una vez los (estado, posición) en que su cima
+    termina desapilada. Las tareas que esperan a un marco forman la pila
+    estructurada en grafo, y todo se memoriza, así que el trabajo es
+    polinómico en |Q|·|Γ|·n.
+    """
+
+    def __init__(self, pda: dict):
+        self.pda = pda
+        self.inicial = str(pda.get("initial_state", "q"))
+        self.finales = {str(s) for s in pda.get("final_states", [])}
+        simbolos = [str(s) for s in pda.get("stack_symbols", [])]
+        self.inicio_pila = pda.get("initial_stack_symbol")
+        self.reglas: Dict[str, List[tuple]] = {}
+        for origen, movs in pda.get("transitions", {}).items():
+            for leer, lst in movs.items():
+                for t in lst:
+                    pop = str(t.get("pop", "") or "")
+                    push = tuple(_tokenizar_pila(str(t.get("push", "") or ""), simbolos))
+                    destino = str(t.get("to", origen))
+                    self.reglas.setdefault(str(origen), []).append((leer or "", pop, push, destino))
+
+    def simular(self, cadena: str):
+        """Devuelve (acepta, traza); traza es la lista de movimientos de una corrida aceptadora."""
+        n = len(cadena)
+        por_final = bool(self.finales)
+        tareas: Dict[tuple, tuple] = {}
+        creador: Dict[tuple, tuple] = {}
+        resultados: Dict[tuple, Dict[Tuple[str, int], tuple]] = {_RAIZ: {}}
+        esperan: Dict[tuple, List[tuple]] = {}
+        cola: deque = deque()
+        aceptadora = None
+
+        def agregar(tarea, origen):
+            if tarea not in tareas:
+                tareas[tarea] = origen
+                cola.append(tarea)
+
+        pila0 = (str(self.inicio_pila),) if self.inicio_pila else ()
+        agregar((_RAIZ, self.inicial, 0, pila0), ("inicio",))
+
+        while cola:
+            tarea = cola.popleft()
+            marco, q, i, resto = tarea
+            if por_final and q in self.finales and i == n:
+                aceptadora = tarea
+                break
+            if not resto:
+                res = resultados[marco]
+                if (q, i) in res:
+                    continue
+                res[(q, i)] = tarea
+                if marco is _RAIZ:
+                    if not por_final and i == n:
+                        aceptadora = tarea
+                        break
+                    continue
+                for previa in esperan.get(marco, ()):
+                    agregar((previa[0], q, i, previa[3][1:]), ("pop", previa, marco, (q, i)))
+                continue
+            X = resto[0]
+            sub = (q, i, X)
+            esperan.setdefault(sub, []).append(tarea)
+            if sub in resultados:
+                for (q2, j) in list(resultados[sub]):
+                    agregar((marco, q2, j, resto[1:]), ("pop", tarea, sub, (q2, j)))
+                continue
+            resultados[sub] = {}
+            creador[sub] = tarea
+            for regla in self.reglas.get(q, ()):
+                leer, pop, push, destino = regla
+                if pop and pop != X:
+                    continue
+                if leer:
+                    if not cadena.startswith(leer, i):
+                        continue
+                    j = i + len(leer)
+                else:
+                    j = i
+                nueva = push + (() if pop else (X,))
+                agregar((sub, destino, j, nueva), ("regla", q, regla))
+
+        if aceptadora is None:
+            return False, None
+        return True, self._reconstruir(aceptadora, tareas, creador, resultados)
+
+    def _reconstruir(self, final, tareas, creador, resultados) -> List[tuple]:
+        """Movimientos (estado, regla) desde la configuración inicial hasta `final`."""
+        # Camino hasta el inicio de cada marco ancestro, de fuera hacia dentro.
+        cadena_marcos = []
+        marco = final[0]
+        while marco is not _RAIZ:
+            t = creador[marco]
+            cadena_marcos.append(t)
+            marco = t[0]
+        partes = [("tarea", t) for t in reversed(cadena_marcos)] + [("tarea", final)]
+        movimientos = []
+        pila = list(reversed(partes))
+        while pila:
+            tipo, dato = pila.pop()
+            if tipo == "mov":
+                movimientos.append(dato)
+                continue
+            origen = tareas[dato]
+            if origen[0] == "regla":
+                pila.append(("mov", (origen[1], origen[2])))
+            elif origen[0] == "pop":
+                _, previa, sub, par = origen
+                pila.append(("tarea", resultados[sub][par]))
+                pila.append(("tarea", previa))
+        return movimientos
+
+    def traza(self, cadena: str, movimientos: List[tuple]) -> List[dict]:
+        """Reproduce los movimientos sobre la pila real para la tabla de la app."""
+        pila = [str(self.inicio_pila)] if self.inicio_pila else []  # cima al final
+        i = 0
+        filas = []
+        for paso, (q, (leer, pop, push, destino)) in enumerate(movimientos, start=1):
+            if pop:
+                pila.pop()
+            pila.extend(reversed(push))
+            i += len(leer)
+            filas.append({
+                "Paso": paso,
+                "Desde": q,
+                "Leer": leer or "ε",
+                "Pop": pop or "ε",
+                "Push": "".join(push) or "ε",
+                "Hacia": destino,
+                "Entrada restante": cadena[i:] or "ε",
+                "Pila (cima a la izquierda)": "".join(reversed(pila)) or "ε",
+            })
+        return filas
+
+
+def simular_pda(pda: dict, cadena: str):
+    """
+    Simula el PDA sobre la cadena.
+    Devuelve (acepta, filas de la traza o None, mensaje).
+    """
+    sim = SimuladorPDA(pda)
+    acepta, movs = sim.simular(cadena)
+    modo = "estado final" if sim.finales else "pila vacía"
+    if not acepta:
+        return False, None, f"El PDA rechaza '{cadena or 'ε'}' (aceptación por {modo})."
+    return True, sim.traza(cadena, movs), f"El PDA acepta '{cadena or 'ε'}' (aceptación por {modo})."
+
+
+class CintaCompacta:
+    """
+    Cinta de la MT como bytearray de códigos de símbolo (0 = blanco).
+    Crece por ambos extremos duplicando su tamaño, así que mover el cabezal
+    cuesta O(1) amortizado.
+    """
+
+    __slots__ = ("celdas", "cabezal")
+
+    def __init__(self, codigos: bytes):
+        self.celdas = bytearray(codigos or b"\x00")
+        self.cabezal = 0
+
+    @classmethod
+    def desde(cls, datos: bytes, cabezal: int) -> "CintaCompacta":
+        """Reconstruye una cinta recortada; el cabezal puede caer fuera de los datos."""
+        if cabezal < 0:
+            datos, cabezal = bytes(-cabezal) + datos, 0
+        elif cabezal >= len(datos):
+            datos = datos + bytes(cabezal - len(datos) + 1)
+        cinta = cls(datos)
+        cinta.cabezal = cabezal
+        return cinta
+
+    def leer(self) -> int:
+        return self.celdas[self.cabezal]
+
+    def escribir(self, codigo: int):
+        self.celdas[self.cabezal] = codigo
+
+    def mover(self, direccion: str):
+        if direccion == "R":
+            self.cabezal += 1
+            if self.cabezal == len(self.celdas):
+                self.celdas.extend(bytes(len(self.celdas)))
+        elif direccion == "L":
+            if self.cabezal == 0:
+                extra = len(self.celdas)
+                self.celdas[0:0] = bytes(extra)
+                self.cabezal = extra
+            self.cabezal -= 1
+
+    def recortada(self) -> Tuple[bytes, int]:
+        """Contenido sin blancos en los extremos y cabezal relativo a él."""
+        datos = bytes(self.celdas)
+        ini = len(datos) - len(datos.lstrip(b"\x00"))
+        fin = len(datos.rstrip(b"\x00"))
+        if ini >= fin:
+            return b"", 0
+        return datos[ini:fin], self.cabezal - ini
+
+
+class SimuladorMT:
+    """
+    Simulador de máquinas de Turing (DTM o NTM) en el formato JSON de
+    clasificar_automata / automata-lib:
+
+        transitions = {estado: {símbolo: [destino, escribe, "L"|"R"|"N"]}}
+
+    En una NTM cada símbolo lleva una lista de esas ternas; también se aceptan
+    dicts {"to", "write", "move"}. Los símbolos de cinta se internan como
+    códigos de un byte (0 es el blanco).
+
+    La simulación respeta un presupuesto de pasos y de tiempo: si se agota se
+    informa como resultado, de modo que una MT que no para nunca bloquea la app.
+    """
+
+    def __init__(self, mt: dict):
+        self.blanco = str(mt.get("blank_symbol", "_"))
+        self.inicial = str(mt.get("initial_state", "q0"))
+        self.finales = {str(s) for s in mt.get("final_states", mt.get("accepting_states", []))}
+        self.codigos: Dict[str, int] = {self.blanco: 0}
+        self.simbolos: List[str] = [self.blanco]
+        for s in list(mt.get("tape_symbols", [])) + list(mt.get("input_symbols", [])):
+            self._codigo(str(s))
+        self.delta: Dict[Tuple[str, int], List[Tuple[str, int, str]]] = {}
+        for origen, movs in mt.get("transitions", {}).items():
+            for leer, destinos in movs.items():
+                for d in self._ternas(destinos):
+                    self.delta.setdefault((str(origen), self._codigo(str(leer))), []).append(d)
+        self.determinista = all(len(v) == 1 for v in self.delta.values())
+
+    def _codigo(self, simbolo: str) -> int:
+        c = self.codigos.get(simbolo)
+        if c is None:
+            if len(self.simbolos) >= 256:
+                raise ValueError("La cinta admite como máximo 256 símbolos distintos.")
+            c = len(self.simbolos)
+            self.codigos[simbolo] = c
+            self.simbolos.append(simbolo)
+        return c
+
+    def _ternas(self, destinos) -> List[Tuple[str, int, str]]:
+        if isinstance(destinos, dict) or (destinos and not isinstance(destinos[0], (list, tuple, dict))):
+            destinos = [destinos]
+        res = []
+        for d in destinos:
+            if isinstance(d, dict):
+                q, w, m = d.get("to"), d.get("write", self.blanco), d.get("move", "N")
+            else:
+                q, w, m = d
+            res.append((str(q), self._codigo(str(w)), str(m).upper()[:1]))
+        return res
+
+    def _cinta_inicial(self, cadena: str) -> bytes:
+        return bytes(self._codigo(ch) for ch in cadena)
+
+    def _texto(self, datos: bytes) -> str:
+        return "".join(self.simbolos[b] for b in datos) or self.blanco
+
+    def simular(self, cadena: str, max_pasos: int = 100_000, max_segundos: float = 1.0) -> dict:
+        """
+        Devuelve un dict con:
+          - resultado: "acepta", "rechaza" o "presupuesto"
+          - pasos: pasos (DTM) o configuraciones expandidas (NTM)
+          - estado, cinta: configuración final (o la última vista)
+        """
+        limite = time.monotonic() + max_segundos
+        if self.determinista:
+            return self._simular_dtm(cadena, max_pasos, limite)
+        return self._simular_ntm(cadena, max_pasos, limite)
+
+    def _simular_dtm(self, cadena: str, max_pasos: int, limite: float) -> dict:
+        cinta = CintaCompacta(self._cinta_inicial(cadena))
+        q = self.inicial
+        delta, finales = self.delta, self.finales
+        pasos = 0
+        resultado = None
+        while resultado is None:
+            if q in finales:
+                resultado = "acepta"
+                break
+            movs = delta.get((q, cinta.leer()))
+            if not movs:
+                resultado = "rechaza"
+                break
+            if pasos >= max_pasos or (pasos & 1023 == 0 and time.monotonic() > limite):
+                resultado = "presupuesto"
+                break
+            q, w, m = movs[0]
+            cinta.escribir(w)
+            cinta.mover(m)
+            pasos += 1
+        datos, cab = cinta.recortada()
+        return {"resultado": resultado, "pasos": pasos, "estado": q,
+                "cinta": self._texto(datos), "cabezal": cab}
+
+    def _simular_ntm(self, cadena: str, max_pasos: int, limite: float) -> dict:
+        inicio = (self.inicial, self._cinta_inicial(cadena), 0)
+        vistos = {inicio}
+        cola = deque([inicio])
+        delta, finales = self.delta, self.finales
+        expandidas = 0
+        ultima = inicio
+        resultado = "rechaza"
+        while cola:
+            q, datos, cab = ultima = cola.popleft()
+            if q in finales:
+                resultado = "acepta"
+                break
+            if expandidas >= max_pasos or (expandidas & 255 == 0 and time.monotonic() > limite):
+                resultado = "presupuesto"
+                break
+            expandidas += 1
+            cinta = CintaCompacta.desde(datos, cab)
+            for q2, w, m in delta.get((q, cinta.leer()), ()):
+                hija = CintaCompacta.desde(bytes(cinta.celdas), cinta.cabezal)
+                hija.escribir(w)
+                hija.mover(m)
+                datos2, cab2 = hija.recortada()
+                conf = (q2, datos2, cab2)
+                if conf not in vistos:
+                    vistos.add(conf)
+                    cola.append(conf)
+        q, datos, cab = ultima
+        return {"resultado": resultado, "pasos": expandidas, "estado": q,
+                "cinta": self._texto(datos), "cabezal": cab}
+
+
+def simular_mt(mt: dict, cadena: str, max_pasos: int = 100_000, max_segundos: float = 1.0):
+    """
+    Simula la MT con presupuesto. Devuelve (acepta o None si se agotó el
+    presupuesto, mensaje, detalle).
+    """
+    try:
+        sim = SimuladorMT(mt)
+    except (ValueError, TypeError) as e:
+        return None, f"No se pudo interpretar la Máquina de Turing: {e}", None
+    try:
+        info = sim.simular(cadena, max_pasos, max_segundos)
+    except ValueError as e:
+        return None, f"No se pudo simular la cadena: {e}", None
+    tipo = "DTM" if sim.determinista else "NTM"
+    if info["resultado"] == "acepta":
+        return True, f"La {tipo} acepta '{cadena or 'ε'}' en {info['pasos']} pasos.", info
+    if info["resultado"] == "rechaza" and not sim.determinista:
+        return False, (f"Ninguna rama de la NTM acepta '{cadena or 'ε'}' "
+                       f"({info['pasos']} configuraciones distintas exploradas)."), info
+    if info["resultado"] == "rechaza":
+        return False, f"La {tipo} se detiene y rechaza '{cadena or 'ε'}' tras {info['pasos']} pasos.", info
+    return None, (f"Presupuesto agotado ({info['pasos']} pasos o {max_segundos:g} s) "
+                  "sin que la máquina se detenga."), info
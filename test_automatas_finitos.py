@@ -0,0 +1,79 @@
+import itertools
+import random
+
+import pytest
+
+from automatas_finitos import acepta_cadena, equivalencia_exacta, minimizar_afd
+
+
+def _cadenas(alfabeto, max_len):
+    for n in range(max_len + 1):
+        for t in itertools.product(alfabeto, repeat=n):
+            yield "".join(t)
+
+
+def _modulo(k: int, finales) -> dict:
+    """DFA sobre {a, b} que cuenta las a módulo k."""
+    estados = [f"r{i}" for i in range(k)]
+    return {"states": estados, "input_symbols": ["a", "b"], "initial_state": "r0",
+            "final_states": [f"r{i}" for i in finales],
+            "transitions": {f"r{i}": {"a": f"r{(i + 1) % k}", "b": f"r{i}"} for i in range(k)}}
+
+
+TERMINA_EN_AB = {  # con un estado duplicado, uno inalcanzable y un sumidero explícito
+    "states": ["p", "p2", "pa", "pab", "x", "muerto"], "input_symbols": ["a", "b"],
+    "initial_state": "p", "final_states": ["pab"],
+    "transitions": {"p": {"a": "pa", "b": "p2"}, "p2": {"a": "pa", "b": "p"},
+                    "pa": {"a": "pa", "b": "pab"}, "pab": {"a": "pa", "b": "p2"},
+                    "x": {"a": "muerto", "b": "x"}, "muerto": {"a": "muerto", "b": "muerto"}},
+}
+SOLO_A = {"states": ["s", "t", "z"], "input_symbols": ["a", "b"], "initial_state": "s", "final_states": ["t"],
+          "transitions": {"s": {"a": "t", "b": "z"}, "t": {"a": "z", "b": "z"}, "z": {"a": "z", "b": "z"}}}
+
+
+@pytest.mark.parametrize("afd, tamano", [
+    (_modulo(3, [0]), 3),
+    (_modulo(6, [0, 3]), 3),
+    (_modulo(6, [0, 2, 4]), 2),
+    (_modulo(4, [0, 1, 2, 3]), 1),
+    (TERMINA_EN_AB, 3),
+    (SOLO_A, 2),  # el sumidero se descarta
+])
+def test_tamano_del_afd_minimo(afd, tamano):
+    minimo = minimizar_afd(afd)
+    assert len(minimo["states"]) == tamano
+    assert minimizar_afd(minimo) == minimo
+    for w in _cadenas("ab", 7):
+        assert acepta_cadena(minimo, w) == acepta_cadena(afd, w), w
+
+
+def _afd_al_azar(azar, n):
+    estados = [f"e{i}" for i in range(n)]
+    return {"states": estados, "input_symbols": ["a", "b"], "initial_state": "e0",
+            "final_states": [q for q in estados if azar.random() < 0.5],
+            "transitions": {q: {c: azar.choice(estados) for c in "ab" if azar.random() < 0.9} for q in estados}}
+
+
+def test_testigos_de_hopcroft_karp():
+    azar = random.Random(3)
+    distintos = 0
+    for _ in range(300):
+        a1, a2 = _afd_al_azar(azar, azar.randint(1, 4)), _afd_al_azar(azar, azar.randint(1, 4))
+        equivalentes, testigo = equivalencia_exacta(a1, a2)
+        # Los DFA mínimos se nombran de forma canónica: mismo lenguaje, mismo diccionario.
+        assert equivalentes == (minimizar_afd(a1) == minimizar_afd(a2))
+        if equivalentes:
+            assert testigo is None
+        else:
+            distintos += 1
+            assert acepta_cadena(a1, testigo) != acepta_cadena(a2, testigo), testigo
+    assert distintos > 50
+
+
+def test_equivalencia_con_afn():
+    afn = {"states": ["s", "t", "u"], "input_symbols": ["a", "b"], "initial_state": "s", "final_states": ["u"],
+           "transitions": {"s": {"a": ["s", "t"], "b": ["s"]}, "t": {"b": ["u"]}}}
+    assert equivalencia_exacta(afn, TERMINA_EN_AB) == (True, None)
+    equivalentes, testigo = equivalencia_exacta(afn, _modulo(3, [0]))
+    assert not equivalentes
+    assert acepta_cadena(afn, testigo) != acepta_cadena(_modulo(3, [0]), testigo)
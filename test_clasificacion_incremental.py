@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+chomsky_classifier = pytest.importorskip("chomsky_classifier")
+
+LINEAS = ["S -> aSb | ab", "A -> aA | a", "aB -> Ba", "S -> ε", "B -> bB | b", "AB -> a", "  C -> c ", ""]
+
+
+def test_ediciones_aleatorias_coinciden_con_el_analisis_completo():
+    azar = random.Random(7)
+    incremental = chomsky_classifier.ClasificacionIncremental()
+    incremental.BLOQUE = 4  # bloques pequeños para cruzar sus bordes
+    lineas = [azar.choice(LINEAS) for _ in range(30)]
+    for _ in range(500):
+        i = azar.randrange(len(lineas) + 1)
+        operacion = azar.random()
+        if operacion < 0.4 or not lineas:
+            lineas.insert(i, azar.choice(LINEAS))
+        elif operacion < 0.7:
+            del lineas[min(i, len(lineas) - 1)]
+        else:
+            lineas[min(i, len(lineas) - 1)] = azar.choice(LINEAS)
+        texto = "\n".join(lineas)
+        tipo, explicacion, pasos = incremental.actualizar(texto)
+        esperado = chomsky_classifier.clasificar_con_explicacion(texto)
+        assert (tipo, explicacion, list(pasos)) == (esperado[0], esperado[1], list(esperado[2]))
+        assert pasos[-1] == esperado[2][-1] and pasos[1:3] == esperado[2][1:3]
+
+
+def test_solo_reanaliza_la_linea_editada():
+    texto = "\n".join(LINEAS[:6] * 100)
+    incremental = chomsky_classifier.ClasificacionIncremental()
+    incremental.actualizar(texto)
+    medio = len(texto) // 2
+    incremental.actualizar(texto[:medio] + "a" + texto[medio:])
+    assert incremental.reanalizadas == 1
+    incremental.actualizar(texto[:medio] + "a" + texto[medio:])
+    assert incremental.reanalizadas == 0
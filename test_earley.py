@@ -0,0 +1,58 @@
+import itertools
+
+import pytest
+
+from earley import derivar, pertenece
+from grammar_ir import compilar_gramatica
+
+MAX_LEN = 6
+HOLGURA = 4  # no terminales anulables que puede llevar una forma sentencial de la búsqueda
+
+
+def _por_fuerza_bruta(g, max_len):
+    """Cadenas de longitud <= max_len, por derivaciones izquierdas en anchura con formas acotadas."""
+    reglas = {}
+    for (izq,), der in g.producciones:
+        reglas.setdefault(izq, []).append(der)
+    cadenas, vistas = set(), set()
+    frontera = [(g.inicio,)]
+    while frontera:
+        siguiente = []
+        for forma in frontera:
+            k = next((i for i, x in enumerate(forma) if g.es_nt[x]), None)
+            if k is None:
+                cadenas.add("".join(g.simbolos[x] for x in forma))
+                continue
+            for der in reglas.get(forma[k], ()):
+                nueva = forma[:k] + der + forma[k + 1:]
+                terminales = sum(1 for x in nueva if not g.es_nt[x])
+                if terminales <= max_len and len(nueva) <= max_len + HOLGURA and nueva not in vistas:
+                    vistas.add(nueva)
+                    siguiente.append(nueva)
+        frontera = siguiente
+    return cadenas
+
+
+@pytest.mark.parametrize("texto", [
+    "S -> aSb | ε",
+    "S -> aSa | bSb | a | b | ε",
+    "S -> SS | (S) | ε",
+    "S -> Sa | b",
+    "S -> AB\nA -> aA | ε\nB -> bB | b",
+    "S -> aB | bA | ε\nA -> aS | bAA\nB -> bS | aBB",
+    "E -> E+T | T\nT -> T*F | F\nF -> (E) | a",
+])
+def test_pertenencia_coincide_con_fuerza_bruta(texto):
+    g = compilar_gramatica(texto)
+    lenguaje = _por_fuerza_bruta(g, MAX_LEN)
+    alfabeto = sorted({c for w in lenguaje for c in w} | {s for s, t in zip(g.simbolos, g.es_t) if t})
+    for n in range(MAX_LEN + 1):
+        for letras in itertools.product(alfabeto, repeat=n):
+            w = "".join(letras)
+            assert pertenece(g, w) == (w in lenguaje), w
+
+
+def test_derivacion_solo_para_cadenas_del_lenguaje():
+    g = compilar_gramatica("S -> aSb | ε")
+    assert derivar(g, "aabb")
+    assert derivar(g, "aab") is None
@@ -0,0 +1,103 @@
+import struct
+
+import pytest
+
+from formato_binario import _CABECERA, _alinear, cargar_binario, es_binario, exportar_binario
+
+DFA = {"states": ["q0", "q1", "q2"], "input_symbols": ["a", "b"],
+       "initial_state": "q0", "final_states": ["q2"],
+       "transitions": {"q0": {"a": "q1"}, "q1": {"b": "q2"}, "q2": {"a": "q2", "b": "q2"}}}
+NFA = {"states": ["s", "t", "u"], "input_symbols": ["0", "1"],
+       "initial_state": "s", "final_states": ["u"],
+       "transitions": {"s": {"0": ["s", "t"], "1": ["s"], "": ["u"]}, "t": {"1": ["u"]}}}
+
+
+def _normalizado(a: dict) -> dict:
+    trans = {q: {c: sorted(d) if isinstance(d, list) else [d] for c, d in movs.items()}
+             for q, movs in a["transitions"].items()}
+    return {"states": sorted(a["states"]), "initial_state": a["initial_state"],
+            "final_states": sorted(a["final_states"]), "transitions": trans}
+
+
+def _con_cabecera(datos: bytes, **campos) -> bytes:
+    nombres = ["magico", "version", "banderas", "n", "k", "inicial", "meta", "destinos", "reservado"]
+    valores = dict(zip(nombres, _CABECERA.unpack_from(datos, 0)))
+    valores.update(campos)
+    return _CABECERA.pack(*(valores[c] for c in nombres)) + datos[_CABECERA.size:]
+
+
+def clasificar_automata(datos):
+    return pytest.importorskip("chomsky_classifier").clasificar_automata(datos)
+
+
+def _inicio_tablas(datos: bytes) -> int:
+    """Desplazamiento de la tabla DFA o de los inicios CSR."""
+    _, _, _, n, _, _, largo_meta, _, _ = _CABECERA.unpack_from(datos, 0)
+    return _alinear(_alinear(_CABECERA.size + largo_meta) + n + 1)
+
+
+@pytest.mark.parametrize("automata", [DFA, NFA])
+def test_ida_y_vuelta(automata, tmp_path):
+    datos = exportar_binario(automata)
+    assert es_binario(datos)
+    ruta = tmp_path / "a.afb"
+    ruta.write_bytes(datos)
+    for auto in (cargar_binario(datos), cargar_binario(str(ruta))):
+        assert auto.determinista == (automata is DFA)
+        assert _normalizado(auto.a_dict()) == _normalizado(automata)
+
+
+def test_clasifica_bytes():
+    tipo, _, datos, _ = clasificar_automata(exportar_binario(DFA))
+    assert tipo == 3 and datos["initial_state"] == "q0"
+
+
+@pytest.mark.parametrize("campos", [
+    {"magico": b"XXXX"},
+    {"version": 99},
+    {"inicial": 3},
+    {"inicial": 2 ** 31},
+    {"n": 7},
+    {"meta": 1},
+])
+def test_cabecera_malformada(campos):
+    datos = _con_cabecera(exportar_binario(DFA), **campos)
+    with pytest.raises(ValueError):
+        cargar_binario(datos)
+
+
+def test_clasificar_binario_malformado_no_lanza():
+    tipo, _, automata, pasos = clasificar_automata(_con_cabecera(exportar_binario(DFA), inicial=3))
+    assert tipo is None and automata is None and pasos[0].startswith("Error")
+
+
+def test_truncado():
+    datos = exportar_binario(NFA)
+    with pytest.raises(ValueError):
+        cargar_binario(datos[:-4])
+    with pytest.raises(ValueError):
+        cargar_binario(datos[:_CABECERA.size - 1])
+
+
+@pytest.mark.parametrize("destino", [4, -1])
+def test_tabla_dfa_fuera_de_rango(destino):
+    datos = bytearray(exportar_binario(DFA))
+    struct.pack_into("<i", datos, _inicio_tablas(datos), destino)  # n = 3: solo 0..3 son válidos
+    with pytest.raises(ValueError):
+        cargar_binario(bytes(datos))
+
+
+def test_destinos_nfa_fuera_de_rango():
+    datos = bytearray(exportar_binario(NFA))
+    struct.pack_into("<i", datos, len(datos) - 4, 3)
+    with pytest.raises(ValueError):
+        cargar_binario(bytes(datos))
+
+
+def test_inicios_nfa_decrecientes():
+    datos = bytearray(exportar_binario(NFA))
+    inicio = _inicio_tablas(datos)
+    segundo = struct.unpack_from("<i", datos, inicio + 4)[0]
+    struct.pack_into("<i", datos, inicio + 8, segundo - 1)
+    with pytest.raises(ValueError):
+        cargar_binario(bytes(datos))
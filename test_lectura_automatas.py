@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from lectura_automatas import filas_transiciones, leer_automata, total_transiciones
+
+ESTADOS = [f"q{i}" for i in range(50)]
+DELTA = {s: {"a": ESTADOS[(i + 1) % 50], "b": [ESTADOS[i], ESTADOS[(i * 7) % 50]]}
+         for i, s in enumerate(ESTADOS)}
+
+
+def _texto(transiciones_al_final: bool) -> str:
+    d = {"type": "DFA", "states": ESTADOS, "input_symbols": ["a", "b"]}
+    if not transiciones_al_final:
+        d["transitions"] = DELTA
+    d.update({"initial_state": "q0", "final_states": ["q1"]})
+    if transiciones_al_final:
+        d["transitions"] = DELTA
+    return json.dumps(d)
+
+
+def test_claves_antes_de_transitions_no_lo_decodifican():
+    auto = leer_automata(_texto(True))
+    assert "initial_state" in auto and "final_states" in auto and "transitions" in auto
+    assert "tape_symbols" not in auto
+    assert auto.origenes == 0 and not auto.leido_entero
+
+
+def test_filas_leen_solo_los_origenes_necesarios():
+    auto = leer_automata(_texto(True))
+    filas = list(auto.filas(cantidad=5))
+    assert [f["Desde"] for f in filas] == ["q0", "q0", "q0", "q1", "q1"]
+    assert auto.origenes == 2
+
+
+@pytest.mark.parametrize("al_final", [True, False])
+def test_estadisticas_y_dict_completo(al_final):
+    texto = _texto(al_final)
+    auto = leer_automata(texto)
+    list(auto.filas(cantidad=3))
+    assert total_transiciones(auto) == 150
+    assert auto.estadisticas()["destinos múltiples"] == 50
+    assert auto.a_dict() == json.loads(texto)
+    assert list(filas_transiciones(auto)) == list(filas_transiciones(json.loads(texto)))
+
+
+@pytest.mark.parametrize("texto", ['{"states": [1, 2], "x": }', '{"states": []} x', '{"states": 1, "x": tru}'])
+def test_errores_tras_las_claves_leidas(texto):
+    auto = leer_automata(texto)
+    assert "states" in auto
+    with pytest.raises(json.JSONDecodeError):
+        auto.claves()
+    with pytest.raises(json.JSONDecodeError):
+        auto.claves()
+
+
+def test_limite_antes_de_leer():
+    with pytest.raises(ValueError, match="límite"):
+        leer_automata("{" + " " * 100 + "}", limite=10)
+    with pytest.raises(ValueError):
+        leer_automata("[1, 2]")
+
+
+def test_clasificacion_sin_decodificar_transitions():
+    chomsky_classifier = pytest.importorskip("chomsky_classifier")
+    texto = _texto(True)
+    tipo, _, auto, pasos = chomsky_classifier.clasificar_automata(texto)
+    assert tipo == 3 and auto.origenes == 0
+    assert chomsky_classifier.clasificar_automata(texto)[0] == 3
+    assert chomsky_classifier.clasificar_automata('{"states": [}')[2] is None
@@ -0,0 +1,50 @@
+import itertools
+
+import pytest
+
+from earley import pertenece
+from grammar_ir import compilar_gramatica
+from simuladores import simular_mt, simular_pda
+from tutor import AUTOMATA_BANK
+
+PDA_ANBN = next(a for a in AUTOMATA_BANK if a["type"] == "PDA")
+
+
+def _cadenas(alfabeto, max_len):
+    for n in range(max_len + 1):
+        for t in itertools.product(alfabeto, repeat=n):
+            yield "".join(t)
+
+
+@pytest.mark.parametrize("cadena", ["", "ab", "aabb", "aaabbb"])
+def test_pda_del_banco_acepta_anbn(cadena):
+    acepta, traza, _ = simular_pda(PDA_ANBN, cadena)
+    assert acepta
+    assert traza[-1]["Pila (cima a la izquierda)"] == "ε"
+
+
+@pytest.mark.parametrize("cadena", ["a", "b", "ba", "bbaa", "aab", "abab"])
+def test_pda_del_banco_rechaza(cadena):
+    assert not simular_pda(PDA_ANBN, cadena)[0]
+
+
+@pytest.mark.parametrize("texto", [
+    "S -> aSb | ε",
+    "S -> SS | (S) | ε",
+    "S -> Sa | b",
+    "E -> E+T | T\nT -> T*F | F\nF -> (E) | a",
+])
+def test_glc_to_pda_coincide_con_earley(texto):
+    model_converters = pytest.importorskip("model_converters")
+    pda, err = model_converters.glc_to_pda(texto)
+    assert err is None
+    g = compilar_gramatica(texto)
+    for w in _cadenas(sorted(pda["input_symbols"]), 5):
+        assert simular_pda(pda, w)[0] == pertenece(g, w), w
+
+
+def test_mt_con_demasiados_simbolos_no_lanza():
+    mt = {"states": ["q"], "initial_state": "q", "final_states": ["q"], "blank_symbol": "_",
+          "transitions": {}}
+    acepta, msg, _ = simular_mt(mt, "".join(chr(0x100 + k) for k in range(300)))
+    assert acepta is None and msg.startswith("No se pudo")
@@ -0,0 +1,188 @@
+"""
+Tramos de tiempo ligeros para ver qué etapa de una petición es la lenta.
+
+    with registrar() as reg:          # activa la medición en este contexto
+        clasificar_con_explicacion(texto)
+    reg.filas() -> [{"Etapa": "parseo de gramática", "ms": 0.4}, ...]
+
+Dentro del código instrumentado:
+
+    with tramo("análisis de producciones"):
+        ...
+
+Fuera de registrar(), tramo() devuelve un objeto nulo compartido y no
+mide nada: el coste es una consulta a una ContextVar. Cada sesión de
+Streamlit se ejecuta en su propio hilo, así que los registros no se
+mezclan. Con perfil=True se ejecuta además cProfile y reg.perfil guarda
+el resumen de pstats.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import time
+from typing import List, NamedTuple, Optional
+
+VARIABLE_TRAZAS = "CHOMSKY_TRAZAS"
+VARIABLE_PERFIL = "CHOMSKY_PERFIL"
+
+
+class Tramo(NamedTuple):
+    nombre: str
+    segundos: float
+    nivel: int
+
+
+class Registro:
+    __slots__ = ("tramos", "perfil", "_nivel")
+
+    def __init__(self):
+        self.tramos: List[Tramo] = []
+        self.perfil: Optional[str] = None
+        self._nivel = 0
+
+    def filas(self) -> List[dict]:
+        return [
+            {"Etapa": "  " * t.nivel + t.nombre, "ms": round(t.segundos * 1000, 3)}
+            for t in self.tramos
+            if t is not None
+        ]
+
+
+_registro: contextvars.ContextVar = contextvars.ContextVar("registro_trazas", default=None)
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _TramoNulo()
+
+
+class _TramoActivo:
+    __slots__ = ("reg", "nombre", "inicio", "pos")
+
+    def __init__(self, reg: Registro, nombre: str):
+        self.reg = reg
+        self.nombre = nombre
+
+    def __enter__(self):
+        reg = self.reg
+        # Se reserva el hueco al entrar para que los tramos queden en orden de inicio.
+        self.pos = len(reg.tramos)
+        reg.tramos.append(None)
+        reg._nivel += 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter() - self.inicio
+        reg = self.reg
+        reg._nivel -= 1
+        reg.tramos[self.pos] = Tramo(self.nombre, duracion, reg._nivel)
+        return False
+
+
+def tramo(nombre: str):
+    reg = _registro.get()
+    if reg is None:
+        return _NULO
+    return _TramoActivo(reg, nombre)
+
+
+def medido(nombre: str):
+    """Decorador: la llamada completa es un tramo (sin coste apreciable si no se mide)."""
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            reg = _registro.get()
+            if reg is None:
+                return funcion(*args, **kwargs)
+            with _TramoActivo(reg, nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorar
+
+
+def activas_por_defecto() -> bool:
+    return os.environ.get(VARIABLE_TRAZAS, "").strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+def perfil_por_defecto() -> bool:
+    return os.environ.get(VARIABLE_PERFIL, "").strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+class registrar:
+    """
+    Registra los tramos del bloque (with) o entre iniciar() y detener().
+    Con activo=False no mide nada y el registro es None.
+    """
+
+    def __init__(self, activo: bool = True, perfil: bool = False, lineas_perfil: int = 25):
+        self.activo = activo
+        self.perfil = perfil
+        self.lineas_perfil = lineas_perfil
+        self.registro: Optional[Registro] = None
+        self._token = None
+        self._perfilador = None
+
+    def iniciar(self) -> "registrar":
+        if self.activo:
+            self.registro = Registro()
+            self._token = _registro.set(self.registro)
+            if self.perfil:
+                self._perfilador = cProfile.Profile()
+                self._perfilador.enable()
+        return self
+
+    def detener(self) -> Optional[Registro]:
+        if self._perfilador is not None:
+            self._perfilador.disable()
+            salida = io.StringIO()
+            pstats.Stats(self._perfilador, stream=salida).sort_stats("cumulative").print_stats(self.lineas_perfil)
+            self.registro.perfil = salida.getvalue()
+            self._perfilador = None
+        if self._token is not None:
+            _registro.reset(self._token)
+            self._token = None
+        return self.registro
+
+    def __enter__(self) -> Optional[Registro]:
+        return self.iniciar().registro
+
+    def __exit__(self, *exc):
+        self.detener()
+        return False
+
+
+def reiniciar():
+    """Descarta cualquier registro que haya quedado activo en este contexto."""
+    _registro.set(None)
+
+
+def tramo_en_segundo_plano(nombre: str, futuro):
+    """
+    Tramo de un trabajo que corre en otro hilo (un Future). El hueco se
+    reserva ahora, en el nivel del hilo que lo pide, y se rellena cuando el
+    Future termina: el otro hilo nunca toca el registro ni su anidamiento.
+    """
+    reg = _registro.get()
+    if reg is None:
+        return
+    pos = len(reg.tramos)
+    reg.tramos.append(None)
+    nivel = reg._nivel
+    inicio = time.perf_counter()
+
+    def terminar(_):
+        reg.tramos[pos] = Tramo(nombre, time.perf_counter() - inicio, nivel)
+
+    futuro.add_done_callback(terminar)
@@ -1,5 +1,7 @@
 import random, json
 
+from canonico import huella_automata, huella_gramatica
+
 GRAMMARS_BANK = [
     "S → aS | bS | ε",
     "S -> aA | b\nA -> a | b | ε",
@@ -33,6 +35,20 @@ AUTOMATA_BANK = [
      "initial_state":"p","final_states":["q"],"transitions":{}},
 ]
 
+def _sin_duplicados(banco, huella):
+    """Quita del banco las entradas con la misma forma canónica que una anterior."""
+    vistas = set()
+    unicos = []
+    for item in banco:
+        h = huella(item)
+        if h not in vistas:
+            vistas.add(h)
+            unicos.append(item)
+    return unicos
+
+GRAMMARS_BANK = _sin_duplicados(GRAMMARS_BANK, huella_gramatica)
+AUTOMATA_BANK = _sin_duplicados(AUTOMATA_BANK, huella_automata)
+
 LABELS = {
     "3": "3 (Regular)",
     "2": "2 (Libre de Contexto)",